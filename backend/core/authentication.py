@@ -0,0 +1,14 @@
+"""
+Authentication classes.
+"""
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.profiling import timed
+
+
+class ProfiledJWTAuthentication(JWTAuthentication):
+    """simplejwt's JWTAuthentication, timed as ``auth`` in request profiles."""
+    
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
@@ -0,0 +1,212 @@
+"""
+API benchmark: latency, SQL and payload size per endpoint.
+
+A fixed synthetic dataset (core.synthetic) is loaded into a throwaway
+database, then each endpoint in CASES is requested through the Django test
+client as a warden and as a student, with real JWT logins and
+authentication. Per endpoint we record p50/p95 latency, the largest number
+of SQL queries any timed request made, the rows in the response (list items,
+or the items of every collection for /api/hostel-data/) and the response
+size. Each case starts with an untimed warm-up request whose queries are
+kept apart as ``cold_queries``, so a cache miss on the first request doesn't
+hide what the warm path costs; cold-cache latency is what the
+``hostel-data-uncached`` case measures.
+
+Results are compared with the budgets in BUDGETS_FILE. Query counts, warm
+and cold, are budgeted exactly, so an N+1 regression fails even when it is still fast on
+a small dataset; paginated lists are also fetched with ``page_size=1`` and
+must make the same number of queries as a full page.
+"""
+import json
+import math
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core import synthetic
+from core.cache import bump_data_version
+from hostel.models import Hosteler
+
+BUDGETS_FILE = Path(__file__).with_name('benchmark_budgets.json')
+
+# Dataset the stored budgets were recorded against
+DATASET = {'scale': 1, 'seed': 1, 'years': 2, 'asOf': '2024-12-01'}
+
+WARDEN_USERNAME = 'bench-warden'
+
+WARDEN_PASSWORD = 'warden123'
+
+ROLES = ('warden', 'student')
+
+# (name, method, path); every case runs once per role
+CASES = [
+    ('login', 'post', '/api/auth/login/'),
+    ('hostel-data', 'get', '/api/hostel-data/'),
+    ('hostel-data-uncached', 'get', '/api/hostel-data/'),
+    ('rooms', 'get', '/api/rooms/'),
+    ('outpasses', 'get', '/api/outpasses/'),
+    ('payments', 'get', '/api/payments/'),
+    ('notifications', 'get', '/api/notifications/'),
+]
+
+# Lists whose query count must not depend on the page size
+PAGED = ('outpasses', 'payments', 'notifications')
+
+METRICS = ('queries', 'cold_queries', 'p95_ms', 'bytes')
+
+# Applied when budgets are written: latency depends on the machine, sizes
+# drift a little with timestamps, query counts must not move at all
+LATENCY_HEADROOM = 3
+
+MIN_LATENCY_BUDGET_MS = 50
+
+BYTES_HEADROOM = 1.1
+
+
+class BenchmarkError(Exception):
+    """An endpoint failed outright (non-200 response) during the benchmark."""
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def count_rows(payload):
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        if isinstance(payload.get('results'), list):
+            return len(payload['results'])
+        return sum(len(value) for value in payload.values() if isinstance(value, list)) or 1
+    return 0
+
+
+def seed(scale, seed=1, years=2, as_of=None, log=None):
+    """Load the dataset and a warden; returns {role: (username, password)}."""
+    synthetic.generate(scale, seed, years, as_of, log)
+    User = get_user_model()
+    User.objects.create_user(WARDEN_USERNAME, password=WARDEN_PASSWORD, role='warden')
+    # A resident, so their outpasses, payments and notifications are non-trivial
+    housed = Hosteler.objects.filter(room__isnull=False).values('hosteler_id')
+    student = User.objects.filter(role='student', hosteler_id__in=housed).order_by('username').first()
+    return {
+        'warden': (WARDEN_USERNAME, WARDEN_PASSWORD),
+        'student': (student.username, synthetic.STUDENT_PASSWORD),
+    }
+
+
+def request(client, method, path, data=None, headers=None):
+    """One timed request: (milliseconds, queries, response)."""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        if method == 'post':
+            response = client.post(path, data, content_type='application/json', headers=headers)
+        else:
+            response = client.get(path, data, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise BenchmarkError(f'{method.upper()} {path} returned {response.status_code}: {response.content[:200]!r}')
+    return elapsed, len(queries), response
+
+
+def measure(client, method, path, iterations, data=None, headers=None, before=None):
+    """
+    Metrics over ``iterations`` requests after one warm-up request. The
+    warm-up pays for cold caches, so it is left out of the timings and the
+    query count; its queries are reported as ``cold_queries``. It still
+    counts towards the size.
+    """
+    timings = []
+    queries = cold_queries = size = rows = 0
+    for attempt in range(iterations + 1):
+        if before:
+            before()
+        elapsed, count, response = request(client, method, path, data, headers)
+        if attempt:
+            timings.append(elapsed)
+            queries = max(queries, count)
+        else:
+            cold_queries = count
+        size = max(size, len(response.content))
+        rows = count_rows(response.json())
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': queries,
+        'cold_queries': cold_queries,
+        'rows': rows,
+        'bytes': size,
+    }
+
+
+def run(credentials, iterations=20):
+    """Benchmark every case for every role; returns {'name:role': metrics}."""
+    client = Client()
+    results = {}
+    for role in ROLES:
+        username, password = credentials[role]
+        login = {'username': username, 'password': password}
+        _, _, response = request(client, 'post', '/api/auth/login/', login)
+        headers = {'Authorization': f"Bearer {response.json()['access']}"}
+
+        for name, method, path in CASES:
+            if name == 'login':
+                result = measure(client, method, path, iterations, data=login)
+            elif name == 'hostel-data-uncached':
+                # A new data version means a new cache key, so every request rebuilds the payload
+                result = measure(client, method, path, iterations, headers=headers,
+                                 before=lambda: bump_data_version('rooms'))
+            else:
+                result = measure(client, method, path, iterations, headers=headers)
+            if name in PAGED:
+                _, result['page1_queries'], _ = request(client, method, path, {'page_size': 1}, headers)
+            results[f'{name}:{role}'] = result
+    return results
+
+
+def load_budgets(path=BUDGETS_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def make_budgets(results, dataset, iterations):
+    """Budgets from a run: exact query counts, headroom on latency and size."""
+    return {
+        'dataset': dataset,
+        'iterations': iterations,
+        'endpoints': {
+            key: {
+                'queries': result['queries'],
+                'cold_queries': result['cold_queries'],
+                'p95_ms': max(math.ceil(result['p95_ms'] * LATENCY_HEADROOM), MIN_LATENCY_BUDGET_MS),
+                'bytes': math.ceil(result['bytes'] * BYTES_HEADROOM),
+            }
+            for key, result in sorted(results.items())
+        },
+    }
+
+
+def check(results, budgets):
+    """Budget violations as a list of messages (empty when everything is within budget)."""
+    failures = []
+    endpoints = budgets.get('endpoints', {})
+    for key, result in results.items():
+        if result.get('page1_queries', result['queries']) != result['queries']:
+            failures.append(
+                f"{key}: {result['queries']} queries for a full page but {result['page1_queries']} "
+                f"for one row; query count depends on page size (N+1?)"
+            )
+        budget = endpoints.get(key)
+        if budget is None:
+            failures.append(f'{key}: no budget recorded')
+            continue
+        for metric in METRICS:
+            if metric in budget and result[metric] > budget[metric]:
+                failures.append(f'{key}: {metric} {result[metric]} over budget {budget[metric]}')
+    return failures
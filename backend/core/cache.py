@@ -0,0 +1,79 @@
+"""
+Per-collection data versions used to key cached API payloads.
+
+Each synced collection (hostelers, rooms, ...) has a version number in the
+cache. Any save or delete bumps it, so cache keys built from the versions
+change as soon as the underlying data does and stale entries simply age out.
+
+Versions only invalidate anything if every process reads the same ones, so
+callers check ``is_shared()`` (the CACHE_SHARED setting) and don't cache
+against them when the backend is private to each process.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'data-version:{}'
+
+
+def is_shared():
+    """Whether all worker processes share the default cache (see CACHE_SHARED)."""
+    return settings.CACHE_SHARED
+
+
+def _version_key(collection):
+    return VERSION_KEY.format(collection)
+
+
+def get_data_versions(collections):
+    """
+    Return ``{collection: version}`` in one cache round trip.
+    Collections without a version yet are initialised.
+    """
+    keys = {_version_key(collection): collection for collection in collections}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, collection in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Seed from the clock so a version lost to eviction is never reused
+            version = time.time_ns()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[collection] = version
+    return versions
+
+
+def advance_data_version(collection):
+    """Bump a collection's version right away and return the new value."""
+    key = _version_key(collection)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def _bump(collections):
+    for collection in collections:
+        advance_data_version(collection)
+
+
+def bump_data_version(*collections):
+    """
+    Invalidate everything cached against the given collections.
+    Deferred until the surrounding transaction commits, so no reader can cache
+    pre-commit data under the new version.
+    """
+    transaction.on_commit(lambda: _bump(collections))
+
+
+def versioned_key(prefix, versions):
+    """Build a cache key (and matching ETag) from a set of data versions."""
+    stamp = ':'.join(f'{name}={versions[name]}' for name in sorted(versions))
+    digest = hashlib.sha1(stamp.encode()).hexdigest()
+    return f'{prefix}:{digest}', f'"{digest}"'
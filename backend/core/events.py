@@ -0,0 +1,102 @@
+"""
+In-process domain event bus.
+
+Code that changes state publishes an event (``publish('outpass.status_changed', ...)``).
+Events are buffered per transaction and handed to subscribers as one batch
+after the transaction commits, so a request that approves 200 outpasses
+produces one batch of 200 events, and a rolled-back transaction produces
+none. Outside a transaction each event is delivered on its own, immediately.
+
+Handlers receive a list of ``Event`` and must not raise; failures are logged
+so one consumer can't break another or the request that already committed.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+logger = logging.getLogger(__name__)
+
+OUTPASS_STATUS_CHANGED = 'outpass.status_changed'
+PAYMENT_COMPLETED = 'payment.completed'
+FEEDBACK_REPLIED = 'feedback.replied'
+
+_handlers = defaultdict(list)
+_local = threading.local()
+
+
+class Event:
+    __slots__ = ('name', 'payload')
+
+    def __init__(self, name, payload):
+        self.name = name
+        self.payload = payload
+
+    def __repr__(self):
+        return f'<Event {self.name} {self.payload!r}>'
+
+
+class Batch:
+    """Events waiting for one transaction (or savepoint) to commit."""
+
+    def __init__(self, key):
+        self.key = key
+        self.events = []
+
+    def __call__(self):
+        batches = getattr(_local, 'batches', {})
+        if batches.get(self.key) is self:
+            del batches[self.key]
+        events, self.events = self.events, []
+        dispatch(events)
+
+
+def subscribe(name, handler):
+    """Call ``handler(events)`` with every committed batch of ``name`` events."""
+    if handler not in _handlers[name]:
+        _handlers[name].append(handler)
+
+
+def dispatch(events):
+    """Deliver events to their handlers, grouped by name in publish order."""
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[event.name].append(event)
+    for name, batch in grouped.items():
+        for handler in _handlers.get(name, ()):
+            try:
+                handler(batch)
+            except Exception:
+                logger.exception('Event handler %r failed for %d %s event(s)', handler, len(batch), name)
+
+
+def _current_batch(using):
+    """The batch registered for the current savepoint, if it is still pending."""
+    connection = transaction.get_connection(using)
+    key = (using, tuple(connection.savepoint_ids))
+    batches = getattr(_local, 'batches', None)
+    if batches is None:
+        batches = _local.batches = {}
+
+    batch = batches.get(key)
+    pending = {id(callback) for _, callback, _ in connection.run_on_commit}
+    if batch is not None and id(batch) in pending:
+        return batch
+
+    # A committed batch removes itself; one whose callback a rollback
+    # discarded is dropped here, so savepoint keys don't pile up per thread
+    for stale in [stale for stale, old in batches.items() if stale[0] == using and id(old) not in pending]:
+        del batches[stale]
+    batch = batches[key] = Batch(key)
+    transaction.on_commit(batch, using=using)
+    return batch
+
+
+def publish(name, using=DEFAULT_DB_ALIAS, **payload):
+    """Queue an event for delivery after the current transaction commits."""
+    event = Event(name, payload)
+    if not transaction.get_connection(using).in_atomic_block:
+        dispatch([event])
+        return
+    _current_batch(using).events.append(event)
@@ -0,0 +1,129 @@
+"""
+Streaming exports of list endpoints, as CSV or (when openpyxl is installed) XLSX.
+
+Rows come from the serializer's fast plan, i.e. ``.values()`` with the same
+camelCase columns as the JSON list, read in keyset batches of
+``EXPORT_CHUNK_SIZE`` (``pk > last`` ordered by pk), so nothing holds the
+whole result. ``.iterator()`` wouldn't do: mysqlclient fetches the entire
+result set into the client before the first row comes back.
+
+CSV is written to the client as it is produced: the header goes out before
+the first batch is fetched. Under ASGI the body is an async iterator that
+runs each step in the request's sync thread; Django would otherwise collect
+a sync iterator into a list before sending it. XLSX can't be streamed
+either way (the archive is only complete once every row is in), so it is
+built in openpyxl's write-only mode into a temporary file and sent from
+there.
+"""
+import csv
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+FILE_TYPES = ('csv', 'xlsx')
+
+# Rows per chunk written to the response
+CSV_BATCH_ROWS = 200
+
+
+class Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+    
+    def write(self, value):
+        return value
+
+
+def cell(value):
+    """Flatten a serialized value into a spreadsheet cell."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def header_and_rows(serializer_class, queryset, context=None):
+    """Column names, and a generator of rows read from the database in pk-ordered batches."""
+    plan = serializer_class.fast_plan(queryset.model, context)
+    values = serializer_class.fast_values(queryset, extra=('pk',)).order_by('pk')
+    size = settings.EXPORT_CHUNK_SIZE
+    
+    def rows():
+        last = None
+        while True:
+            batch = values if last is None else values.filter(pk__gt=last)
+            batch = list(batch[:size])
+            for row in batch:
+                yield [cell(convert(row[lookup])) for _, lookup, convert in plan]
+            if len(batch) < size:
+                return
+            last = batch[-1]['pk']
+    
+    return [key for key, _, _ in plan], rows()
+
+
+async def aiterate(iterator):
+    """``iterator`` as an async iterator, advanced in the request's sync thread."""
+    step = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (item := await step(iterator, done)) is not done:
+        yield item
+
+
+def csv_response(header, rows, filename, asynchronous=False):
+    writer = csv.writer(Echo())
+    
+    def stream():
+        # The BOM makes Excel read the file as UTF-8
+        yield '\ufeff' + writer.writerow(header)
+        batch = []
+        for row in rows:
+            batch.append(writer.writerow(row))
+            if len(batch) == CSV_BATCH_ROWS:
+                yield ''.join(batch)
+                batch = []
+        if batch:
+            yield ''.join(batch)
+    
+    body = aiterate(stream()) if asynchronous else stream()
+    response = StreamingHttpResponse(body, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_response(header, rows, filename, title):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output, as_attachment=True, filename=f'{filename}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def response(serializer_class, queryset, context, file_type, name, asynchronous=False):
+    """
+    Export ``queryset`` as ``file_type`` (one of FILE_TYPES) under ``name``-<date>.
+    ``asynchronous`` streams CSV with an async iterator, for requests served by ASGI.
+    """
+    header, rows = header_and_rows(serializer_class, queryset, context)
+    filename = f'{name}-{timezone.localdate().isoformat()}'
+    if file_type == 'xlsx':
+        return xlsx_response(header, rows, filename, name)
+    return csv_response(header, rows, filename, asynchronous)
@@ -0,0 +1,104 @@
+"""
+Microbenchmark for the camelCase key translation in CamelCaseSerializerMixin.
+Usage: python manage.py bench_camelcase [--rows 5000] [--repeat 5]
+
+Compares the per-row cost of the original per-key string/regex conversion
+with the precompiled per-class tables. Runs entirely in memory.
+"""
+import timeit
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.serializers import CamelCaseSerializerMixin
+from hostel.models import Hosteler
+from hostel.serializers import HostelerSerializer
+
+
+def legacy_camelize(snake_str):
+    """Original CamelCaseSerializerMixin._camelize."""
+    if not snake_str or '_' not in snake_str:
+        return snake_str
+    components = snake_str.split('_')
+    return components[0] + ''.join(x.title() for x in components[1:])
+
+
+def legacy_snake_case(camel_str):
+    """Original CamelCaseSerializerMixin._snake_case (re imported per call)."""
+    import re
+    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', camel_str)
+    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks camelCase key translation per row, before and after precompiled tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        serializer = HostelerSerializer()
+        snake_row = {name: None for name in serializer.fields}
+        camel_row = {legacy_camelize(name): None for name in serializer.fields}
+        to_camel, to_snake = serializer._get_name_maps()
+
+        # Sanity check: the tables must produce exactly what the old code did
+        assert {to_camel[k]: v for k, v in snake_row.items()} == camel_row
+        assert {to_snake[k]: v for k, v in camel_row.items()} == {legacy_snake_case(k): None for k in camel_row}
+
+        def legacy_out():
+            for _ in range(rows):
+                {legacy_camelize(key): value for key, value in snake_row.items()}
+
+        def table_out():
+            for _ in range(rows):
+                {to_camel[key] if key in to_camel else serializer._camelize(key): value
+                 for key, value in snake_row.items()}
+
+        def legacy_in():
+            for _ in range(rows):
+                {legacy_snake_case(key): value for key, value in camel_row.items()}
+
+        def table_in():
+            for _ in range(rows):
+                {to_snake[key] if key in to_snake else serializer._snake_case(key): value
+                 for key, value in camel_row.items()}
+
+        self.stdout.write(f'{len(snake_row)} fields per row, {rows} rows, best of {repeat}')
+        self.report('to_representation keys', legacy_out, table_out, rows, repeat)
+        self.report('to_internal_value keys', legacy_in, table_in, rows, repeat)
+        self.report_full_serializer(rows, repeat)
+
+    def report(self, label, before, after, rows, repeat):
+        before_us = min(timeit.repeat(before, number=1, repeat=repeat)) / rows * 1e6
+        after_us = min(timeit.repeat(after, number=1, repeat=repeat)) / rows * 1e6
+        self.stdout.write(
+            f'{label:<26} before {before_us:8.2f} us/row   after {after_us:8.2f} us/row   '
+            f'({before_us / after_us:.1f}x)'
+        )
+
+    def report_full_serializer(self, rows, repeat):
+        """End-to-end HostelerSerializer(many=True) on unsaved instances, old vs new key step."""
+        instances = [
+            Hosteler(
+                pk=i, hosteler_id=f'H{2024001 + i}', name='Bench Student', gender='male', age=20,
+                mobile='9876543210', email='bench@example.com', registration_date=date(2024, 1, 1),
+            )
+            for i in range(rows)
+        ]
+
+        class LegacyHostelerSerializer(HostelerSerializer):
+            def to_representation(self, instance):
+                data = super(CamelCaseSerializerMixin, self).to_representation(instance)
+                return {legacy_camelize(key): value for key, value in data.items()}
+
+        self.report(
+            'full serializer',
+            lambda: LegacyHostelerSerializer(instances, many=True).data,
+            lambda: HostelerSerializer(instances, many=True).data,
+            rows, repeat,
+        )
@@ -0,0 +1,140 @@
+"""
+API benchmark against a throwaway database.
+Usage: python manage.py benchmark_api [--iterations 20] [--budgets path] [--scale N] [--write-budgets]
+                                      [--configured-db] [--json]
+
+Creates an in-memory SQLite test database, whatever DATABASES says, so that
+runs are comparable with the stored budgets on any machine. It then loads
+the fixed synthetic dataset from the budgets file, and requests each endpoint as a warden and as a student. Prints p50/p95
+latency, query count (warm, and of the untimed first request), rows and
+response size per endpoint, and exits with an error if any of them is over
+its stored budget. ``--configured-db`` creates the test database on the
+configured backend (e.g. MySQL) instead; budgets aren't checked then. The
+configured database itself is never touched.
+"""
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.utils import ConnectionHandler
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core import benchmark
+
+# Keeps benchmark payloads out of a shared cache and starts every run cold
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-api',
+    }
+}
+
+
+# Budgets are recorded on this, not on the configured database
+BENCHMARK_DATABASE = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks API endpoints on a synthetic dataset and checks them against stored budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, help='Requests per endpoint and role (default from the budgets file)')
+        parser.add_argument('--budgets', default=str(benchmark.BUDGETS_FILE), help='Budgets JSON file')
+        parser.add_argument('--scale', type=int, help='Dataset scale instead of the budgeted one (skips the budget check)')
+        parser.add_argument('--write-budgets', action='store_true', help='Record this run as the new budgets')
+        parser.add_argument('--configured-db', action='store_true',
+                            help='Benchmark on the configured database backend instead of SQLite (skips the budget check)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            budgets = benchmark.load_budgets(options['budgets'])
+        except FileNotFoundError:
+            if not options['write_budgets']:
+                raise CommandError(f"No budgets file at {options['budgets']}; run with --write-budgets first")
+            budgets = {}
+        except ValueError as exc:
+            raise CommandError(f"Can't read {options['budgets']}: {exc}")
+
+        budgeted = {**benchmark.DATASET, **budgets.get('dataset', {})}
+        dataset = dict(budgeted)
+        if options['scale'] is not None:
+            if options['scale'] < 1:
+                raise CommandError('--scale must be at least 1')
+            dataset['scale'] = options['scale']
+        iterations = options['iterations'] or budgets.get('iterations', 20)
+        if iterations < 1:
+            raise CommandError('--iterations must be at least 1')
+        if options['configured_db'] and options['write_budgets']:
+            raise CommandError('Budgets are recorded on SQLite; drop --configured-db to write them')
+
+        results = self.run(dataset, iterations, options['verbosity'], options['configured_db'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        else:
+            self.report(results)
+
+        if options['write_budgets']:
+            with open(options['budgets'], 'w') as f:
+                json.dump(benchmark.make_budgets(results, dataset, iterations), f, indent=2)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Budgets written to {options['budgets']}"))
+            return
+        if dataset != budgeted:
+            self.stdout.write(self.style.WARNING('Dataset differs from the budgeted one; budgets not checked'))
+            return
+        if options['configured_db']:
+            self.stdout.write(self.style.WARNING('Budgets are for SQLite; not checked on the configured database'))
+            return
+
+        failures = benchmark.check(results, budgets)
+        if failures:
+            raise CommandError('Over budget:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} endpoint(s) within budget'))
+
+    def run(self, dataset, iterations, verbosity, configured_db=False):
+        if not configured_db:
+            # Replaces this thread's default connection; ``connection`` follows it
+            connections[DEFAULT_DB_ALIAS] = ConnectionHandler({DEFAULT_DB_ALIAS: BENCHMARK_DATABASE})[DEFAULT_DB_ALIAS]
+        try:
+            return self.run_on_test_db(dataset, iterations, verbosity)
+        finally:
+            if not configured_db:
+                # The next use opens the configured connection again
+                del connections[DEFAULT_DB_ALIAS]
+
+    def run_on_test_db(self, dataset, iterations, verbosity):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        try:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                # One process, so the local cache counts as shared
+                with override_settings(CACHES=BENCHMARK_CACHES, CACHE_SHARED=True):
+                    self.stdout.write(f"Seeding scale {dataset['scale']} (seed {dataset['seed']}, as of {dataset['asOf']})...")
+                    credentials = benchmark.seed(
+                        dataset['scale'], dataset['seed'], dataset['years'], date.fromisoformat(dataset['asOf']),
+                        log=self.stdout.write if verbosity > 1 else None,
+                    )
+                    self.stdout.write(f'Running {iterations} request(s) per endpoint and role...')
+                    try:
+                        return benchmark.run(credentials, iterations)
+                    except benchmark.BenchmarkError as exc:
+                        raise CommandError(str(exc))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+
+    def report(self, results):
+        self.stdout.write(f"{'endpoint':<30} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'cold':>5} {'rows':>7} {'bytes':>10}")
+        for key, result in results.items():
+            queries = str(result['queries'])
+            if 'page1_queries' in result:
+                queries += f"/{result['page1_queries']}"
+            self.stdout.write(
+                f"{key:<30} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {queries:>8} "
+                f"{result['cold_queries']:>5} {result['rows']:>7} {result['bytes']:>10}"
+            )
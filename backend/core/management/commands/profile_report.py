@@ -0,0 +1,158 @@
+"""
+Management command to summarize request captures from core.sampling.
+Usage: python manage.py profile_report [--file path] [--top 20] [--sort self|total] [--endpoint name] [--reason slow|sampled] [--json]
+
+Reads the capture file and its rotated backups and prints the top endpoints
+by time spent in captured requests, and the top functions by self or total
+time across them.
+"""
+import json
+import math
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def capture_files(path):
+    """The rotated backups, oldest first, then the live file."""
+    backups = []
+    index = 1
+    while os.path.exists(f'{path}.{index}'):
+        backups.append(f'{path}.{index}')
+        index += 1
+    files = list(reversed(backups))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_captures(paths):
+    """(captures, number of unreadable lines)."""
+    captures = []
+    bad = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    capture = json.loads(line)
+                except ValueError:
+                    bad += 1
+                    continue
+                if isinstance(capture, dict) and 'endpoint' in capture:
+                    captures.append(capture)
+                else:
+                    bad += 1
+    return captures, bad
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def by_endpoint(captures):
+    grouped = defaultdict(list)
+    for capture in captures:
+        grouped[capture['endpoint']].append(capture)
+    rows = []
+    for endpoint, items in grouped.items():
+        totals = [item['totalMs'] for item in items]
+        rows.append({
+            'endpoint': endpoint,
+            'captures': len(items),
+            'slow': sum(1 for item in items if item.get('reason') == 'slow'),
+            'sampled': sum(1 for item in items if item.get('reason') == 'sampled'),
+            'totalMs': round(sum(totals), 2),
+            'p50Ms': percentile(totals, 0.5),
+            'maxMs': max(totals),
+            'avgQueries': round(sum(item.get('queries', 0) for item in items) / len(items), 1),
+            'sqlShare': round(sum(item.get('sqlMs', 0) for item in items) / (sum(totals) or 1), 3),
+        })
+    return sorted(rows, key=lambda row: -row['totalMs'])
+
+
+def by_function(captures, sort):
+    functions = {}
+    for capture in captures:
+        for item in capture.get('functions', []):
+            row = functions.setdefault(item['function'], {
+                'function': item['function'], 'captures': 0, 'calls': 0, 'selfMs': 0.0, 'totalMs': 0.0,
+                'endpoints': set(),
+            })
+            row['captures'] += 1
+            row['calls'] += item.get('calls') or 0
+            row['selfMs'] += item['selfMs']
+            row['totalMs'] += item['totalMs']
+            row['endpoints'].add(capture['endpoint'])
+    rows = sorted(functions.values(), key=lambda row: -row[f'{sort}Ms'])
+    for row in rows:
+        row['selfMs'] = round(row['selfMs'], 2)
+        row['totalMs'] = round(row['totalMs'], 2)
+        row['endpoints'] = sorted(row['endpoints'])
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Top endpoints and functions from slow and sampled request captures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Capture file (default PROFILE_CAPTURE_FILE); rotated backups are read too')
+        parser.add_argument('--top', type=int, default=20, help='Rows per table (default 20)')
+        parser.add_argument('--sort', choices=['self', 'total'], default='self', help='Rank functions by self or total time')
+        parser.add_argument('--endpoint', help='Only captures of this endpoint (URL pattern name)')
+        parser.add_argument('--reason', choices=['slow', 'sampled'], help='Only slow or only sampled captures')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.PROFILE_CAPTURE_FILE
+        files = capture_files(path)
+        if not files:
+            raise CommandError(f'No captures at {path}; set PROFILE_SLOW_MS or PROFILE_SAMPLE_RATE to collect some')
+        if options['top'] < 1:
+            raise CommandError('--top must be at least 1')
+
+        captures, bad = read_captures(files)
+        if options['endpoint']:
+            captures = [capture for capture in captures if capture['endpoint'] == options['endpoint']]
+        if options['reason']:
+            captures = [capture for capture in captures if capture.get('reason') == options['reason']]
+
+        top = options['top']
+        endpoints = by_endpoint(captures)[:top]
+        functions = by_function(captures, options['sort'])[:top]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'captures': len(captures), 'unreadable': bad, 'endpoints': endpoints, 'functions': functions,
+            }, indent=2))
+            return
+
+        self.stdout.write(f'{len(captures)} capture(s) from {len(files)} file(s)')
+        if bad:
+            self.stdout.write(self.style.WARNING(f'{bad} unreadable line(s) skipped'))
+        if not captures:
+            return
+
+        self.stdout.write('')
+        self.stdout.write(f'Top {len(endpoints)} endpoint(s) by captured time')
+        self.stdout.write(
+            f"{'endpoint':<34} {'captures':>8} {'slow':>5} {'sampled':>7} {'total ms':>11} "
+            f"{'p50 ms':>9} {'max ms':>9} {'queries':>8} {'sql':>5}"
+        )
+        for row in endpoints:
+            self.stdout.write(
+                f"{row['endpoint'][:34]:<34} {row['captures']:>8} {row['slow']:>5} {row['sampled']:>7} "
+                f"{row['totalMs']:>11.1f} {row['p50Ms']:>9.1f} {row['maxMs']:>9.1f} "
+                f"{row['avgQueries']:>8.1f} {row['sqlShare']:>5.0%}"
+            )
+
+        self.stdout.write('')
+        self.stdout.write(f"Top {len(functions)} function(s) by {options['sort']} time")
+        self.stdout.write(f"{'self ms':>10} {'total ms':>10} {'calls':>8} {'captures':>8}  function")
+        for row in functions:
+            self.stdout.write(
+                f"{row['selfMs']:>10.1f} {row['totalMs']:>10.1f} {row['calls'] or '':>8} {row['captures']:>8}  "
+                f"{row['function']}"
+            )
@@ -0,0 +1,16 @@
+"""
+Management command to drop tombstones older than the sync retention window.
+Usage: python manage.py prune_tombstones
+"""
+from django.core.management.base import BaseCommand
+from core.sync import prune_tombstones, get_retention
+
+
+class Command(BaseCommand):
+    help = 'Deletes delta-sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS'
+    
+    def handle(self, *args, **options):
+        count = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f'Pruned {count} tombstones older than {get_retention().days} days'
+        ))
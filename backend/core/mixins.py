@@ -0,0 +1,62 @@
+"""
+Reusable viewset mixins.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+class FastListModelMixin:
+    """
+    List action that serializes through ``CamelCaseModelSerializer.fast_list``.
+    Output is identical to the default ModelViewSet list, but rows are read
+    with ``.values()`` instead of being loaded as model instances.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        # Keyset pagination reads each row's position from its ordering columns
+        position_fields = ()
+        if hasattr(self.paginator, 'get_position_fields'):
+            position_fields = self.paginator.get_position_fields(queryset.model)
+        rows = serializer_class.fast_values(queryset, extra=position_fields)
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            data = serializer_class.fast_rows(page, context, queryset.model)
+            return self.get_paginated_response(data)
+        
+        return Response(serializer_class.fast_rows(rows, context, queryset.model))
+
+
+class ExportModelMixin:
+    """
+    ``export`` action: the list endpoint's rows (same role filtering, same
+    camelCase columns) streamed as a file.
+    GET /api/<resource>/export/?fileType=csv|xlsx
+    
+    The parameter isn't called ``format``: DRF reserves that one for picking
+    a renderer.
+    """
+    export_name = None  # file name prefix; defaults to the model's table name
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        from core import export
+        file_type = request.query_params.get('fileType', 'csv')
+        if file_type not in export.FILE_TYPES:
+            return Response({'error': f"fileType must be one of: {', '.join(export.FILE_TYPES)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if file_type == 'xlsx' and export.openpyxl is None:
+            return Response({'error': 'XLSX export needs openpyxl installed; use fileType=csv'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        name = self.export_name or queryset.model._meta.db_table
+        return export.response(
+            self.get_serializer_class(), queryset, self.get_serializer_context(), file_type, name,
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
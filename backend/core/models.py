@@ -0,0 +1,47 @@
+"""
+Shared models used across apps.
+"""
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Marker left behind when a synced row is deleted.
+    Lets delta syncs of /api/hostel-data/ tell clients which rows to drop.
+    """
+    # Collection name as used in the hostel-data payload (e.g. 'hostelers')
+    collection = models.CharField(max_length=50)
+    
+    # API identifier of the deleted row (H2024001, OP0001, P2024001, pk)
+    object_id = models.CharField(max_length=50)
+    
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'tombstones'
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['deleted_at', 'collection'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.collection}:{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M:%S}"
+
+
+class Sequence(models.Model):
+    """
+    Named counter used to mint human-readable IDs (hosteler_id, invoice_no).
+    ``value`` is the last number handed out; see core.sequences.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'sequences'
+        verbose_name = 'Sequence'
+        verbose_name_plural = 'Sequences'
+    
+    def __str__(self):
+        return f"{self.name} = {self.value}"
@@ -0,0 +1,181 @@
+"""
+Keyset (cursor) pagination for append-only history lists.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the model's default ordering plus ``id`` as a
+    tiebreaker, e.g. ``(-issued_on, -id)`` for outpasses.
+
+    Each page is fetched with ``WHERE (issued_on, id) < (last seen)`` instead of
+    ``OFFSET``, and no ``COUNT(*)`` is run, so page 500 costs the same as page 1.
+
+    Response format: ``{"next": url, "previous": url, "results": [...]}``.
+    Requests that pass ``?page=N``, or any request when the KEYSET_PAGINATION
+    setting is off, get the old page-number format instead.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    legacy_class = PageNumberPagination
+
+    def __init__(self):
+        self.legacy = None
+
+    def get_ordering(self, model):
+        """Return [(field name, descending)] ending with the ``id`` tiebreaker."""
+        ordering = [
+            (name.lstrip('-'), name.startswith('-'))
+            for name in model._meta.ordering
+            if isinstance(name, str)
+        ]
+        if not any(name in ('id', 'pk') for name, _ in ordering):
+            ordering.append(('id', ordering[0][1] if ordering else False))
+        return ordering
+
+    def get_position_fields(self, model):
+        """Columns a row must carry for its position to be read (see FastListModelMixin)."""
+        return [name for name, _ in self.get_ordering(model)]
+
+    def use_page_numbers(self, request):
+        return 'page' in request.query_params or not getattr(settings, 'KEYSET_PAGINATION', True)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_page_numbers(request):
+            self.legacy = self.legacy_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(self.model)
+
+        position, reverse = self.decode_cursor(request)
+
+        # Walking backwards flips every comparison and the sort direction
+        order_by = [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = position is not None, has_more
+
+        self.next_position = self.get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = self.get_position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def after(self, position, reverse=False):
+        """
+        Build the keyset predicate for rows strictly past ``position``:
+        ``a < v1 OR (a = v1 AND id < v2)`` for a descending ``(a, id)`` ordering.
+        """
+        clauses = []
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {
+                prior: position[i]
+                for i, (prior, _) in enumerate(self.ordering[:index])
+            }
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, clauses)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.ordering]
+        return [getattr(row, name) for name, _ in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        values = [
+            value.isoformat() if isinstance(value, (date, datetime))
+            else str(value) if isinstance(value, Decimal)
+            else value
+            for value in position
+        ]
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Return (position, reverse) from the request, or (None, False) for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError(encoded)
+            position = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,240 @@
+"""
+Per-request profile: SQL, serialization, JWT auth and rendering.
+
+With ``REQUEST_PROFILING`` on, every database connection gets an execute
+wrapper that reports to the profile of the request being handled (held in
+a context variable, so it also follows async views' sync_to_async calls to
+their worker threads). For each request it counts the queries,
+their total time, exact duplicates (same SQL and parameters) and repeats of
+the same statement with different parameters (the N+1 shape). Code that
+does other work worth separating marks it with ``timed(name)``; the
+serializers, the JWT authentication class and response rendering already
+do. Spans are self-time: SQL run inside a span is counted under ``db``
+only, so the numbers add up to no more than ``total``.
+
+Each profiled response gets a ``Server-Timing`` header (unless
+``REQUEST_PROFILING_HEADERS`` is off) and one log line on the
+``core.profiling`` logger, as JSON and as ``extra={'profile': ...}``.
+With profiling off the middleware removes itself at startup and ``timed``
+is a context-variable lookup.
+
+Streaming responses are profiled up to the point the response is returned;
+queries made while the body streams aren't counted.
+"""
+import json
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Order of the Server-Timing entries after db
+SPANS = ('auth', 'serialize', 'render')
+
+# Longest SQL text put in the log line
+SQL_PREVIEW = 300
+
+_current = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """What one request spent; also the execute_wrapper that counts its SQL."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.params = Counter()
+        self.spans = defaultdict(float)
+        self.active = set()
+        self.log = []
+        self.started = perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.db_time += elapsed
+            self.log.append((sql, elapsed))
+            self.queries += 1
+            self.statements[sql] += 1
+            if not many:
+                self.params[sql, repr(params)] += 1
+
+    def begin(self, name):
+        """Start a span; returns the token end() needs, or None if ``name`` is already running."""
+        if name in self.active:
+            return None
+        self.active.add(name)
+        return perf_counter(), self.db_time
+
+    def end(self, name, token):
+        if token is None:
+            return
+        start, db_time = token
+        self.active.discard(name)
+        self.spans[name] += (perf_counter() - start) - (self.db_time - db_time)
+
+    @property
+    def duplicates(self):
+        """Executions that repeated an earlier query exactly."""
+        return sum(count - 1 for count in self.params.values())
+
+    @property
+    def similar(self):
+        """Executions that repeated an earlier statement, whatever the parameters."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def most_repeated(self):
+        """(sql, count) of the statement run most often, if any ran more than once."""
+        if not self.statements:
+            return None
+        sql, count = self.statements.most_common(1)[0]
+        return (sql, count) if count > 1 else None
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """Add record_query to a connection's execute wrappers (once; they outlive reconnects)."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_open():
+    """Install record_query on this thread's connections that are already set up."""
+    for connection in connections.all(initialized_only=True):
+        install(connection=connection)
+
+
+def watch_connections():
+    """Install record_query on every connection, including those opened from now on."""
+    connection_created.connect(install, dispatch_uid='request-profiling')
+    install_open()
+
+
+def current():
+    """The profile of the request being handled, or None when not profiling."""
+    return _current.get()
+
+
+@contextmanager
+def activate():
+    """The current request's profile, starting one if an outer middleware hasn't."""
+    profile = _current.get()
+    if profile is not None:
+        yield profile
+        return
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Count the enclosed block's time (less its SQL) under ``name`` in the current profile."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    token = profile.begin(name)
+    try:
+        yield
+    finally:
+        profile.end(name, token)
+
+
+def server_timing(profile, total):
+    entries = [
+        f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries, {profile.duplicates} duplicate"',
+    ]
+    entries += [f'{name};dur={profile.spans[name] * 1000:.2f}' for name in SPANS if name in profile.spans]
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def summary(request, response, profile, total):
+    """The structured log record for one request."""
+    match = getattr(request, 'resolver_match', None)
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'totalMs': round(total * 1000, 2),
+        'dbMs': round(profile.db_time * 1000, 2),
+        'queries': profile.queries,
+        'duplicateQueries': profile.duplicates,
+        'similarQueries': profile.similar,
+    }
+    for name in SPANS:
+        record[f'{name}Ms'] = round(profile.spans.get(name, 0.0) * 1000, 2)
+    repeated = profile.most_repeated()
+    if repeated:
+        record['mostRepeated'] = {'sql': repeated[0][:SQL_PREVIEW], 'count': repeated[1]}
+    return record
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles each request as described in the module docstring. Goes first
+    in MIDDLEWARE so ``total`` covers the rest of the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        watch_connections()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before the signal was connected
+        install_open()
+        with activate() as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        with activate() as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total = perf_counter() - profile.started
+        if getattr(settings, 'REQUEST_PROFILING_HEADERS', True):
+            response['Server-Timing'] = server_timing(profile, total)
+        record = summary(request, response, profile, total)
+        logger.info(json.dumps(record), extra={'profile': record})
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that as its own span
+        profile = _current.get()
+        if profile is not None:
+            token = profile.begin('render')
+            response.add_post_render_callback(lambda rendered: profile.end('render', token))
+        return response
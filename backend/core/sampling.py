@@ -0,0 +1,342 @@
+"""
+Captures of slow and sampled requests, for finding what to optimize.
+
+SamplingProfilerMiddleware writes a capture for:
+
+- one request in ``PROFILE_SAMPLE_RATE``, run under cProfile;
+- any request slower than ``PROFILE_SLOW_MS``, with stack samples taken
+  every ``PROFILE_STACK_INTERVAL_MS`` by a background thread. Sampling of a
+  request starts once it has run for half the threshold, so fast requests
+  are never walked.
+
+A capture holds the endpoint (URL pattern name), timings, the SQL statements
+with their durations (from core.profiling's per-request profile) and the
+busiest functions, each with self and total milliseconds. It is one JSON
+line in ``PROFILE_CAPTURE_FILE``, which rotates at
+``PROFILE_CAPTURE_MAX_BYTES`` and keeps ``PROFILE_CAPTURE_BACKUPS`` old
+files. ``manage.py profile_report`` aggregates them.
+
+Only sync views are profiled (all DRF views are). Under ASGI they run in a
+worker thread; process_view runs in that same thread, so that is where the
+profiler starts and which thread is sampled. The async notification stream
+and long-poll views are meant to be slow and are skipped.
+
+Samples and cProfile are per thread, and under ASGI every sync view runs in
+the same one. A request whose view starts while an earlier request on that
+thread is still being watched (its response hasn't finished yet) is not
+captured, rather than having its stacks and profile mixed into the other's.
+Under ASGI, then, fewer requests are captured than the settings ask for;
+WSGI workers have a thread per request and capture all of them.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+from time import perf_counter, sleep
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+from core import profiling
+
+capture_log = logging.getLogger('core.sampling.captures')
+
+# Functions kept per capture: the busiest by self time plus the busiest by total time
+FUNCTIONS_PER_CAPTURE = 40
+
+STATEMENTS_PER_CAPTURE = 200
+
+STACKS_PER_CAPTURE = 10
+
+MAX_STACK_DEPTH = 64
+
+SQL_PREVIEW = 1000
+
+# "<function f at 0x7f...>": the address differs between processes
+_ADDRESS = re.compile(r' at 0x[0-9a-f]+')
+
+
+def short_path(filename):
+    """File names relative to the project, or to site-packages for libraries."""
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    _, packages, rest = filename.rpartition('site-packages' + os.sep)
+    return rest if packages else filename
+
+
+def function_name(filename, line, name):
+    """pstats-style ``file:line(function)``; built-ins are just their name."""
+    if filename == '~':
+        return _ADDRESS.sub('', name)
+    return f'{short_path(filename)}:{line}({name})'
+
+
+def busiest(functions):
+    """The FUNCTIONS_PER_CAPTURE busiest by self time, plus those by total time."""
+    by_self = sorted(functions, key=lambda item: -item['selfMs'])[:FUNCTIONS_PER_CAPTURE]
+    by_total = sorted(functions, key=lambda item: -item['totalMs'])[:FUNCTIONS_PER_CAPTURE]
+    kept = {item['function']: item for item in by_self + by_total}
+    return sorted(kept.values(), key=lambda item: -item['selfMs'])
+
+
+def profiled_functions(profiler):
+    functions = []
+    for (filename, line, name), (_, calls, self_time, total, _) in pstats.Stats(profiler).stats.items():
+        functions.append({
+            'function': function_name(filename, line, name),
+            'calls': calls,
+            'selfMs': round(self_time * 1000, 3),
+            'totalMs': round(total * 1000, 3),
+        })
+    return busiest(functions)
+
+
+def sampled_functions(samples, interval):
+    """Self/total time per function estimated from stack samples (root first)."""
+    own = Counter()
+    inclusive = Counter()
+    for stack, count in samples.items():
+        own[stack[-1]] += count
+        for function in set(stack):
+            inclusive[function] += count
+    return busiest([
+        {
+            'function': function,
+            'calls': None,
+            'selfMs': round(own[function] * interval * 1000, 3),
+            'totalMs': round(count * interval * 1000, 3),
+        }
+        for function, count in inclusive.items()
+    ])
+
+
+def stack_of(frame):
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(function_name(code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class Capture:
+    """One request being watched."""
+
+    def __init__(self, sampled):
+        self.started = perf_counter()
+        self.sampled = sampled
+        self.skip = False
+        self.thread = None
+        self.profiler = None
+        self.samples = Counter()
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of registered request threads every ``interval``
+    seconds, once a request has run for ``delay`` seconds. Sleeps while no
+    request is registered.
+    """
+
+    def __init__(self, interval, delay):
+        super().__init__(name='request-stack-sampler', daemon=True)
+        self.interval = interval
+        self.delay = delay
+        self.watched = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+
+    def add(self, capture):
+        with self.lock:
+            self.watched[capture.thread] = capture
+        self.wake.set()
+
+    def remove(self, capture):
+        with self.lock:
+            if self.watched.get(capture.thread) is capture:
+                del self.watched[capture.thread]
+
+    def run(self):
+        while True:
+            if not self.watched:
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            sleep(self.interval)
+            now = perf_counter()
+            with self.lock:
+                due = [capture for capture in self.watched.values() if now - capture.started >= self.delay]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            stacks = [(capture, stack_of(frames[capture.thread])) for capture in due if capture.thread in frames]
+            # finish() reads the counters from the request thread
+            with self.lock:
+                for capture, stack in stacks:
+                    capture.samples[stack] += 1
+
+    def samples(self, capture):
+        """A copy of ``capture``'s samples, safe to read while sampling goes on."""
+        with self.lock:
+            return Counter(capture.samples)
+
+
+def capture_writer():
+    """The rotating file handler for captures, set up once per process."""
+    if not capture_log.handlers:
+        path = settings.PROFILE_CAPTURE_FILE
+        # A bare file name is relative to the working directory, which exists
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=settings.PROFILE_CAPTURE_MAX_BYTES,
+            backupCount=settings.PROFILE_CAPTURE_BACKUPS, delay=True, encoding='utf-8',
+        )
+        capture_log.addHandler(handler)
+        capture_log.setLevel(logging.INFO)
+        capture_log.propagate = False
+    return capture_log
+
+
+class SamplingProfilerMiddleware:
+    """
+    Writes captures of slow and sampled requests (see the module docstring).
+    Goes right after core.profiling.RequestProfilingMiddleware, whose
+    per-request profile it shares when that is on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.slow = getattr(settings, 'PROFILE_SLOW_MS', 0) / 1000
+        self.rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+        if not self.slow and not self.rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.interval = settings.PROFILE_STACK_INTERVAL_MS / 1000
+        self.sampler = None
+        if self.slow:
+            self.sampler = StackSampler(self.interval, self.slow / 2)
+            self.sampler.start()
+        self.writer = capture_writer()
+        # Threads with a watched request, so a second request on one of them is left alone
+        self.threads = set()
+        self.lock = threading.Lock()
+        profiling.watch_connections()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profiling.install_open()
+        with profiling.activate() as profile:
+            capture = self.start(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                self.stop(capture)
+        self.finish(request, response, profile, capture)
+        return response
+
+    async def __acall__(self, request):
+        with profiling.activate() as profile:
+            capture = self.start(request)
+            try:
+                response = await self.get_response(request)
+            finally:
+                if capture.profiler:
+                    # The profiler has to be stopped from the view's thread
+                    await sync_to_async(self.stop, thread_sensitive=True)(capture)
+                else:
+                    self.stop(capture)
+        self.finish(request, response, profile, capture)
+        return response
+
+    def start(self, request):
+        capture = Capture(sampled=bool(self.rate) and random.random() * self.rate < 1)
+        request._profile_capture = capture
+        return capture
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        capture = getattr(request, '_profile_capture', None)
+        if capture is None:
+            return None
+        if iscoroutinefunction(view_func):
+            capture.skip = True
+            return None
+        thread = threading.get_ident()
+        with self.lock:
+            if thread in self.threads:
+                capture.skip = True
+                return None
+            self.threads.add(thread)
+        capture.thread = thread
+        if capture.sampled:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                capture.profiler = profiler
+            except ValueError:
+                # Another profiler is active (Python 3.12+ allows one per process)
+                capture.sampled = False
+        if not capture.profiler and self.sampler:
+            self.sampler.add(capture)
+        return None
+
+    def stop(self, capture):
+        if capture.profiler:
+            capture.profiler.disable()
+        if capture.thread is None:
+            return
+        if self.sampler:
+            self.sampler.remove(capture)
+        with self.lock:
+            self.threads.discard(capture.thread)
+
+    def finish(self, request, response, profile, capture):
+        total = perf_counter() - capture.started
+        if capture.skip or capture.thread is None:
+            return
+        samples = self.sampler.samples(capture) if self.sampler else capture.samples
+        if capture.profiler:
+            reason, functions = 'sampled', profiled_functions(capture.profiler)
+        elif self.slow and total >= self.slow:
+            reason, functions = 'slow', sampled_functions(samples, self.interval)
+        else:
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'at': timezone.now().isoformat(),
+            'reason': reason,
+            'endpoint': match.view_name if match else request.path,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'totalMs': round(total * 1000, 2),
+            'queries': profile.queries,
+            'sqlMs': round(profile.db_time * 1000, 2),
+            'sql': [
+                {'sql': sql[:SQL_PREVIEW], 'ms': round(elapsed * 1000, 3)}
+                for sql, elapsed in profile.log[:STATEMENTS_PER_CAPTURE]
+            ],
+            'functions': functions,
+        }
+        if samples:
+            record['samples'] = sum(samples.values())
+            record['stacks'] = [
+                {'stack': list(stack), 'samples': count}
+                for stack, count in samples.most_common(STACKS_PER_CAPTURE)
+            ]
+        self.writer.info(json.dumps(record))
@@ -0,0 +1,66 @@
+"""
+Concurrency-safe ID allocation backed by the ``sequences`` counter table.
+
+Every path that mints a hosteler_id or invoice_no goes through ``allocate``,
+which bumps the named counter with a single ``UPDATE ... SET value = value + n``.
+The row lock taken by that UPDATE serializes concurrent allocators, so two
+requests can never receive the same number, and bulk callers reserve a whole
+block of numbers in one round trip.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Sequence
+
+
+def allocate(name, count=1, start=1, seed=None):
+    """
+    Reserve ``count`` consecutive numbers from the named sequence.
+    
+    ``start`` is the first number ever handed out. ``seed`` is an optional
+    callable returning the highest number already in use; it only runs the
+    first time the sequence is created, so existing data is never reissued.
+    Returns a ``range`` of the reserved numbers.
+    """
+    if count < 1:
+        return range(0)
+    
+    with transaction.atomic():
+        updated = Sequence.objects.filter(name=name).update(value=F('value') + count)
+        if not updated:
+            _create(name, max(start - 1, seed() if seed else 0))
+            Sequence.objects.filter(name=name).update(value=F('value') + count)
+        last = Sequence.objects.filter(name=name).values_list('value', flat=True).get()
+    
+    return range(last - count + 1, last + 1)
+
+
+def advance_to(name, value, seed=None):
+    """
+    Make sure the sequence will never hand out ``value`` or anything below it.
+    Call before or after inserting rows with explicitly chosen numbers.
+    ``seed`` works as in ``allocate`` when the sequence doesn't exist yet.
+    """
+    with transaction.atomic():
+        if not Sequence.objects.filter(name=name).update(value=Greatest(F('value'), value)):
+            _create(name, max(value, seed() if seed else 0))
+            Sequence.objects.filter(name=name).update(value=Greatest(F('value'), value))
+
+
+def _create(name, value):
+    """Create the counter row, tolerating a concurrent creator."""
+    try:
+        with transaction.atomic():
+            Sequence.objects.create(name=name, value=value)
+    except IntegrityError:
+        pass
+
+
+def max_code_number(codes, prefix):
+    """Highest numeric suffix among codes like 'H2024001' (used to seed sequences)."""
+    pattern = re.compile(rf'^{re.escape(prefix)}(\d+)$')
+    numbers = [int(match.group(1)) for match in map(pattern.match, codes) if match]
+    return max(numbers, default=0)
@@ -1,25 +1,64 @@
 """
 Core serializers with camelCase transformation for frontend compatibility.
 """
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import FileField as ModelFileField
 from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from core.profiling import timed
+
+_FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
+_ALL_CAP_RE = re.compile('([a-z0-9])([A-Z])')
 
 
 class CamelCaseSerializerMixin:
     """
     Mixin to convert snake_case model fields to camelCase for API responses.
     Frontend expects camelCase format.
+    
+    Field-name translations are computed once per serializer class, the first
+    time it is used, and reused for every row after that.
     """
     
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+    
     def to_representation(self, instance):
         """Convert the response data to camelCase."""
         data = super().to_representation(instance)
-        return {self._camelize(key): value for key, value in data.items()}
+        to_camel = self._get_name_maps()[0]
+        return {
+            to_camel[key] if key in to_camel else self._camelize(key): value
+            for key, value in data.items()
+        }
     
     def to_internal_value(self, data):
         """Convert incoming camelCase data to snake_case for Django models."""
-        snake_case_data = {self._snake_case(key): value for key, value in data.items()}
+        to_snake = self._get_name_maps()[1]
+        snake_case_data = {
+            to_snake[key] if key in to_snake else self._snake_case(key): value
+            for key, value in data.items()
+        }
         return super().to_internal_value(snake_case_data)
     
+    def _get_name_maps(self):
+        """
+        Return this serializer class's (snake -> camel, camel -> snake) tables.
+        Built from the declared fields; unknown keys fall back to the slow path.
+        """
+        maps = type(self).__dict__.get('_camel_case_maps')
+        if maps is None:
+            to_camel = {name: self._camelize(name) for name in self.fields}
+            to_snake = {camel: self._snake_case(camel) for camel in to_camel.values()}
+            maps = (to_camel, to_snake)
+            type(self)._camel_case_maps = maps
+        return maps
+    
     @staticmethod
     def _camelize(snake_str):
         """Convert snake_case to camelCase."""
@@ -31,14 +70,77 @@ class CamelCaseSerializerMixin:
     @staticmethod
     def _snake_case(camel_str):
         """Convert camelCase to snake_case."""
-        import re
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', camel_str)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        s1 = _FIRST_CAP_RE.sub(r'\1_\2', camel_str)
+        return _ALL_CAP_RE.sub(r'\1_\2', s1).lower()
 
 
 class CamelCaseModelSerializer(CamelCaseSerializerMixin, serializers.ModelSerializer):
     """
     Base serializer that automatically converts to/from camelCase.
     All model serializers should inherit from this.
+    
+    Also provides a read-only fast path for list responses: ``fast_list()``
+    fetches rows with ``QuerySet.values()`` and builds the camelCase dicts
+    directly, producing the same output as ``Serializer(qs, many=True).data``
+    without instantiating models or running the per-field DRF machinery.
     """
-    pass
+    # Field name -> ORM lookup, or (lookup, func) where func builds the output
+    # value from the raw column. Needed for fields backed by model properties or
+    # SerializerMethodFields; plain model fields and dotted sources work as-is.
+    fast_sources = {}
+    
+    @classmethod
+    def fast_plan(cls, model, context=None):
+        """Return [(output key, lookup, converter)] for the readable fields."""
+        serializer = cls(context=context or {})
+        to_camel = serializer._get_name_maps()[0]
+        plan = []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            spec = cls.fast_sources.get(name)
+            if isinstance(spec, tuple):
+                lookup, convert = spec
+            else:
+                if spec is None and isinstance(field, serializers.SerializerMethodField):
+                    raise ImproperlyConfigured(
+                        f'{cls.__name__}.fast_sources must define method field {name!r}'
+                    )
+                lookup = spec or '__'.join(field.source_attrs)
+                convert = cls._fast_converter(field, model, lookup)
+            plan.append((to_camel.get(name) or serializer._camelize(name), lookup, convert))
+        return plan
+    
+    @staticmethod
+    def _fast_converter(field, model, lookup):
+        """Wrap field.to_representation so it accepts a raw column value."""
+        if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+            return lambda value: value
+        if isinstance(field, serializers.FileField):
+            model_field = model._meta.get_field(lookup)
+            if isinstance(model_field, ModelFileField):
+                attr_class = model_field.attr_class
+                return lambda value: field.to_representation(attr_class(None, model_field, value))
+        to_representation = field.to_representation
+        return lambda value: None if value is None else to_representation(value)
+    
+    @classmethod
+    def fast_values(cls, queryset, extra=()):
+        """Return ``queryset.values()`` limited to the columns fast_rows() needs."""
+        plan = cls.fast_plan(queryset.model)
+        lookups = dict.fromkeys([lookup for _, lookup, _ in plan] + list(extra))
+        return queryset.values(*lookups)
+    
+    @classmethod
+    def fast_rows(cls, rows, context=None, model=None):
+        """Convert rows from fast_values() into camelCase response dicts."""
+        plan = cls.fast_plan(model or cls.Meta.model, context)
+        with timed('serialize'):
+            return [
+                {key: convert(row[lookup]) for key, lookup, convert in plan}
+                for row in rows
+            ]
+    
+    @classmethod
+    def fast_list(cls, queryset, context=None):
+        """Serialize a queryset for a read-only list response."""
+        return cls.fast_rows(cls.fast_values(queryset), context, queryset.model)
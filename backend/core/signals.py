@@ -0,0 +1,69 @@
+"""
+Signal handlers that keep delta sync state and cached payload versions consistent.
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from . import sync
+from .cache import bump_data_version
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deleted rows so delta syncs can report them."""
+    collection = sync.collection_for_model(sender)
+    if collection:
+        sync.record_deletion(collection, instance)
+
+
+def bump_version(sender, **kwargs):
+    """Invalidate cached payloads built from this model's collection."""
+    collection = sync.collection_for_model(sender)
+    if collection:
+        bump_data_version(collection)
+
+
+def remember_previous_room(sender, instance, **kwargs):
+    """Stash the hosteler's current room before it is overwritten."""
+    update_fields = kwargs.get('update_fields')
+    if instance.pk is None or (update_fields is not None and 'room' not in update_fields):
+        instance._previous_room_id = instance.room_id
+        return
+    instance._previous_room_id = (
+        sender.objects.filter(pk=instance.pk).values_list('room_id', flat=True).first()
+    )
+
+
+def touch_rooms(room_ids):
+    """Bump updated_at on rooms whose occupant list changed."""
+    room_ids = {room_id for room_id in room_ids if room_id}
+    if room_ids:
+        Room = apps.get_model('rooms', 'Room')
+        Room.objects.filter(pk__in=room_ids).update(updated_at=timezone.now())
+        bump_data_version('rooms')
+
+
+def touch_rooms_on_save(sender, instance, created, **kwargs):
+    """A room's ``students`` list is part of its payload, so moving a hosteler changes both rooms."""
+    previous = getattr(instance, '_previous_room_id', None)
+    if created or previous != instance.room_id:
+        touch_rooms([previous, instance.room_id])
+
+
+def touch_rooms_on_delete(sender, instance, **kwargs):
+    """Removing a hosteler changes their room's occupant list."""
+    touch_rooms([instance.room_id])
+
+
+def connect():
+    """Wire up handlers for every synced model."""
+    for collection in sync.SYNC_COLLECTIONS:
+        model = sync.get_sync_model(collection)
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync-tombstone-{collection}')
+        post_save.connect(bump_version, sender=model, dispatch_uid=f'cache-version-save-{collection}')
+        post_delete.connect(bump_version, sender=model, dispatch_uid=f'cache-version-delete-{collection}')
+
+    Hosteler = apps.get_model('hostel', 'Hosteler')
+    pre_save.connect(remember_previous_room, sender=Hosteler, dispatch_uid='sync-hosteler-room-pre')
+    post_save.connect(touch_rooms_on_save, sender=Hosteler, dispatch_uid='sync-hosteler-room-save')
+    post_delete.connect(touch_rooms_on_delete, sender=Hosteler, dispatch_uid='sync-hosteler-room-delete')
@@ -0,0 +1,96 @@
+"""
+Delta sync support for the aggregate /api/hostel-data/ endpoint.
+
+Clients receive an opaque sync token with every hostel-data response and send
+it back as ``?since=<token>``. Rows whose ``updated_at`` is newer than the token
+are returned again, and deleted rows are reported from the tombstone table.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Tombstone
+
+TOKEN_SALT = 'hostel-data-sync'
+
+# Collection name -> (model label, API id of an instance, parser for stored ids).
+# Ids match the ``id`` key each serializer emits, so clients can drop rows by it.
+SYNC_COLLECTIONS = {
+    'hostelers': ('hostel.Hosteler', lambda obj: obj.hosteler_id, str),
+    'rooms': ('rooms.Room', lambda obj: obj.pk, int),
+    'outpasses': ('outpass.Outpass', lambda obj: f"OP{str(obj.pk).zfill(4)}", str),
+    'payments': ('payments.Payment', lambda obj: obj.invoice_no, str),
+    'feedback': ('feedback.Feedback', lambda obj: obj.pk, int),
+}
+
+
+class InvalidSyncToken(Exception):
+    """Raised when a client sends a token that was not issued by this server."""
+
+
+def get_retention():
+    """How long tombstones are kept (and therefore how old a usable token may be)."""
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def make_token(moment):
+    """Encode a point in time as a signed sync token."""
+    return signing.dumps(moment.isoformat(), salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """Decode a sync token back into an aware datetime."""
+    try:
+        moment = parse_datetime(signing.loads(token, salt=TOKEN_SALT))
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidSyncToken(token)
+    if moment is None:
+        raise InvalidSyncToken(token)
+    return moment
+
+
+def is_expired(moment):
+    """True if tombstones older than ``moment`` may already have been pruned."""
+    return moment < timezone.now() - get_retention()
+
+
+def get_sync_model(collection):
+    """Return the model class backing a sync collection."""
+    return apps.get_model(SYNC_COLLECTIONS[collection][0])
+
+
+def collection_for_model(model):
+    """Return the sync collection name for a model class, or None."""
+    label = model._meta.label
+    for collection, (model_label, _, _) in SYNC_COLLECTIONS.items():
+        if model_label == label:
+            return collection
+    return None
+
+
+def record_deletion(collection, instance):
+    """Leave a tombstone for a deleted row."""
+    key = SYNC_COLLECTIONS[collection][1]
+    Tombstone.objects.create(collection=collection, object_id=str(key(instance)))
+
+
+def deleted_since(moment):
+    """Return ``{collection: [id, ...]}`` for rows deleted at or after ``moment``."""
+    deleted = {collection: [] for collection in SYNC_COLLECTIONS}
+    rows = Tombstone.objects.filter(deleted_at__gte=moment).values_list('collection', 'object_id')
+    for collection, object_id in rows:
+        if collection in deleted:
+            parse = SYNC_COLLECTIONS[collection][2]
+            deleted[collection].append(parse(object_id))
+    return deleted
+
+
+def prune_tombstones():
+    """Delete tombstones older than the retention window. Returns the number removed."""
+    cutoff = timezone.now() - get_retention()
+    count, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return count
@@ -0,0 +1,396 @@
+"""
+Deterministic synthetic data for capacity planning and benchmarks.
+
+``generate(scale)`` adds ROOMS_PER_SCALE rooms per unit of scale and
+hostelers to fill about 85% of their beds, plus 10% more who are still
+waiting for a room. Each hosteler gets a student login and ``years`` of
+history: non-overlapping outpasses, monthly invoices, feedback and
+notifications. One unit of scale over two years comes to roughly 7,000 rows,
+so ``--scale 150`` builds a dataset of about a million rows.
+
+The same seed, scale, years and as-of date always give the same data.
+Everything goes in with bulk_create, in chunks of CHUNK_SIZE hostelers with
+one transaction each. State that model signals normally maintain (payment
+ledger, cache versions, room availability) is rebuilt once at the end,
+because bulk inserts skip those signals.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_data_version
+from core.sync import SYNC_COLLECTIONS
+from feedback.models import Feedback
+from hostel.models import Hosteler
+from notifications import counters
+from notifications.models import Notification
+from outpass.models import Outpass
+from payments import feerun, ledger
+from payments.models import Payment
+from rooms.models import Room
+
+ROOMS_PER_SCALE = 100
+
+CHUNK_SIZE = 1000
+
+OCCUPANCY = 0.85
+
+WAITING = 0.10
+
+# Every generated student logs in with this password
+STUDENT_PASSWORD = 'student123'
+
+ROOM_PREFIX = 'S'
+
+BEDS = {'single': 1, 'double': 2, 'triple': 3}
+
+BASE_RATE = {'single': 6000, 'double': 4500, 'triple': 3500}
+
+MALE_NAMES = [
+    'Aarav', 'Vihaan', 'Arjun', 'Rohan', 'Kabir', 'Ishaan', 'Aditya', 'Rahul', 'Karan', 'Nikhil',
+    'Siddharth', 'Varun', 'Manish', 'Pranav', 'Harsh', 'Yash', 'Dev', 'Akash', 'Sanjay', 'Vikram',
+]
+
+FEMALE_NAMES = [
+    'Ananya', 'Diya', 'Priya', 'Isha', 'Kavya', 'Meera', 'Riya', 'Sneha', 'Pooja', 'Aditi',
+    'Neha', 'Shreya', 'Tanvi', 'Nisha', 'Lakshmi', 'Divya', 'Anjali', 'Sakshi', 'Aishwarya', 'Kriti',
+]
+
+LAST_NAMES = [
+    'Sharma', 'Patel', 'Reddy', 'Iyer', 'Nair', 'Gupta', 'Singh', 'Kumar', 'Mehta', 'Joshi',
+    'Rao', 'Das', 'Banerjee', 'Menon', 'Pillai', 'Verma', 'Chopra', 'Kulkarni', 'Desai', 'Bhat',
+]
+
+CITIES = [
+    ('Bangalore', '560'), ('Chennai', '600'), ('Hyderabad', '500'), ('Mumbai', '400'),
+    ('Pune', '411'), ('Delhi', '110'), ('Kolkata', '700'), ('Kochi', '682'),
+]
+
+COURSES = [
+    ('B.Tech', 'Computer Science'), ('B.Tech', 'Electrical Engineering'),
+    ('B.Tech', 'Mechanical Engineering'), ('B.Sc', 'Physics'), ('B.Sc', 'Mathematics'),
+    ('B.Com', 'Commerce'), ('BBA', 'Management'), ('MCA', 'Computer Applications'),
+]
+
+COLLEGES = ['University of Technology', 'City College of Arts and Science', 'Institute of Management']
+
+OUTPASS_REASONS = ['home', 'medical', 'personal', 'other']
+
+FEEDBACK_MESSAGES = {
+    'suggestion': ['Could the mess add more vegetarian options?', 'Please extend the library hours.'],
+    'complaint': ['The Wi-Fi is slow in the evenings.', 'Hot water runs out early in the morning.'],
+    'appreciation': ['Thanks for the quick repair of the fan.', 'The new gym equipment is great.'],
+}
+
+NOTIFICATIONS = [
+    ('outpass', 'Outpass approved', 'Your outpass has been approved.'),
+    ('outpass', 'Outpass rejected', 'Your outpass request was rejected.'),
+    ('payment', 'Payment received', 'We have received your hostel fee payment.'),
+    ('payment', 'Fee due', 'Your hostel fee for this month is due.'),
+    ('feedback', 'Feedback replied', 'The warden has replied to your feedback.'),
+    ('general', 'Notice', 'Water supply will be interrupted on Sunday morning.'),
+]
+
+
+class SyntheticDataExists(Exception):
+    """Synthetic rooms are already present; generate into a fresh database."""
+
+
+def aware(day, hour=0, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def months_between(first, last):
+    """First days of the months from ``first`` to ``last`` inclusive."""
+    month = first.replace(day=1)
+    while month <= last:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+@contextmanager
+def historic_timestamps():
+    """Let bulk_create keep generated creation dates instead of stamping them with now()."""
+    fields = [
+        field
+        for model in (Hosteler, Outpass, Payment, Feedback, Notification)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Generator:
+    """Builds one dataset; see generate()."""
+
+    def __init__(self, scale, seed=1, years=2, as_of=None, log=None):
+        self.scale = scale
+        self.years = years
+        self.as_of = as_of or timezone.localdate()
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.counts = {}
+        self.password = make_password(STUDENT_PASSWORD, salt=f'synthetic{seed}')
+
+    def count(self, name, rows):
+        self.counts[name] = self.counts.get(name, 0) + len(rows)
+
+    def run(self):
+        if already_generated():
+            raise SyntheticDataExists('Synthetic data is already present; generate into a fresh database')
+
+        with historic_timestamps():
+            residents = self.create_rooms()
+            plans = self.plan_hostelers(residents)
+            hosteler_ids = Hosteler.next_hosteler_ids(len(plans))
+            for offset in range(0, len(plans), CHUNK_SIZE):
+                with transaction.atomic():
+                    self.create_chunk(list(zip(hosteler_ids[offset:], plans[offset:offset + CHUNK_SIZE])))
+                self.log(f'  hostelers {min(offset + CHUNK_SIZE, len(plans))}/{len(plans)}')
+
+        self.log('Rebuilding payment ledger...')
+        ledger.rebuild()
+        # Cached payloads, sync tokens and the room availability index
+        bump_data_version(*SYNC_COLLECTIONS, 'room-availability')
+        return self.counts
+
+    def create_rooms(self):
+        """Create the rooms; returns [(room pk, block, rate, bed labels to fill)]."""
+        rng = self.rng
+        rooms = []
+        occupants = {}
+        for number in range(1, self.scale * ROOMS_PER_SCALE + 1):
+            block = 'a-block' if number % 2 else 'b-block'
+            bed_type = rng.choices(list(BEDS), weights=[2, 5, 3])[0]
+            room_type = rng.choice(['ac', 'non-ac'])
+            total = BEDS[bed_type]
+            filled = [f'B{bed}' for bed in range(1, total + 1) if rng.random() < OCCUPANCY]
+            room_number = f'{ROOM_PREFIX}{block[0].upper()}{number:06d}'
+            occupants[room_number] = filled
+            rooms.append(Room(
+                room_number=room_number,
+                block=block,
+                floor=rng.choice(Room.FLOOR_CHOICES)[0],
+                room_type=room_type,
+                bed_type=bed_type,
+                total_beds=total,
+                available_beds=total - len(filled),
+                is_available=len(filled) < total,
+                room_rate=BASE_RATE[bed_type] + (1500 if room_type == 'ac' else 0) + rng.randrange(0, 5) * 100,
+            ))
+        Room.objects.bulk_create(rooms, batch_size=CHUNK_SIZE)
+        self.count('rooms', rooms)
+
+        # bulk_create doesn't return primary keys on every backend
+        pks = dict(Room.objects.filter(room_number__startswith=ROOM_PREFIX).values_list('room_number', 'pk'))
+        return [
+            (pks[room.room_number], room.block, room.room_rate, occupants[room.room_number])
+            for room in rooms
+        ]
+
+    def plan_hostelers(self, residents):
+        """One (room pk, bed, block, rate) per hosteler; room None for the waiting list."""
+        plans = [(pk, bed, block, rate) for pk, block, rate, beds in residents for bed in beds]
+        waiting = int(len(plans) * WAITING)
+        plans += [(None, '', self.rng.choice(['a-block', 'b-block']), None) for _ in range(waiting)]
+        return plans
+
+    def create_chunk(self, chunk):
+        rng = self.rng
+        hostelers = []
+        for hosteler_id, (room_pk, bed, block, rate) in chunk:
+            gender = 'male' if block == 'a-block' else 'female'
+            first = rng.choice(MALE_NAMES if gender == 'male' else FEMALE_NAMES)
+            last = rng.choice(LAST_NAMES)
+            city, pin = rng.choice(CITIES)
+            course, department = rng.choice(COURSES)
+            number = int(hosteler_id[1:])
+            if room_pk:
+                checkin = self.as_of - timedelta(days=rng.randint(0, self.years * 365))
+                registered = checkin - timedelta(days=rng.randint(0, 30))
+            else:
+                checkin = None
+                registered = self.as_of - timedelta(days=rng.randint(0, 60))
+            hosteler = Hosteler(
+                hosteler_id=hosteler_id,
+                name=f'{first} {last}',
+                gender=gender,
+                age=rng.randint(17, 24),
+                mobile=f'7{number:09d}'[-10:],
+                email=f'{hosteler_id.lower()}@students.example.com',
+                registration_date=registered,
+                room_id=room_pk,
+                bed=bed,
+                checkin_date=checkin,
+                college=rng.choice(COLLEGES),
+                course=course,
+                department=department,
+                year=str(rng.randint(1, 4)),
+                roll_no=f'R{number}',
+                student_id=f'STU{number}',
+                address=f'{rng.randint(1, 999)} Main Road, {city}',
+                city=city,
+                pincode=f'{pin}{rng.randint(1, 99):03d}',
+                father_name=f'{rng.choice(MALE_NAMES)} {last}',
+                parent_phone=f'8{number:09d}'[-10:],
+                created_at=aware(registered, 10),
+            )
+            hosteler._rate = rate
+            hostelers.append(hosteler)
+        Hosteler.objects.bulk_create(hostelers, batch_size=CHUNK_SIZE)
+        self.count('hostelers', hostelers)
+        pks = dict(Hosteler.objects.filter(
+            hosteler_id__in=[hosteler.hosteler_id for hosteler in hostelers],
+        ).values_list('hosteler_id', 'pk'))
+        for hosteler in hostelers:
+            hosteler.pk = pks[hosteler.hosteler_id]
+
+        users = self.create_users(hostelers)
+        residents = [hosteler for hosteler in hostelers if hosteler.room_id]
+        self.bulk(Outpass, [outpass for hosteler in residents for outpass in self.outpasses(hosteler)])
+        self.create_payments(residents)
+        self.bulk(Feedback, [item for hosteler in residents for item in self.feedback(hosteler)])
+        self.bulk(Notification, [
+            notification
+            for hosteler, user_pk in zip(hostelers, users)
+            for notification in self.notifications(hosteler, user_pk)
+        ])
+        counters.invalidate(users)
+
+    def bulk(self, model, rows):
+        model.objects.bulk_create(rows, batch_size=CHUNK_SIZE)
+        self.count(model._meta.db_table, rows)
+
+    def create_users(self, hostelers):
+        """A student login per hosteler (username = hosteler ID); returns user pks in order."""
+        User = get_user_model()
+        users = [
+            User(
+                username=hosteler.hosteler_id,
+                password=self.password,
+                email=hosteler.email,
+                first_name=hosteler.name.split()[0],
+                last_name=hosteler.name.split()[-1],
+                role='student',
+                mobile=hosteler.mobile,
+                hosteler_id=hosteler.hosteler_id,
+                date_joined=aware(hosteler.registration_date, 10),
+            )
+            for hosteler in hostelers
+        ]
+        User.objects.bulk_create(users, batch_size=CHUNK_SIZE)
+        self.count('users', users)
+        pks = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+        return [pks[user.username] for user in users]
+
+    def outpasses(self, hosteler):
+        """Back-to-back, never overlapping outpasses from check-in until three weeks ahead."""
+        rng = self.rng
+        day = hosteler.checkin_date + timedelta(days=rng.randint(7, 40))
+        while day <= self.as_of + timedelta(days=21):
+            back = day + timedelta(days=rng.choices([0, 1, 2, 3, 5, 7, 14], weights=[10, 25, 25, 15, 12, 8, 5])[0])
+            issued = aware(day - timedelta(days=rng.randint(1, 7)), rng.randint(8, 21), rng.randint(0, 59))
+            outpass = Outpass(
+                hosteler_id=hosteler.pk,
+                out_date=day,
+                return_date=back,
+                reason=rng.choice(OUTPASS_REASONS),
+                issued_on=issued,
+                created_at=issued,
+            )
+            if day > self.as_of and rng.random() < 0.6:
+                outpass.status = 'pending'
+            elif day <= self.as_of and rng.random() < 0.12:
+                outpass.status = 'rejected'
+                outpass.warden_reply = 'Not approved during examinations.'
+            else:
+                outpass.status = 'approved'
+                outpass.approved_by = 'Warden'
+                outpass.approved_on = min(issued + timedelta(hours=rng.randint(1, 30)), aware(day))
+                # A few hostelers are late back and haven't been marked returned
+                if back < self.as_of and not (back >= self.as_of - timedelta(days=7) and rng.random() < 0.1):
+                    outpass.returned_on = aware(back, rng.randint(16, 21), rng.randint(0, 59))
+            yield outpass
+            day = back + timedelta(days=rng.randint(10, 60))
+
+    def create_payments(self, residents):
+        """One invoice per month of stay, priced as the fee run would."""
+        rng = self.rng
+        payments = []
+        for hosteler in residents:
+            for month in months_between(hosteler.checkin_date, self.as_of):
+                amount = feerun.charge(hosteler._rate, hosteler.checkin_date, month)
+                due = feerun.due_date_for(month)
+                age = (self.as_of - due).days
+                completed = 0.97 if age > 45 else 0.8 if age >= 0 else 0.3
+                status = 'completed' if rng.random() < completed else rng.choice(['pending', 'pending', 'failed'])
+                payment = Payment(
+                    hosteler_id=hosteler.pk,
+                    amount=amount,
+                    payment_type=rng.choices(['upi', 'online', 'card', 'cash'], weights=[5, 3, 1, 1])[0],
+                    status=status,
+                    due_date=due,
+                    billing_month=month,
+                    created_at=aware(month, 6),
+                )
+                if status == 'completed':
+                    paid = min(due + timedelta(days=rng.randint(-9, 5)), self.as_of)
+                    payment.paid_on = aware(max(paid, month), rng.randint(9, 20), rng.randint(0, 59))
+                payments.append(payment)
+        for payment, invoice_no in zip(payments, Payment.next_invoice_nos(len(payments))):
+            payment.invoice_no = invoice_no
+        self.bulk(Payment, payments)
+
+    def feedback(self, hosteler):
+        rng = self.rng
+        stay = (self.as_of - hosteler.checkin_date).days
+        for _ in range(rng.randint(0, max(1, stay // 365 + 1))):
+            feedback_type = rng.choice(list(FEEDBACK_MESSAGES))
+            status = rng.choices(['pending', 'replied', 'resolved'], weights=[3, 5, 2])[0]
+            yield Feedback(
+                student_name=hosteler.name,
+                student_email=hosteler.email,
+                feedback_type=feedback_type,
+                message=rng.choice(FEEDBACK_MESSAGES[feedback_type]),
+                status=status,
+                reply='' if status == 'pending' else 'Thank you, we are looking into it.',
+                date=aware(hosteler.checkin_date + timedelta(days=rng.randint(0, stay)), rng.randint(8, 22)),
+            )
+
+    def notifications(self, hosteler, user_pk):
+        """About one a month while registered; older ones are mostly read."""
+        rng = self.rng
+        stay = (self.as_of - hosteler.registration_date).days
+        for _ in range(stay // 30 + 1):
+            notification_type, title, message = rng.choice(NOTIFICATIONS)
+            created = aware(hosteler.registration_date + timedelta(days=rng.randint(0, stay)), rng.randint(7, 22))
+            read = (self.as_of - created.date()).days > 14 and rng.random() < 0.95
+            yield Notification(
+                user_id=user_pk,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                is_read=read,
+                read_at=created + timedelta(hours=rng.randint(1, 72)) if read else None,
+                created_at=created,
+            )
+
+
+def already_generated():
+    return Room.objects.filter(room_number__startswith=ROOM_PREFIX).exists()
+
+
+def generate(scale, seed=1, years=2, as_of=None, log=None):
+    """Add a synthetic dataset; returns {table: rows created}."""
+    return Generator(scale, seed, years, as_of, log).run()
@@ -0,0 +1,302 @@
+"""
+Tests for keyset pagination, the in-process event bus, the request capture
+middleware, synthetic data generation and the Server-Timing header.
+"""
+import os
+import re
+import tempfile
+from datetime import date, datetime, timezone
+
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from core import events, profiling, sampling, synthetic
+from feedback.models import Feedback
+from hostel.models import Hosteler
+from notifications.models import Notification
+from outpass.models import Outpass
+from payments.models import HostelerBalance, LedgerMonth, Payment
+from rooms.models import Room
+
+EVENT = 'test.event'
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        hosteler = Hosteler.objects.create(
+            hosteler_id='H2024001', name='Student', gender='male', age=20,
+            mobile='9876500001', email='student@example.com',
+        )
+        Outpass.objects.bulk_create([
+            Outpass(hosteler=hosteler, out_date=date(2024, 12, 1), return_date=date(2024, 12, 2), reason='Home')
+            for _ in range(7)
+        ])
+        pks = sorted(Outpass.objects.values_list('pk', flat=True))
+        # Issue times with ties, so pages must split on the id tiebreaker
+        times = [datetime(2024, 11, day, tzinfo=timezone.utc) for day in (3, 3, 3, 2, 2, 1, 1)]
+        for pk, issued_on in zip(pks, times):
+            Outpass.objects.filter(pk=pk).update(issued_on=issued_on)
+        # Newest first, then highest id first within the same issue time
+        self.expected = [
+            pk for pk, _ in sorted(zip(pks, times), key=lambda item: (item[1], item[0]), reverse=True)
+        ]
+
+    def page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, page):
+        return [item['backendId'] for item in page['results']]
+
+    def test_next_pages_walk_every_row_once_in_order(self):
+        pages = [self.page('/api/outpasses/?page_size=3')]
+        while pages[-1]['next']:
+            pages.append(self.page(pages[-1]['next']))
+
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertEqual([pk for page in pages for pk in self.ids(page)], self.expected)
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_pages_walk_back(self):
+        first = self.page('/api/outpasses/?page_size=3')
+        second = self.page(first['next'])
+        last = self.page(second['next'])
+
+        back = self.page(last['previous'])
+        self.assertEqual(self.ids(back), self.ids(second))
+        front = self.page(back['previous'])
+        self.assertEqual(self.ids(front), self.ids(first))
+        self.assertIsNone(front['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/outpasses/?cursor=not-a-cursor').status_code, 404)
+
+    def test_page_parameter_keeps_the_page_number_format(self):
+        page = self.page('/api/outpasses/?page=1')
+
+        self.assertEqual(page['count'], 7)
+        self.assertEqual(self.ids(page), self.expected)
+
+
+class EventBatchTests(TransactionTestCase):
+
+    def setUp(self):
+        self.delivered = []
+        events.subscribe(EVENT, self.delivered.append)
+        self.addCleanup(events._handlers[EVENT].remove, self.delivered.append)
+
+    def pending_batches(self):
+        return getattr(events._local, 'batches', {})
+
+    def test_committed_batch_is_delivered_and_forgotten(self):
+        with transaction.atomic():
+            events.publish(EVENT, number=1)
+            events.publish(EVENT, number=2)
+
+        self.assertEqual([[event.payload['number'] for event in batch] for batch in self.delivered], [[1, 2]])
+        self.assertEqual(self.pending_batches(), {})
+
+    def test_rolled_back_batches_are_not_kept(self):
+        for _ in range(5):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        events.publish(EVENT, number=1)
+                        raise ValueError
+                except ValueError:
+                    pass
+            with self.assertRaises(ValueError), transaction.atomic():
+                events.publish(EVENT, number=2)
+                raise ValueError
+
+        with transaction.atomic():
+            events.publish(EVENT, number=3)
+
+        self.assertEqual([[event.payload['number'] for event in batch] for batch in self.delivered], [[3]])
+        self.assertEqual(self.pending_batches(), {})
+
+
+def view(request):
+    return HttpResponse()
+
+
+@override_settings(PROFILE_SLOW_MS=500, PROFILE_SAMPLE_RATE=0, PROFILE_CAPTURE_FILE='captures.jsonl')
+class SamplingMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        handlers = sampling.capture_log.handlers
+        self.addCleanup(setattr, sampling.capture_log, 'handlers', handlers)
+        sampling.capture_log.handlers = []
+
+    def test_capture_file_may_be_a_bare_file_name(self):
+        sampling.capture_writer()
+
+        self.assertEqual(len(sampling.capture_log.handlers), 1)
+
+    def test_second_request_on_a_watched_thread_is_not_captured(self):
+        middleware = sampling.SamplingProfilerMiddleware(view)
+        first, second = RequestFactory().get('/'), RequestFactory().get('/')
+        first_capture, second_capture = middleware.start(first), middleware.start(second)
+
+        # As under ASGI: both views run in the one sync thread before the first response is done
+        middleware.process_view(first, view, (), {})
+        middleware.process_view(second, view, (), {})
+
+        self.assertFalse(first_capture.skip)
+        self.assertTrue(second_capture.skip)
+        self.assertIs(middleware.sampler.watched[first_capture.thread], first_capture)
+        middleware.stop(second_capture)
+        self.assertIs(middleware.sampler.watched[first_capture.thread], first_capture)
+        middleware.stop(first_capture)
+        self.assertEqual(middleware.sampler.watched, {})
+        self.assertEqual(middleware.threads, set())
+
+    def test_finish_reads_samples_while_the_sampler_writes(self):
+        middleware = sampling.SamplingProfilerMiddleware(view)
+        middleware.sampler.interval = middleware.sampler.delay = 0
+        request = RequestFactory().get('/')
+        capture = middleware.start(request)
+        capture.started -= 1
+        middleware.process_view(request, view, (), {})
+
+        def nested(depth):
+            # A different stack at every depth, so the sampler keeps adding keys
+            if depth:
+                return nested(depth - 1)
+            return middleware.finish(request, HttpResponse(), sampling.profiling.RequestProfile(), capture)
+
+        try:
+            for attempt in range(3000):
+                nested(attempt % 50)
+        finally:
+            middleware.stop(capture)
+        self.assertGreater(sum(capture.samples.values()), 0)
+
+
+# Relations are compared by natural key: primary keys needn't repeat between runs
+NATURAL_KEYS = {'room': 'room__room_number', 'hosteler': 'hosteler__hosteler_id', 'user': 'user__username'}
+
+# Rows whose creation time is the time of the run rather than a generated date
+STAMPED = (Room, LedgerMonth, HostelerBalance)
+
+
+def is_stamped(model, field):
+    return getattr(field, 'auto_now', False) or (getattr(field, 'auto_now_add', False) and model in STAMPED)
+
+
+def dataset():
+    """Every generated row, minus primary keys and run timestamps, per model."""
+    data = {}
+    for model in (Room, Hosteler, User, Outpass, Payment, LedgerMonth, HostelerBalance, Feedback, Notification):
+        fields = [
+            NATURAL_KEYS[field.name] if field.is_relation else field.attname
+            for field in model._meta.concrete_fields
+            if not field.primary_key and not is_stamped(model, field)
+        ]
+        data[model.__name__] = sorted(model.objects.values_list(*fields), key=repr)
+    return data
+
+
+class SyntheticDataTests(TestCase):
+
+    def generate(self, seed):
+        with transaction.atomic():
+            counts = synthetic.generate(1, seed=seed, years=1, as_of=date(2024, 12, 31))
+            data = dataset()
+            transaction.set_rollback(True)
+        return counts, data
+
+    def test_same_seed_gives_the_same_data(self):
+        first_counts, first = self.generate(seed=7)
+        second_counts, second = self.generate(seed=7)
+
+        self.assertEqual(first_counts, second_counts)
+        self.assertEqual(first_counts['rooms'], synthetic.ROOMS_PER_SCALE)
+        for model, rows in first.items():
+            self.assertTrue(rows, model)
+            self.assertEqual(rows, second[model], model)
+
+    def test_different_seeds_give_different_data(self):
+        _, first = self.generate(seed=7)
+        _, second = self.generate(seed=8)
+
+        self.assertNotEqual(first['Hosteler'], second['Hosteler'])
+
+    def test_generating_twice_is_refused(self):
+        synthetic.generate(1, seed=7, years=1, as_of=date(2024, 12, 31))
+
+        with self.assertRaises(synthetic.SyntheticDataExists):
+            synthetic.generate(1, seed=7, years=1, as_of=date(2024, 12, 31))
+
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(?P<queries>\d+) queries, (?P<duplicates>\d+) duplicate"'
+    r'(?P<spans>(?:, \w+;dur=[\d.]+)*), total;dur=[\d.]+$'
+)
+
+
+@override_settings(REQUEST_PROFILING=True)
+class ServerTimingTests(TestCase):
+
+    def setUp(self):
+        # A new client builds its middleware chain under the settings above
+        self.client = APIClient()
+        warden = User.objects.create_user('warden', password='warden123', role='warden')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(warden).access_token}')
+        Room.objects.create(
+            room_number='A101', block='a-block', floor='ground', room_type='non-ac', bed_type='double',
+            total_beds=2, available_beds=2, room_rate=4500, is_available=True,
+        )
+
+    def test_header_counts_queries_and_spans(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/rooms/')
+
+        self.assertEqual(response.status_code, 200)
+        match = SERVER_TIMING.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match['queries']), len(queries))
+        self.assertEqual(
+            [entry.split(';')[0] for entry in match['spans'].split(', ') if entry], ['auth', 'serialize', 'render'],
+        )
+
+    @override_settings(REQUEST_PROFILING_HEADERS=False)
+    def test_header_can_be_turned_off(self):
+        response = self.client.get('/api/rooms/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_no_header_without_profiling(self):
+        response = APIClient().get('/api/rooms/')
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_duplicates_are_counted(self):
+        profile = profiling.RequestProfile()
+
+        def execute(sql, params, many, context):
+            return None
+
+        for params in ((1,), (1,), (2,)):
+            profile(execute, 'SELECT %s', params, False, None)
+
+        header = profiling.server_timing(profile, total=0.25)
+
+        self.assertTrue(header.startswith('db;dur='), header)
+        self.assertIn('desc="3 queries, 1 duplicate"', header)
+        self.assertTrue(header.endswith('total;dur=250.00'), header)
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['-date', '-id'], name='feedback_date_idx'),
+        ),
+    ]
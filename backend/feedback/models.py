@@ -42,6 +42,20 @@ class Feedback(models.Model):
         verbose_name = 'Feedback'
         verbose_name_plural = 'Feedback'
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination: (date, id)
+            models.Index(fields=['-date', '-id'], name='feedback_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student_name} - {self.get_feedback_type_display()} - {self.date.strftime('%Y-%m-%d')}"
+    
+    def publish_replied(self):
+        """Announce a warden reply; the student is notified once the transaction commits."""
+        from core import events
+        events.publish(
+            events.FEEDBACK_REPLIED,
+            feedback_id=self.pk,
+            student_email=self.student_email,
+            reply=self.reply,
+        )
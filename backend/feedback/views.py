@@ -4,11 +4,13 @@ Views for Feedback management.
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from core.permissions import IsWardenOrReadOnly
+from core.mixins import FastListModelMixin
+from core.pagination import KeysetPagination
 from .models import Feedback
 from .serializers import FeedbackSerializer
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(FastListModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Feedback CRUD operations.
     
@@ -21,8 +23,12 @@ class FeedbackViewSet(viewsets.ModelViewSet):
     """
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated, IsWardenOrReadOnly]
     
     def perform_update(self, serializer):
-        """Allow warden to update reply and status."""
-        serializer.save()
+        """Allow warden to update reply and status; a new reply notifies the student."""
+        previous_reply = serializer.instance.reply
+        feedback = serializer.save()
+        if feedback.reply and feedback.reply != previous_reply:
+            feedback.publish_replied()
@@ -0,0 +1,275 @@
+"""
+Bulk import of hostelers from CSV or JSON.
+
+Files are parsed as a stream (CSV row by row; JSON arrays or JSON Lines one
+object at a time) and handled in chunks of CHUNK_SIZE rows. Each row is
+cleaned with the model fields' own validation. Duplicate emails, mobiles,
+roll numbers and hosteler IDs are then caught against the rest of the file
+and against the database, with one IN query per key per chunk. Valid rows
+get IDs from one reserved block of the hosteler_id sequence and are inserted
+with bulk_create. Rooms aren't assigned here; use rooms' bulk_allocate.
+
+Columns may use the API's camelCase names or the model's snake_case ones.
+The admissions office's export format (data/sample_students.json) is mapped
+through ALIASES.
+"""
+import csv
+import io
+import json
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.cache import bump_data_version
+from core.sequences import max_code_number
+from core.serializers import CamelCaseModelSerializer
+from .models import Hosteler
+
+CHUNK_SIZE = 1000
+
+FILE_TYPES = ('csv', 'json')
+
+# Admissions export column -> model field
+ALIASES = {
+    'phone': 'mobile',
+    'place': 'city',
+    'class': 'course',
+    'id': 'student_id',
+}
+
+IMPORT_FIELDS = (
+    'hosteler_id', 'name', 'gender', 'age', 'mobile', 'email', 'occupation',
+    'checkin_date', 'college', 'course', 'department', 'year', 'roll_no',
+    'student_id', 'address', 'city', 'pincode', 'father_name', 'parent_phone',
+    'parent_address', 'emergency_name', 'emergency_phone',
+)
+
+REQUIRED_FIELDS = tuple(
+    name for name in IMPORT_FIELDS
+    if name != 'hosteler_id'
+    and not Hosteler._meta.get_field(name).blank
+    and not Hosteler._meta.get_field(name).has_default()
+)
+
+# Must not repeat within the file or match an existing hosteler
+UNIQUE_FIELDS = ('hosteler_id', 'email', 'mobile', 'roll_no')
+
+READ_SIZE = 64 * 1024
+
+_SPACE = re.compile(r'\s*')
+
+# Between array items
+_SEPARATOR = re.compile(r'\s*,?\s*')
+
+
+class ImportFormatError(Exception):
+    """The file can't be parsed at all (as opposed to individual bad rows)."""
+
+
+def field_name(column):
+    column = str(column).strip()
+    if column in ALIASES:
+        return ALIASES[column]
+    return CamelCaseModelSerializer._snake_case(column.replace(' ', '_')).replace('__', '_')
+
+
+def text(stream):
+    """Decode a binary file, dropping a UTF-8 BOM."""
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+
+def iter_csv(stream):
+    """(row number, dict) for each CSV data row; row numbers count the header as 1."""
+    reader = csv.DictReader(text(stream))
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFormatError(f'Line {reader.line_num}: {exc}')
+
+
+def iter_json(stream):
+    """
+    (position, object) for each element of a top-level JSON array, or each
+    line of a JSON Lines file, decoded incrementally.
+    """
+    reader = text(stream)
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    in_array = None
+    index = 0
+
+    while True:
+        pos = (_SEPARATOR if in_array else _SPACE).match(buffer, pos).end()
+        if pos >= len(buffer) - 1 and not eof:
+            # Keep at least one character of lookahead before deciding anything
+            try:
+                chunk = reader.read(READ_SIZE)
+            except UnicodeDecodeError as exc:
+                raise ImportFormatError(str(exc))
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        if pos >= len(buffer):
+            if in_array:
+                raise ImportFormatError('Unexpected end of file: missing "]"')
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            pos += in_array
+            continue
+        if in_array and buffer[pos] == ']':
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as exc:
+            if eof:
+                raise ImportFormatError(f'Item {index + 1}: {exc.msg}')
+            chunk = reader.read(READ_SIZE)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        index += 1
+        pos = end
+        yield index, value
+
+
+def file_type_for(filename):
+    """'csv' or 'json' from a file name's extension (.jsonl counts as JSON), else None."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    extension = {'jsonl': 'json', 'ndjson': 'json'}.get(extension, extension)
+    return extension if extension in FILE_TYPES else None
+
+
+def parse(stream, file_type):
+    """Rows of a binary file as (row number, dict) pairs."""
+    if file_type == 'csv':
+        return iter_csv(stream)
+    return iter_json(stream)
+
+
+def clean_row(raw, default_age=None):
+    """Map and validate one input row; returns (field values, {field: message})."""
+    if not isinstance(raw, dict):
+        return None, {'row': 'Each item must be an object'}
+
+    values = {}
+    for column, value in raw.items():
+        name = field_name(column)
+        if name not in IMPORT_FIELDS or value is None:
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value != '':
+            values[name] = value
+    if 'age' not in values and default_age is not None:
+        values['age'] = default_age
+    if 'gender' in values:
+        values['gender'] = str(values['gender']).lower()
+    if 'email' in values:
+        values['email'] = str(values['email']).lower()
+
+    errors = {name: 'This field is required.' for name in REQUIRED_FIELDS if name not in values}
+    for name, value in values.items():
+        try:
+            values[name] = Hosteler._meta.get_field(name).clean(value, None)
+        except ValidationError as exc:
+            errors[name] = ' '.join(exc.messages)
+    return values, errors
+
+
+def existing_values(chunk):
+    """{field: set of values already taken} for the unique fields used in ``chunk``."""
+    taken = {}
+    for name in UNIQUE_FIELDS:
+        wanted = {values[name] for _, values, errors in chunk if not errors and values.get(name)}
+        taken[name] = set(
+            Hosteler.objects.filter(**{f'{name}__in': wanted}).values_list(name, flat=True)
+        ) if wanted else set()
+    return taken
+
+
+def import_chunk(chunk, seen, dry_run):
+    """
+    Check one chunk for duplicates and insert its valid rows.
+    Returns (number of valid rows, created hosteler IDs).
+    """
+    taken = existing_values(chunk)
+    valid = []
+    for number, values, errors in chunk:
+        if errors:
+            continue
+        for name in UNIQUE_FIELDS:
+            value = values.get(name)
+            if not value:
+                continue
+            if value in taken[name]:
+                errors[name] = f'A hosteler with this {name.replace("_", " ")} already exists.'
+            elif value in seen[name]:
+                errors[name] = f'Same {name.replace("_", " ")} as row {seen[name][value]}.'
+        if errors:
+            continue
+        for name in UNIQUE_FIELDS:
+            if values.get(name):
+                seen[name][values[name]] = number
+        valid.append(values)
+
+    if dry_run or not valid:
+        return len(valid), []
+
+    with transaction.atomic():
+        explicit = max_code_number((values['hosteler_id'] for values in valid if values.get('hosteler_id')), 'H')
+        if explicit:
+            # Explicit IDs may be ahead of the sequence; generate past them
+            Hosteler.sync_id_sequence(explicit)
+        generated = iter(Hosteler.next_hosteler_ids(sum(1 for values in valid if not values.get('hosteler_id'))))
+        hostelers = [
+            Hosteler(**{**values, 'hosteler_id': values.get('hosteler_id') or next(generated)})
+            for values in valid
+        ]
+        Hosteler.objects.bulk_create(hostelers, batch_size=CHUNK_SIZE)
+        # bulk_create skips the save signals that invalidate cached payloads
+        bump_data_version('hostelers')
+    return len(valid), [hosteler.hosteler_id for hosteler in hostelers]
+
+
+def run(rows, default_age=None, dry_run=False):
+    """
+    Import (row number, dict) pairs. Rows with errors are skipped and
+    reported; a file that turns out to be malformed partway through
+    (ImportFormatError) imports nothing. Returns
+    {'total', 'valid', 'created', 'invalid', 'hostelerIds', 'errors': [{'row', 'errors'}]}.
+    """
+    seen = {name: {} for name in UNIQUE_FIELDS}
+    total = valid = 0
+    created = []
+    failed = []
+    chunk = []
+
+    def flush():
+        nonlocal valid
+        count, ids = import_chunk(chunk, seen, dry_run)
+        valid += count
+        created.extend(ids)
+        failed.extend({'row': number, 'errors': errors} for number, _, errors in chunk if errors)
+        chunk.clear()
+
+    with transaction.atomic():
+        for number, raw in rows:
+            total += 1
+            values, errors = clean_row(raw, default_age)
+            chunk.append((number, values, errors))
+            if len(chunk) == CHUNK_SIZE:
+                flush()
+        if chunk:
+            flush()
+
+    return {
+        'total': total,
+        'valid': valid,
+        'created': len(created),
+        'invalid': len(failed),
+        'dryRun': dry_run,
+        'hostelerIds': created,
+        'errors': failed,
+    }
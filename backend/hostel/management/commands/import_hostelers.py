@@ -0,0 +1,49 @@
+"""
+Management command to import hostelers from a CSV or JSON file.
+Usage: python manage.py import_hostelers students.csv [--type csv|json] [--default-age 18] [--dry-run]
+
+Columns use the API's camelCase or the model's snake_case names; the
+admissions export format (data/sample_students.json) is understood too.
+Rows with errors are skipped and listed with their row number.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from hostel import importer
+
+
+class Command(BaseCommand):
+    help = 'Creates hostelers in bulk from a CSV or JSON file'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV, JSON array or JSON Lines file')
+        parser.add_argument('--type', choices=importer.FILE_TYPES, help='File type (default from the extension)')
+        parser.add_argument('--default-age', type=int, help='Age for rows that have none')
+        parser.add_argument('--dry-run', action='store_true', help='Validate without creating anything')
+    
+    def handle(self, *args, **options):
+        file_type = options['type'] or importer.file_type_for(options['path'])
+        if file_type is None:
+            raise CommandError('Cannot tell the file type from the name; pass --type csv or --type json')
+        
+        started = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as stream:
+                summary = importer.run(importer.parse(stream, file_type), options['default_age'], options['dry_run'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except importer.ImportFormatError as exc:
+            raise CommandError(f'Could not read {options["path"]}: {exc}')
+        
+        for failure in summary['errors']:
+            messages = '; '.join(f'{field}: {message}' for field, message in failure['errors'].items())
+            self.stderr.write(f"Row {failure['row']}: {messages}")
+        
+        verb = 'Would create' if summary['dryRun'] else 'Created'
+        count = summary['valid'] if summary['dryRun'] else summary['created']
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} of {summary['total']} hosteler(s); {summary['invalid']} row(s) with errors "
+            f"({time.monotonic() - started:.1f}s)"
+        ))
+        if summary['hostelerIds']:
+            self.stdout.write(f"Hosteler IDs {summary['hostelerIds'][0]} to {summary['hostelerIds'][-1]}")
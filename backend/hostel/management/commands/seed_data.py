@@ -1,8 +1,14 @@
 """
 Management command to seed database with sample data.
-Usage: python manage.py seed_data
+Usage: python manage.py seed_data [--scale N [--seed 1] [--years 2] [--as-of 2024-12-01]]
+
+With --scale, a reproducible synthetic dataset (core.synthetic) is added on
+top of the sample rows: N x 100 rooms, their hostelers and years of history.
 """
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
 from django.contrib.auth import get_user_model
 from hostel.models import Hosteler
 from rooms.models import Room
@@ -18,7 +24,30 @@ User = get_user_model()
 class Command(BaseCommand):
     help = 'Seeds the database with sample data matching frontend demo data'
     
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, help='Also generate N x 100 rooms of synthetic data')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for --scale (default 1)')
+        parser.add_argument('--years', type=int, default=2, help='Years of history for --scale (default 2)')
+        parser.add_argument('--as-of', help='Date the synthetic history runs up to (default today), YYYY-MM-DD')
+    
     def handle(self, *args, **options):
+        as_of = None
+        if options['as_of']:
+            try:
+                as_of = parse_date(options['as_of'])
+            except ValueError:
+                as_of = None
+            if as_of is None:
+                raise CommandError('--as-of must be YYYY-MM-DD')
+        if options['scale'] is not None and options['scale'] < 1:
+            raise CommandError('--scale must be at least 1')
+        if options['years'] < 1:
+            raise CommandError('--years must be at least 1')
+        if options['scale']:
+            from core import synthetic
+            if synthetic.already_generated():
+                raise CommandError('Synthetic data is already present; use a fresh database for --scale')
+        
         self.stdout.write('Seeding database...')
         
         # Create users
@@ -39,8 +68,27 @@ class Command(BaseCommand):
         # Create feedback
         self.create_feedback()
         
+        if options['scale']:
+            self.create_synthetic(options['scale'], options['seed'], options['years'], as_of)
+        
         self.stdout.write(self.style.SUCCESS('Database seeded successfully!'))
     
+    def create_synthetic(self, scale, seed, years, as_of):
+        """Generate the --scale dataset."""
+        from core import synthetic
+        self.stdout.write(f'Generating synthetic data (scale {scale}, seed {seed}, {years} years)...')
+        started = time.monotonic()
+        try:
+            counts = synthetic.generate(scale, seed, years, as_of, log=self.stdout.write)
+        except synthetic.SyntheticDataExists as exc:
+            raise CommandError(str(exc))
+        for table, rows in counts.items():
+            self.stdout.write(f'  {table}: {rows}')
+        self.stdout.write(
+            f'Created {sum(counts.values())} rows in {time.monotonic() - started:.0f}s; '
+            f'students log in with their hosteler ID and password {synthetic.STUDENT_PASSWORD}'
+        )
+    
     def create_users(self):
         """Create warden and student users."""
         # Create warden
@@ -158,6 +206,9 @@ class Command(BaseCommand):
         for hosteler_data in hostelers_data:
             Hosteler.objects.get_or_create(hosteler_id=hosteler_data['hosteler_id'], defaults=hosteler_data)
         
+        # Keep auto-generated IDs clear of the fixed sample IDs
+        Hosteler.sync_id_sequence()
+        
         self.stdout.write('Created sample hostelers')
     
     def create_outpasses(self):
@@ -220,6 +271,8 @@ class Command(BaseCommand):
         for payment_data in payments_data:
             Payment.objects.get_or_create(invoice_no=payment_data['invoice_no'], defaults=payment_data)
         
+        Payment.sync_id_sequence()
+        
         self.stdout.write('Created sample payments')
     
     def create_feedback(self):
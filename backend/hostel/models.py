@@ -68,6 +68,30 @@ class Hosteler(models.Model):
     def __str__(self):
         return f"{self.hosteler_id} - {self.name}"
     
+    @classmethod
+    def next_hosteler_ids(cls, count=1):
+        """Reserve ``count`` new hosteler IDs (H2024001 format) from the shared sequence."""
+        from core.sequences import allocate
+        numbers = allocate('hosteler_id', count, start=2024001, seed=cls.max_hosteler_number)
+        return [f'H{number}' for number in numbers]
+    
+    @classmethod
+    def max_hosteler_number(cls):
+        """Highest numeric hosteler ID in the table (full scan; seeds the sequence)."""
+        from core.sequences import max_code_number
+        return max_code_number(cls.objects.values_list('hosteler_id', flat=True).iterator(), 'H')
+    
+    @classmethod
+    def sync_id_sequence(cls, number=None):
+        """
+        Move the sequence past ``number``, by default the highest hosteler ID
+        in the table (for IDs that were inserted explicitly).
+        """
+        from core.sequences import advance_to
+        if number is None:
+            number = cls.max_hosteler_number()
+        advance_to('hosteler_id', number, seed=cls.max_hosteler_number)
+    
     @property
     def room_number(self):
         """Get room number for serializer."""
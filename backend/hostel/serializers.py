@@ -1,8 +1,12 @@
 """
 Serializers for Hosteler model with camelCase transformation.
 """
+from contextlib import contextmanager
+from django.db import transaction
 from rest_framework import serializers
+from core.sequences import max_code_number
 from core.serializers import CamelCaseModelSerializer
+from rooms import allocation
 from .models import Hosteler
 
 
@@ -14,9 +18,13 @@ class HostelerSerializer(CamelCaseModelSerializer):
     # Computed fields for frontend compatibility
     id = serializers.CharField(source='hosteler_id', read_only=True)
     record_id = serializers.IntegerField(source='pk', read_only=True)
-    room_number = serializers.CharField(source='room_number', read_only=True)
+    room_number = serializers.CharField(read_only=True)
     room_id = serializers.IntegerField(source='room.id', read_only=True, allow_null=True)
     
+    fast_sources = {
+        'room_number': ('room__room_number', lambda value: value or ''),
+    }
+    
     class Meta:
         model = Hosteler
         fields = [
@@ -27,17 +35,55 @@ class HostelerSerializer(CamelCaseModelSerializer):
             'parent_phone', 'parent_address', 'emergency_name', 'emergency_phone'
         ]
         read_only_fields = ['id', 'record_id', 'registration_date', 'room_number', 'room_id']
+        # Generated from the hosteler_id sequence when omitted
+        extra_kwargs = {'hosteler_id': {'required': False}}
     
     def create(self, validated_data):
         """Create a new hosteler with auto-generated ID if not provided."""
-        if 'hosteler_id' not in validated_data or not validated_data['hosteler_id']:
-            # Auto-generate hosteler_id
-            last_hosteler = Hosteler.objects.order_by('-id').first()
-            if last_hosteler:
-                last_num = int(last_hosteler.hosteler_id[1:])
-                new_num = last_num + 1
+        # Beds are handed out by the allocation service, not written directly
+        room = validated_data.pop('room', None)
+        bed = validated_data.pop('bed', '') or None
+        with transaction.atomic():
+            if validated_data.get('hosteler_id'):
+                # An explicit ID may be ahead of the sequence; later generated IDs go past it
+                explicit = max_code_number([validated_data['hosteler_id']], 'H')
+                if explicit:
+                    Hosteler.sync_id_sequence(explicit)
             else:
-                new_num = 2024001
-            validated_data['hosteler_id'] = f'H{new_num}'
+                # Auto-generate hosteler_id from the shared sequence
+                validated_data['hosteler_id'] = Hosteler.next_hosteler_ids()[0]
+            hosteler = super().create(validated_data)
+            if room is not None:
+                with allocation_errors():
+                    allocation.allocate(hosteler, room, bed, hosteler.checkin_date)
+                hosteler.refresh_from_db()
+        return hosteler
+    
+    def update(self, instance, validated_data):
+        """Update a hosteler, moving them between beds through the allocation service."""
+        room_given = 'room' in validated_data
+        room = validated_data.pop('room', None)
+        bed = validated_data.pop('bed', '') or None
         
-        return super().create(validated_data)
+        with transaction.atomic():
+            hosteler = super().update(instance, validated_data)
+            target = room if room_given else hosteler.room
+            with allocation_errors():
+                if target is None:
+                    if hosteler.room_id:
+                        allocation.release(hosteler)
+                elif not hosteler.room_id:
+                    allocation.allocate(hosteler, target, bed, hosteler.checkin_date)
+                elif target.pk != hosteler.room_id or (bed and bed != hosteler.bed):
+                    allocation.transfer(hosteler, target, bed)
+            hosteler.refresh_from_db()
+        return hosteler
+
+
+@contextmanager
+def allocation_errors():
+    """Report bed allocation failures as validation errors on the room field."""
+    try:
+        yield
+    except allocation.AllocationError as exc:
+        raise serializers.ValidationError({'room': str(exc)})
@@ -0,0 +1,91 @@
+"""
+Tests for hosteler creation, the bulk import and the hosteler export.
+"""
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from hostel import importer
+from hostel.models import Hosteler
+
+
+def row(number, **values):
+    return {
+        'name': f'Student {number}',
+        'gender': 'male',
+        'age': 20,
+        'mobile': f'98765{number:05d}',
+        'email': f'student{number}@example.com',
+        **values,
+    }
+
+
+class HostelerImportTests(TestCase):
+
+    def test_explicit_id_does_not_collide_with_generated_ids(self):
+        rows = enumerate([row(1), row(2, hostelerId='H2024001')], start=2)
+
+        result = importer.run(rows)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(sorted(result['hostelerIds']), ['H2024001', 'H2024002'])
+        self.assertEqual(Hosteler.objects.count(), 2)
+
+    def test_generated_ids_follow_explicit_ids(self):
+        importer.run(enumerate([row(1, hostelerId='H2024050')], start=2))
+
+        result = importer.run(enumerate([row(2)], start=2))
+
+        self.assertEqual(result['hostelerIds'], ['H2024051'])
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class HostelerExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    def test_csv_export_reads_every_batch(self):
+        importer.run(enumerate([row(number) for number in range(5)], start=2))
+
+        response = self.client.get('/api/hostelers/export/?fileType=csv')
+
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len({line.split(',')[1] for line in lines[1:]}), 5)
+
+    async def test_csv_export_streams_asynchronously_under_asgi(self):
+        await sync_to_async(importer.run)(enumerate([row(number) for number in range(5)], start=2))
+        warden = await User.objects.aget(username='warden')
+        token = AccessToken.for_user(warden)
+
+        response = await AsyncClient().get(
+            '/api/hostelers/export/?fileType=csv', headers={'Authorization': f'Bearer {token}'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode('utf-8-sig').splitlines()), 6)
+
+
+class HostelerCreateTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    def test_generated_id_follows_an_explicit_one(self):
+        self.client.post('/api/hostelers/', row(1), format='json')
+        response = self.client.post('/api/hostelers/', row(2, hostelerId='H2024002'), format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/hostelers/', row(3), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['hostelerId'], 'H2024003')
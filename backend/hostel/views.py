@@ -1,15 +1,19 @@
 """
 Views for Hosteler management.
 """
+from django.db import transaction
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from core.permissions import IsWardenOrReadOnly
+from core.permissions import IsWarden, IsWardenOrReadOnly
+from core.mixins import ExportModelMixin, FastListModelMixin
+from . import importer
 from .models import Hosteler
 from .serializers import HostelerSerializer
 
 
-class HostelerViewSet(viewsets.ModelViewSet):
+class HostelerViewSet(FastListModelMixin, ExportModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Hosteler CRUD operations.
     
@@ -20,6 +24,8 @@ class HostelerViewSet(viewsets.ModelViewSet):
     - PUT /api/hostelers/{id}/ - Update hosteler (Warden only)
     - PATCH /api/hostelers/{id}/ - Partial update (Warden only)
     - DELETE /api/hostelers/{id}/ - Delete hosteler (Warden only)
+    - GET /api/hostelers/export/?fileType=csv|xlsx - Stream the list as a file
+    - POST /api/hostelers/import/ - Create hostelers from a CSV or JSON file (Warden only)
     """
     queryset = Hosteler.objects.all().select_related('room')
     serializer_class = HostelerSerializer
@@ -36,3 +42,41 @@ class HostelerViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(hosteler_id=user.hosteler_id)
         
         return queryset
+    
+    def perform_destroy(self, instance):
+        """Free the hosteler's bed before removing them."""
+        from rooms import allocation
+        with transaction.atomic():
+            if instance.room_id:
+                allocation.release(instance)
+            instance.delete()
+    
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAuthenticated, IsWarden])
+    def bulk_import(self, request):
+        """
+        Create hostelers from an uploaded file, reporting errors per row.
+        POST /api/hostelers/import/ (multipart/form-data)
+        Fields: file, fileType ("csv"/"json", default from the file name),
+                dryRun ("true" only validates), defaultAge (for files without ages)
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_type = request.data.get('fileType') or importer.file_type_for(upload.name)
+        if file_type not in importer.FILE_TYPES:
+            return Response({'error': 'fileType must be csv or json'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        default_age = request.data.get('defaultAge') or None
+        if default_age is not None:
+            try:
+                default_age = int(default_age)
+            except (TypeError, ValueError):
+                return Response({'error': 'defaultAge must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        dry_run = request.data.get('dryRun', False) in (True, 'true', '1')
+        try:
+            summary = importer.run(importer.parse(upload.file, file_type), default_age, dry_run)
+        except importer.ImportFormatError as exc:
+            return Response({'error': f'Could not read file: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK)
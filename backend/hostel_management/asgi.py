@@ -1,5 +1,9 @@
 """
 ASGI config for hostel_management project.
+
+Serve with an ASGI server (e.g. ``uvicorn hostel_management.asgi:application``)
+to use the notification stream; under WSGI it answers 501 and clients fall
+back to the long poll.
 """
 
 import os
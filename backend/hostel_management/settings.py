@@ -40,6 +40,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.RequestProfilingMiddleware',
+    'core.sampling.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -117,7 +119,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.ProfiledJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -127,6 +129,11 @@ REST_FRAMEWORK = {
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
 }
 
+# Outpass, payment, notification and feedback lists use keyset (cursor)
+# pagination. Set to False to fall back to the old page-number format
+# everywhere; clients can also opt in per request with ?page=N.
+KEYSET_PAGINATION = config('KEYSET_PAGINATION', default=True, cast=bool)
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -144,3 +151,70 @@ CORS_ALLOWED_ORIGINS = config(
     default='http://127.0.0.1:5500,http://localhost:5500'
 ).split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['ETag', 'Server-Timing']
+
+# Cache (used for versioned API payloads; point at Redis/Memcached in production)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='smarthostel'),
+    }
+}
+# Whether every worker process sees the same cache. LocMemCache is private to
+# its process, so with it the data versions behind cached payloads and ETags
+# aren't shared and those caches are skipped. Set CACHE_SHARED=True to keep
+# them on a single-process server, or point CACHE_BACKEND at Redis/Memcached.
+CACHE_SHARED = config(
+    'CACHE_SHARED', cast=bool,
+    default=not any(name in CACHES['default']['BACKEND'] for name in ('locmem', 'dummy')),
+)
+HOSTEL_DATA_CACHE_TIMEOUT = config('HOSTEL_DATA_CACHE_TIMEOUT', default=3600, cast=int)
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = config('NOTIFICATION_UNREAD_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Push channel for /api/notifications/stream/ (SSE) and /api/notifications/poll/ (long-poll).
+# The in-process hub only reaches clients on the same worker; swap it for a
+# broker-backed class when running more than one ASGI process.
+NOTIFICATION_HUB_BACKEND = config('NOTIFICATION_HUB_BACKEND', default='notifications.hub.InProcessHub')
+NOTIFICATION_STREAM_HEARTBEAT = config('NOTIFICATION_STREAM_HEARTBEAT', default=15, cast=int)
+NOTIFICATION_LONG_POLL_TIMEOUT = config('NOTIFICATION_LONG_POLL_TIMEOUT', default=25, cast=int)
+
+# Presence report (/api/outpasses/presence/) only considers outpasses that
+# started within this many days, which bounds the index scan.
+PRESENCE_LOOKBACK_DAYS = config('PRESENCE_LOOKBACK_DAYS', default=90, cast=int)
+
+# Monthly fee run: invoices fall due on this day of the billed month
+FEE_DUE_DAY = config('FEE_DUE_DAY', default=10, cast=int)
+
+# Exports (/api/<resource>/export/) fetch rows from the database in batches of this size
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Delta sync for /api/hostel-data/?since=<token>
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# Request profiling (core.profiling): query counts and time, duplicate
+# queries, and auth/serialize/render time per request, logged as one JSON
+# line on the core.profiling logger and sent as Server-Timing headers.
+# Turn the headers off to keep the numbers out of public responses.
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_HEADERS = config('REQUEST_PROFILING_HEADERS', default=True, cast=bool)
+
+# Request captures (core.sampling) for `manage.py profile_report`: requests
+# slower than PROFILE_SLOW_MS get stack samples, one in PROFILE_SAMPLE_RATE
+# runs under cProfile. 0 turns either off. Captures go to a rotating file.
+PROFILE_SLOW_MS = config('PROFILE_SLOW_MS', default=0, cast=int)
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0, cast=int)
+PROFILE_STACK_INTERVAL_MS = config('PROFILE_STACK_INTERVAL_MS', default=10, cast=int)
+PROFILE_CAPTURE_FILE = config('PROFILE_CAPTURE_FILE', default=str(BASE_DIR / 'profiles' / 'captures.jsonl'))
+PROFILE_CAPTURE_MAX_BYTES = config('PROFILE_CAPTURE_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+PROFILE_CAPTURE_BACKUPS = config('PROFILE_CAPTURE_BACKUPS', default=5, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
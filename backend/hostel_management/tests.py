@@ -0,0 +1,46 @@
+"""
+Tests for the hostel-data payload cache.
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from rooms.models import Room
+
+
+def make_room(number):
+    return Room.objects.create(
+        room_number=number, block='a-block', floor='ground', room_type='non-ac',
+        bed_type='double', total_beds=2, available_beds=2, room_rate=4500, is_available=True,
+    )
+
+
+class HostelDataCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_cache_answers_unchanged_polls_with_304(self):
+        response = self.client.get('/api/hostel-data/')
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get('/api/hostel-data/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_room('A101')
+        self.assertEqual(self.client.get('/api/hostel-data/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_is_not_used(self):
+        response = self.client.get('/api/hostel-data/')
+        self.assertNotIn('ETag', response)
+
+        # A write another worker made: this process's data versions don't move
+        make_room('A102')
+        response = self.client.get('/api/hostel-data/', HTTP_IF_NONE_MATCH='"anything"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['roomNumber'] for room in response.json()['rooms']], ['A102'])
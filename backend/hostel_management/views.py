@@ -1,10 +1,20 @@
 """
 Aggregate view for frontend hostel-data endpoint.
 """
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from core import sync
+from core.cache import get_data_versions, is_shared, versioned_key
+from core.profiling import timed
 from hostel.models import Hosteler
 from rooms.models import Room
 from outpass.models import Outpass
@@ -22,27 +32,89 @@ class HostelDataView(APIView):
     """
     Aggregate endpoint that returns all hostel data for the dashboard.
     Matches frontend expectation: GET /api/hostel-data/
+
+    Every response carries a ``syncToken``. Passing it back as
+    GET /api/hostel-data/?since=<token> returns only rows created or updated
+    since that token, plus the ids of deleted rows under ``deleted``.
+
+    Full payloads are cached as rendered JSON keyed by the data versions of
+    the synced collections, and carry a strong ETag so unchanged polls can be
+    answered with 304 Not Modified. Both need a cache every worker shares;
+    without one each full request is built afresh and has no ETag. Rows are
+    serialized through the ``fast_list`` values() path rather than full DRF
+    serializers.
     """
     permission_classes = [IsAuthenticated]
-    
-    def get(self, request):
-        # Get all data
-        hostelers = Hosteler.objects.all()
-        rooms = Room.objects.all()
-        outpasses = Outpass.objects.all().select_related('hosteler')
-        payments = Payment.objects.all().select_related('hosteler')
-        feedback = Feedback.objects.all()
-        
-        # Serialize
-        data = {
-            'hostelers': HostelerSerializer(hostelers, many=True).data,
-            'rooms': RoomSerializer(rooms, many=True).data,
-            'outpasses': OutpassSerializer(outpasses, many=True).data,
-            'bookings': [],  # Not implemented yet, frontend has bookings separate from room alloc
-            'payments': PaymentSerializer(payments, many=True).data,
-            'maintenance': [],  # Placeholder for future feature
-            'inventory': [],  # Placeholder for future feature
-            'feedback': FeedbackSerializer(feedback, many=True).data,
+
+    def get_collections(self):
+        """Querysets and serializers for each synced collection."""
+        return {
+            'hostelers': (Hosteler.objects.all().select_related('room'), HostelerSerializer),
+            'rooms': (Room.objects.all(), RoomSerializer),
+            'outpasses': (Outpass.objects.all().select_related('hosteler'), OutpassSerializer),
+            'payments': (Payment.objects.all().select_related('hosteler'), PaymentSerializer),
+            'feedback': (Feedback.objects.all(), FeedbackSerializer),
         }
-        
-        return Response(data)
+
+    def build_payload(self, since=None):
+        """Serialize the dashboard payload, optionally limited to changes since ``since``."""
+        # Taken before querying so rows saved mid-request show up in the next delta
+        synced_at = timezone.now()
+
+        collections = self.get_collections()
+        if since:
+            data = {
+                name: serializer_class.fast_list(queryset.filter(updated_at__gte=since))
+                for name, (queryset, serializer_class) in collections.items()
+            }
+            data['deleted'] = sync.deleted_since(since)
+        else:
+            data = {
+                'hostelers': HostelerSerializer.fast_list(collections['hostelers'][0]),
+                'rooms': RoomSerializer.fast_list(collections['rooms'][0]),
+                'outpasses': OutpassSerializer.fast_list(collections['outpasses'][0]),
+                'bookings': [],  # Not implemented yet, frontend has bookings separate from room alloc
+                'payments': PaymentSerializer.fast_list(collections['payments'][0]),
+                'maintenance': [],  # Placeholder for future feature
+                'inventory': [],  # Placeholder for future feature
+                'feedback': FeedbackSerializer.fast_list(collections['feedback'][0]),
+            }
+
+        data['full'] = not since
+        data['syncToken'] = sync.make_token(synced_at)
+        return data
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = sync.read_token(since)
+            except sync.InvalidSyncToken:
+                return Response({'error': 'Invalid sync token'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Tombstones past the retention window may be gone, so resync fully
+            if not sync.is_expired(since):
+                return Response(self.build_payload(since))
+
+        if not is_shared():
+            # Another worker's writes wouldn't move this process's versions
+            return Response(self.build_payload())
+
+        # Versions are read before building so a concurrent write lands under a newer key
+        versions = get_data_versions(sync.SYNC_COLLECTIONS)
+        key, etag = versioned_key('hostel-data', versions)
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            content = cache.get(key)
+            if content is None:
+                payload = self.build_payload()
+                with timed('render'):
+                    content = JSONRenderer().render(payload)
+                cache.set(key, content, settings.HOSTEL_DATA_CACHE_TIMEOUT)
+            response = HttpResponse(content, content_type='application/json')
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
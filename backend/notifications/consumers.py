@@ -0,0 +1,89 @@
+"""
+Turns committed domain events into student notifications.
+
+Each batch is resolved to recipients with one query per event type and
+written with a single bulk_create, so approving 200 outpasses costs one
+INSERT after the approval transaction commits, not 200 inside it.
+"""
+from django.db import transaction
+
+from accounts.models import User
+from core import events
+from . import counters, push
+from .models import Notification
+
+
+def students_by(field, values):
+    """Map each value of User.<field> to the active student user ids holding it."""
+    recipients = {}
+    rows = User.objects.filter(
+        role='student', is_active=True, **{f'{field}__in': set(values)}
+    ).values_list(field, 'pk')
+    for value, user_id in rows:
+        recipients.setdefault(value, []).append(user_id)
+    return recipients
+
+
+def outpass_notification(payload):
+    decision = payload['status']
+    message = f"Your outpass for {payload['out_date']} was {decision}."
+    if payload.get('warden_reply'):
+        message += f" Warden's note: {payload['warden_reply']}"
+    return 'outpass', f'Outpass {decision}', message, payload['outpass_id']
+
+
+def payment_notification(payload):
+    return (
+        'payment',
+        'Payment received',
+        f"We received your payment of ₹{payload['amount']} (invoice {payload['invoice_no']}).",
+        payload['payment_id'],
+    )
+
+
+def feedback_notification(payload):
+    return 'feedback', 'Reply to your feedback', payload['reply'], payload['feedback_id']
+
+
+def notify(batch, recipient_field, payload_key, build):
+    """Create one notification per (event, recipient) in a single bulk insert."""
+    recipients = students_by(recipient_field, [event.payload[payload_key] for event in batch])
+    notifications = []
+    for event in batch:
+        notification_type, title, message, related_id = build(event.payload)
+        notifications.extend(
+            Notification(
+                user_id=user_id,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                related_id=related_id,
+            )
+            for user_id in recipients.get(event.payload[payload_key], ())
+        )
+    if not notifications:
+        return
+    
+    with transaction.atomic():
+        created = Notification.bulk_create_with_ids(notifications)
+        # bulk_create skips post_save, which normally maintains these
+        counters.invalidate({notification.user_id for notification in notifications})
+        push.publish_notifications(created)
+
+
+def outpass_status_changed(batch):
+    notify(batch, 'hosteler_id', 'hosteler_id', outpass_notification)
+
+
+def payment_completed(batch):
+    notify(batch, 'hosteler_id', 'hosteler_id', payment_notification)
+
+
+def feedback_replied(batch):
+    notify(batch, 'email', 'student_email', feedback_notification)
+
+
+def connect():
+    events.subscribe(events.OUTPASS_STATUS_CHANGED, outpass_status_changed)
+    events.subscribe(events.PAYMENT_COMPLETED, payment_completed)
+    events.subscribe(events.FEEDBACK_REPLIED, feedback_replied)
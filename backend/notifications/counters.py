@@ -0,0 +1,95 @@
+"""
+Per-user unread notification counters kept in the cache.
+
+The counter is filled from an indexed COUNT on first read and then moved
+with incr/decr as notifications are created, read and deleted. Writes that
+can't tell exactly how the count changed (bulk inserts with
+ignore_conflicts, generic updates) drop the entry instead, and the next
+read recounts. Entries expire after NOTIFICATION_UNREAD_CACHE_TIMEOUT so
+any drift heals on its own.
+
+A count cached in one worker's private cache would miss what the others
+change, so unless the cache is shared (core.cache.is_shared) every read
+is the indexed COUNT and the counters aren't kept at all.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.cache import is_shared
+from .models import Notification
+
+UNREAD_KEY = 'notifications-unread:{}'
+
+
+def _key(user_id):
+    return UNREAD_KEY.format(user_id)
+
+
+def unread_count(user_id):
+    """Return the user's unread count, counting from the database on a cache miss."""
+    if not is_shared():
+        return Notification.objects.filter(user_id=user_id, is_read=False).count()
+    key = _key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        # add(), not set(): never overwrite a value a concurrent write already moved
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def _adjust(user_id, delta):
+    key = _key(user_id)
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        # Not cached; the next read counts from the database
+        pass
+
+
+def adjust(user_id, delta):
+    """Move the user's counter by ``delta`` once the transaction commits."""
+    if not is_shared():
+        return
+    transaction.on_commit(lambda: _adjust(user_id, delta))
+
+
+def reset(user_id, count=0):
+    """Set the user's counter to a known value once the transaction commits."""
+    if not is_shared():
+        return
+    transaction.on_commit(
+        lambda: cache.set(_key(user_id), count, settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT)
+    )
+
+
+def invalidate(user_ids):
+    """Drop counters so they are recounted on the next read."""
+    if not is_shared():
+        return
+    keys = [_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        if not instance.is_read:
+            adjust(instance.user_id, 1)
+    else:
+        invalidate([instance.user_id])
+
+
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust(instance.user_id, -1)
+
+
+def connect():
+    post_save.connect(notification_saved, sender=Notification, dispatch_uid='notification-unread-save')
+    post_delete.connect(notification_deleted, sender=Notification, dispatch_uid='notification-unread-delete')
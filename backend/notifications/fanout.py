@@ -0,0 +1,110 @@
+"""
+Bulk notification fan-out.
+
+Resolves an audience to recipient users in one query and writes one
+Notification per user with chunked ``bulk_create`` inside a transaction.
+A ``dedup_key`` makes the send idempotent: users who already hold a
+notification with that key are skipped, and the (user, dedup_key) unique
+constraint catches anything a concurrent retry slips past.
+"""
+import time
+
+from django.db import transaction
+
+from accounts.models import User
+from hostel.models import Hosteler
+from payments.models import Payment
+from . import counters, push
+from .models import Notification
+
+AUDIENCES = ('all', 'block', 'floor', 'rooms', 'pending_payments')
+
+CHUNK_SIZE = 1000
+
+
+class FanOutError(Exception):
+    """Raised when an audience cannot be resolved."""
+
+
+def audience_hostelers(audience, block=None, floor=None, rooms=None):
+    """Hosteler IDs (H2024001) in the audience, as a subquery, or None for every student."""
+    if audience == 'all':
+        return None
+    if audience == 'block':
+        if not block:
+            raise FanOutError('block is required for the block audience')
+        hostelers = Hosteler.objects.filter(room__block=block)
+    elif audience == 'floor':
+        if not floor:
+            raise FanOutError('floor is required for the floor audience')
+        hostelers = Hosteler.objects.filter(room__floor=floor)
+        if block:
+            hostelers = hostelers.filter(room__block=block)
+    elif audience == 'rooms':
+        if not rooms:
+            raise FanOutError('rooms is required for the rooms audience')
+        hostelers = Hosteler.objects.filter(room__room_number__in=rooms)
+    elif audience == 'pending_payments':
+        hostelers = Hosteler.objects.filter(
+            pk__in=Payment.objects.filter(status='pending').values('hosteler_id')
+        )
+    else:
+        raise FanOutError(f"Unknown audience '{audience}'; expected one of {', '.join(AUDIENCES)}")
+    return hostelers.values('hosteler_id')
+
+
+def resolve_recipients(audience, block=None, floor=None, rooms=None, dedup_key=None):
+    """Return the recipient user ids with a single query."""
+    users = User.objects.filter(role='student', is_active=True)
+    hosteler_ids = audience_hostelers(audience, block, floor, rooms)
+    if hosteler_ids is not None:
+        users = users.filter(hosteler_id__in=hosteler_ids)
+    if dedup_key:
+        users = users.exclude(pk__in=Notification.objects.filter(dedup_key=dedup_key).values('user_id'))
+    return list(users.order_by('pk').values_list('pk', flat=True))
+
+
+def fan_out(audience, title, message, notification_type='general', related_id=None,
+            dedup_key=None, block=None, floor=None, rooms=None, chunk_size=CHUNK_SIZE):
+    """
+    Create one notification per recipient.
+    Returns a summary with recipient count and write throughput.
+    """
+    started = time.perf_counter()
+    user_ids = resolve_recipients(audience, block, floor, rooms, dedup_key)
+    resolved = time.perf_counter()
+    
+    with transaction.atomic():
+        for offset in range(0, len(user_ids), chunk_size):
+            # Pushed events need real ids, which plain bulk_create can't always give
+            created = Notification.bulk_create_with_ids(
+                [
+                    Notification(
+                        user_id=user_id,
+                        notification_type=notification_type,
+                        title=title,
+                        message=message,
+                        related_id=related_id,
+                        dedup_key=dedup_key or None,
+                    )
+                    for user_id in user_ids[offset:offset + chunk_size]
+                ],
+                ignore_conflicts=bool(dedup_key),
+            )
+            push.publish_notifications(created)
+        # bulk_create skips post_save, so recipients' unread counters are recounted
+        counters.invalidate(user_ids)
+    finished = time.perf_counter()
+    
+    write_seconds = finished - resolved
+    return {
+        'audience': audience,
+        'recipients': len(user_ids),
+        'chunks': -(-len(user_ids) // chunk_size),
+        'timings': {
+            'resolveMs': round((resolved - started) * 1000, 1),
+            'writeMs': round(write_seconds * 1000, 1),
+            'totalMs': round((finished - started) * 1000, 1),
+        },
+        'perSecond': round(len(user_ids) / write_seconds) if write_seconds and user_ids else 0,
+    }
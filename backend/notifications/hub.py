@@ -0,0 +1,113 @@
+"""
+Publish/subscribe hub behind the notification stream endpoints.
+
+Channels are plain strings: ``user:<id>`` for one account, ``hosteler:<H2024001>``
+for a student's outpass updates and ``wardens`` for every warden. Events are
+JSON-serializable dicts with a ``type`` key.
+
+The default ``InProcessHub`` delivers only to clients connected to the same
+process, which is enough for a single ASGI worker. Point
+NOTIFICATION_HUB_BACKEND at another class with the same ``subscribe`` /
+``publish`` methods (e.g. one backed by a local Redis) when running several.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One connected client's queue of events, bound to its event loop."""
+
+    def __init__(self, hub, channels):
+        self.hub = hub
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Runs on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next event, or None after ``timeout`` seconds of silence."""
+        if self.overflowed:
+            # Events were dropped; tell the client to refetch instead of showing gaps
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return {'type': 'resync'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InProcessHub:
+    """Fan events out to subscribers in this process. Safe to publish from any thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, channels):
+        """Must be called from the event loop that will read the subscription."""
+        subscription = Subscription(self, list(channels))
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[channel]
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The client's loop is gone
+                self.unsubscribe(subscription)
+
+    def connection_count(self):
+        with self.lock:
+            return len({subscription for subscribers in self.subscribers.values() for subscription in subscribers})
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """The process-wide hub configured by NOTIFICATION_HUB_BACKEND."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = import_string(settings.NOTIFICATION_HUB_BACKEND)()
+    return _hub
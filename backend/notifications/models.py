@@ -1,7 +1,9 @@
 """
 Notification model for system notifications.
 """
-from django.db import models
+from collections import Counter
+
+from django.db import connection, models
 
 
 class Notification(models.Model):
@@ -28,6 +30,9 @@ class Notification(models.Model):
     # Optional link to related object
     related_id = models.IntegerField(null=True, blank=True)
     
+    # Set by fan-out so a retried announcement is not delivered twice (NULLs never collide)
+    dedup_key = models.CharField(max_length=100, null=True, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     read_at = models.DateTimeField(null=True, blank=True)
@@ -37,6 +42,51 @@ class Notification(models.Model):
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over a user's notifications
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+            # Unread badge counts
+            models.Index(fields=['user', 'is_read'], name='notification_user_read_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'dedup_key'], name='notification_user_dedup_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+    
+    # What identifies a bulk-inserted row when it comes back without a pk
+    BULK_KEY_FIELDS = ('user_id', 'notification_type', 'title', 'message', 'related_id', 'dedup_key')
+    
+    @classmethod
+    def bulk_create_with_ids(cls, notifications, ignore_conflicts=False):
+        """
+        bulk_create that returns the inserted rows with their primary keys.
+        
+        Backends without RETURNING (MySQL), and every backend when
+        ``ignore_conflicts`` is set, leave pk unset, so the rows are read back
+        by pk above the previous maximum. Rows skipped as conflicts aren't
+        returned. Call inside a transaction.
+        """
+        if not notifications:
+            return []
+        if connection.features.can_return_rows_from_bulk_insert and not ignore_conflicts:
+            return cls.objects.bulk_create(notifications)
+        
+        last_pk = cls.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        cls.objects.bulk_create(notifications, ignore_conflicts=ignore_conflicts)
+        
+        wanted = Counter(
+            tuple(getattr(notification, field) for field in cls.BULK_KEY_FIELDS)
+            for notification in notifications
+        )
+        candidates = cls.objects.filter(
+            pk__gt=last_pk, user_id__in={notification.user_id for notification in notifications},
+        ).order_by('pk')
+        inserted = []
+        for notification in candidates:
+            key = tuple(getattr(notification, field) for field in cls.BULK_KEY_FIELDS)
+            if wanted[key]:
+                wanted[key] -= 1
+                inserted.append(notification)
+        return inserted
@@ -0,0 +1,68 @@
+"""
+Events pushed to the notification stream: new notifications and outpass status changes.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from .hub import get_hub
+from .models import Notification
+from .serializers import NotificationSerializer
+
+WARDENS_CHANNEL = 'wardens'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def hosteler_channel(hosteler_id):
+    return f'hosteler:{hosteler_id}'
+
+
+def channels_for(user):
+    """Channels a connected user listens on."""
+    channels = [user_channel(user.pk)]
+    if user.is_warden:
+        channels.append(WARDENS_CHANNEL)
+    elif user.hosteler_id:
+        channels.append(hosteler_channel(user.hosteler_id))
+    return channels
+
+
+def notification_event(notification):
+    return {'type': 'notification', 'data': NotificationSerializer(notification).data}
+
+
+def publish_notifications(notifications):
+    """Push new notifications to their recipients after commit."""
+    messages = [
+        (user_channel(notification.user_id), notification_event(notification))
+        for notification in notifications
+    ]
+    if messages:
+        transaction.on_commit(lambda: _publish_all(messages))
+
+
+def publish_outpasses(rows):
+    """Push serialized outpasses (status changes) to their students and to the wardens after commit."""
+    messages = []
+    for data in rows:
+        event = {'type': 'outpass', 'data': data}
+        messages += [(WARDENS_CHANNEL, event), (hosteler_channel(data['studentId']), event)]
+    if messages:
+        transaction.on_commit(lambda: _publish_all(messages))
+
+
+def _publish_all(messages):
+    hub = get_hub()
+    for channel, event in messages:
+        hub.publish(channel, event)
+
+
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish_notifications([instance])
+
+
+def connect():
+    post_save.connect(notification_saved, sender=Notification, dispatch_uid='notification-push-save')
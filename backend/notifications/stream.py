@@ -0,0 +1,136 @@
+"""
+Async push endpoints for notifications.
+
+Served as plain async Django views (DRF views are sync) so that, under an
+ASGI server, an idle connection is a suspended coroutine rather than a
+blocked worker thread.
+
+Both endpoints authenticate with the usual JWT, taken from
+``Authorization: Bearer ...`` or from ``?token=`` (EventSource cannot set
+headers). Clients resume with the id of the last notification they saw
+(``Last-Event-ID`` / ``?after=``); anything newer is read from the database
+before waiting on the hub, so nothing is lost across reconnects.
+
+The stream needs ASGI. Under WSGI Django drains an async streaming body into
+a list before sending anything, so an endless stream would hold a worker and
+grow without bound; there it answers 501 and clients use the long poll.
+"""
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from .hub import get_hub
+from .models import Notification
+from .push import channels_for, notification_event
+
+CATCH_UP_LIMIT = 100
+
+
+async def authenticate(request):
+    """Return the active user for the request's access token, or None."""
+    raw = request.GET.get('token')
+    if not raw:
+        header = request.headers.get('Authorization', '').split()
+        if len(header) == 2 and header[0] in jwt_settings.AUTH_HEADER_TYPES:
+            raw = header[1]
+    if not raw:
+        return None
+    try:
+        token = AccessToken(raw)
+    except TokenError:
+        return None
+    return await User.objects.filter(pk=token[jwt_settings.USER_ID_CLAIM], is_active=True).afirst()
+
+
+def parse_after(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def missed_events(user, after):
+    """Notifications created after id ``after``, oldest first."""
+    if after is None:
+        return []
+    queryset = Notification.objects.filter(user=user, pk__gt=after).order_by('pk')[:CATCH_UP_LIMIT]
+    return [notification_event(notification) async for notification in queryset]
+
+
+def unauthorized():
+    return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+
+def format_sse(event):
+    lines = []
+    if event['type'] == 'notification' and event['data'].get('id'):
+        lines.append(f"id: {event['data']['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event.get('data', {}), cls=DjangoJSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events stream of notification and outpass events.
+    GET /api/notifications/stream/?token=<access>
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'error': 'The event stream needs an ASGI server; use /api/notifications/poll/ instead',
+        }, status=501)
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+    after = parse_after(request.headers.get('Last-Event-ID') or request.GET.get('after'))
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT
+
+    async def events():
+        # Subscribe before catching up so nothing falls between the two
+        with get_hub().subscribe(channels_for(user)) as subscription:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            for event in await missed_events(user, after):
+                yield format_sse(event)
+            while True:
+                event = await subscription.get(heartbeat)
+                # Comment lines keep proxies from closing an idle connection
+                yield format_sse(event) if event else ': keep-alive\n\n'
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def notification_poll(request):
+    """
+    Long-poll fallback: returns as soon as there are events, or empty after a timeout.
+    GET /api/notifications/poll/?after=<last notification id>&timeout=25
+    """
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+    after = parse_after(request.GET.get('after'))
+    timeout = parse_after(request.GET.get('timeout'))
+    if timeout is None:
+        timeout = settings.NOTIFICATION_LONG_POLL_TIMEOUT
+    timeout = min(timeout, settings.NOTIFICATION_LONG_POLL_TIMEOUT)
+
+    with get_hub().subscribe(channels_for(user)) as subscription:
+        events = await missed_events(user, after)
+        if not events and timeout:
+            event = await subscription.get(timeout)
+            if event:
+                events.append(event)
+                # Take whatever else arrived in the same burst
+                while not subscription.queue.empty():
+                    events.append(subscription.queue.get_nowait())
+
+    return JsonResponse({'events': events}, encoder=DjangoJSONEncoder)
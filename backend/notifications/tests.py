@@ -0,0 +1,121 @@
+"""
+Tests for bulk notification fan-out, unread counters and the event stream.
+"""
+from unittest import mock
+
+from django.db import connection
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from notifications import counters, fanout, push
+from notifications.models import Notification
+
+
+class FanOutTests(TestCase):
+
+    def setUp(self):
+        self.students = [
+            User.objects.create_user(f'student{number}', password='student123', role='student')
+            for number in range(3)
+        ]
+
+    def published(self, **kwargs):
+        with mock.patch.object(push, 'publish_notifications') as publish:
+            fanout.fan_out('all', 'Water outage', 'No water 2-4 pm.', **kwargs)
+        return [notification for call in publish.call_args_list for notification in call.args[0]]
+
+    def test_pushed_notifications_have_ids_with_dedup_key(self):
+        published = self.published(dedup_key='outage-1')
+
+        self.assertEqual(len(published), 3)
+        self.assertEqual(
+            sorted(notification.pk for notification in published),
+            sorted(Notification.objects.values_list('pk', flat=True)),
+        )
+
+    def test_pushed_notifications_have_ids_without_returning(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            published = self.published()
+
+        self.assertEqual(len(published), 3)
+        self.assertTrue(all(notification.pk for notification in published))
+
+    def test_conflicting_rows_are_not_pushed(self):
+        Notification.objects.create(
+            user=self.students[0], notification_type='general', title='Water outage',
+            message='No water 2-4 pm.', dedup_key='outage-1',
+        )
+        # As if a concurrent retry inserted it after recipients were resolved
+        with mock.patch.object(fanout, 'resolve_recipients', return_value=[user.pk for user in self.students]):
+            published = self.published(dedup_key='outage-1')
+
+        self.assertEqual({notification.user_id for notification in published}, {user.pk for user in self.students[1:]})
+        self.assertTrue(all(notification.pk for notification in published))
+
+    def test_invalid_related_id_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        body = {'audience': 'all', 'title': 'Notice', 'message': 'Hello'}
+
+        for related_id in ('abc', 1.5, [1], True, 2 ** 80):
+            with self.subTest(relatedId=related_id):
+                response = client.post('/api/notifications/fan_out/', {**body, 'relatedId': related_id}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'relatedId must be an integer'})
+
+        response = client.post('/api/notifications/fan_out/', {**body, 'relatedId': '12'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(Notification.objects.values_list('related_id', flat=True)), {12})
+
+
+class StreamTests(TestCase):
+
+    def test_stream_needs_asgi(self):
+        response = Client().get('/api/notifications/stream/')
+
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('/api/notifications/poll/', response.json()['error'])
+
+    async def test_stream_under_asgi_authenticates(self):
+        response = await AsyncClient().get('/api/notifications/stream/')
+
+        self.assertEqual(response.status_code, 401)
+
+
+class UnreadCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('student', password='student123', role='student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def notify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(
+                user=self.student, notification_type='general', title='Notice', message='Hello',
+            )
+
+    def unread_count(self):
+        return self.client.get('/api/notifications/unread-count/').json()['unreadCount']
+
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_counter_moves_with_new_notifications(self):
+        self.notify()
+        self.assertEqual(self.unread_count(), 1)
+
+        self.notify()
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.unread_count(self.student.id), 2)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_counts_from_the_database(self):
+        self.notify()
+        self.assertEqual(self.unread_count(), 1)
+
+        # As if another worker marked it read: nothing in this process hears of it
+        Notification.objects.update(is_read=True)
+
+        self.assertEqual(self.unread_count(), 0)
@@ -3,11 +3,15 @@ URL configuration for notifications app.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .stream import notification_poll, notification_stream
 from .views import NotificationViewSet
 
 router = DefaultRouter()
 router.register(r'notifications', NotificationViewSet, basename='notification')
 
 urlpatterns = [
+    # Ahead of the router so "stream"/"poll" aren't taken for notification ids
+    path('notifications/stream/', notification_stream, name='notification-stream'),
+    path('notifications/poll/', notification_poll, name='notification-poll'),
     path('', include(router.urls)),
 ]
@@ -1,25 +1,35 @@
 """
 Views for Notification management.
 """
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from django.core.exceptions import ValidationError
 from django.utils import timezone
+from core.mixins import FastListModelMixin
+from core.permissions import IsWarden
+from core.pagination import KeysetPagination
+from . import counters, fanout
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(FastListModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Notification operations.
     
     Endpoints:
     - GET /api/notifications/ - List user's notifications
     - POST /api/notifications/ - Create notification (for system use)
+    - GET /api/notifications/unread-count/ - Unread badge count
     - POST /api/notifications/{id}/mark_read/ - Mark notification as read
+    - POST /api/notifications/mark_all_read/ - Mark every notification as read
+    - POST /api/notifications/fan_out/ - Send one notification to an audience (Warden only)
     """
     serializer_class = NotificationSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -30,9 +40,89 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def mark_read(self, request, pk=None):
         """Mark notification as read."""
         notification = self.get_object()
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+        if not notification.is_read:
+            now = timezone.now()
+            # Conditional UPDATE so a double click only decrements the counter once
+            if Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True, read_at=now):
+                counters.adjust(notification.user_id, -1)
+            notification.is_read = True
+            notification.read_at = now
         
         serializer = self.get_serializer(notification)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        """
+        Mark all of the current user's notifications as read with one UPDATE.
+        POST /api/notifications/mark_all_read/
+        """
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(
+            is_read=True, read_at=timezone.now()
+        )
+        counters.reset(request.user.id)
+        return Response({'updated': updated, 'unreadCount': 0})
+    
+    @action(detail=False, methods=['get'], url_path='unread-count',
+            authentication_classes=[JWTStatelessUserAuthentication])
+    def unread_count(self, request):
+        """
+        Unread badge count, served from the cache.
+        GET /api/notifications/unread-count/
+        Authenticates from the token claims alone, so a cache hit runs no queries.
+        """
+        return Response({'unreadCount': counters.unread_count(request.user.id)})
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def fan_out(self, request):
+        """
+        Send a notification to every student in an audience.
+        POST /api/notifications/fan_out/
+        Body: {
+            "audience": "all" | "block" | "floor" | "rooms" | "pending_payments",
+            "block": "a-block", "floor": "first", "rooms": ["A101", "A102"] (as the audience needs),
+            "title": "...", "message": "...", "notificationType": "general" (optional),
+            "relatedId": 12 (optional), "dedupKey": "water-shutdown-2024-06-01" (optional, makes retries safe)
+        }
+        """
+        data = request.data
+        title = data.get('title')
+        message = data.get('message')
+        if not title or not message:
+            return Response({'error': 'title and message are required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        notification_type = data.get('notificationType', 'general')
+        if notification_type not in dict(Notification.NOTIFICATION_TYPE_CHOICES):
+            return Response({'error': f'Invalid notificationType: {notification_type}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        rooms = data.get('rooms')
+        if rooms is not None and not isinstance(rooms, list):
+            return Response({'error': 'rooms must be a list of room numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        related_id = data.get('relatedId')
+        if related_id in (None, ''):
+            related_id = None
+        else:
+            try:
+                if isinstance(related_id, bool) or not isinstance(related_id, (int, str)):
+                    raise ValueError(related_id)
+                related_id = int(related_id)
+                # The column's range on this database
+                Notification._meta.get_field('related_id').run_validators(related_id)
+            except (ValueError, ValidationError):
+                return Response({'error': 'relatedId must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            summary = fanout.fan_out(
+                data.get('audience', 'all'),
+                title,
+                message,
+                notification_type=notification_type,
+                related_id=related_id,
+                dedup_key=data.get('dedupKey'),
+                block=data.get('block'),
+                floor=data.get('floor'),
+                rooms=rooms,
+            )
+        except fanout.FanOutError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED)
@@ -0,0 +1,157 @@
+"""
+Overlap detection for outpasses.
+
+Two outpasses of the same hosteler conflict when both are active (pending or
+approved, and not yet returned from) and their date ranges share a day.
+Lookups are range queries on the (hosteler, out_date, return_date) index; the
+batch check loads only the active outpasses that intersect the batch's date
+window, once, and compares intervals in memory.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from core.cache import bump_data_version
+from hostel.models import Hosteler
+from .models import Outpass
+from .serializers import OutpassSerializer
+
+ACTIVE_STATUSES = ('pending', 'approved')
+
+BATCH_LIMIT = 5000
+
+CHUNK_SIZE = 1000
+
+
+def active_outpasses():
+    return Outpass.objects.filter(status__in=ACTIVE_STATUSES, returned_on__isnull=True)
+
+
+def overlapping(hosteler, out_date, return_date, exclude=None):
+    """Active outpasses of ``hosteler`` sharing at least one day with [out_date, return_date]."""
+    queryset = active_outpasses().filter(hosteler=hosteler, out_date__lte=return_date, return_date__gte=out_date)
+    if exclude is not None:
+        queryset = queryset.exclude(pk=exclude.pk)
+    return queryset
+
+
+def lock_hostelers(pks):
+    """Serialize outpass changes per hosteler (hostelers first, as in rooms.allocation)."""
+    list(Hosteler.objects.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk', flat=True))
+
+
+def parse_item(item):
+    """Validate one proposed outpass; returns (fields, errors)."""
+    errors = []
+    if not isinstance(item, dict):
+        return None, ['Each outpass must be an object']
+
+    dates = {}
+    for key in ('outDate', 'returnDate'):
+        try:
+            dates[key] = parse_date(str(item.get(key) or ''))
+        except ValueError:
+            dates[key] = None
+        if dates[key] is None:
+            errors.append(f'{key} must be YYYY-MM-DD')
+    if not errors and dates['returnDate'] < dates['outDate']:
+        errors.append('returnDate cannot be before outDate')
+    code = item.get('hostelerId')
+    if isinstance(code, int) and not isinstance(code, bool):
+        code = str(code)
+    # Lists, objects and booleans can't be looked up (or put in a set of codes)
+    if code is not None and not isinstance(code, str):
+        errors.append('hostelerId must be a string')
+        code = None
+    elif not (code or '').strip():
+        errors.append('hostelerId is required')
+    else:
+        code = code.strip()
+    if not item.get('reason'):
+        errors.append('reason is required')
+
+    fields = {
+        'hosteler_id': code,
+        'out_date': dates.get('outDate'),
+        'return_date': dates.get('returnDate'),
+        'reason': str(item.get('reason') or '')[:100],
+        'details': item.get('details') or '',
+    }
+    return fields, errors
+
+
+def existing_by_hosteler(hosteler_pks, start, end):
+    """Active outpasses intersecting [start, end], grouped by hosteler pk."""
+    existing = defaultdict(list)
+    pks = sorted(hosteler_pks)
+    for offset in range(0, len(pks), CHUNK_SIZE):
+        rows = active_outpasses().filter(
+            hosteler_id__in=pks[offset:offset + CHUNK_SIZE], out_date__lte=end, return_date__gte=start,
+        ).values_list('hosteler_id', 'pk', 'out_date', 'return_date')
+        for hosteler_pk, pk, out_date, return_date in rows:
+            existing[hosteler_pk].append((out_date, return_date, {'id': OutpassSerializer.format_id(pk)}))
+    return existing
+
+
+def check_batch(items, commit=False):
+    """
+    Check proposed outpasses against stored ones and against each other.
+    With ``commit``, valid outpasses are created (as pending) in one bulk insert.
+    Returns {'valid': n, 'invalid': n, 'created': n, 'results': [...]} in input order.
+    """
+    parsed = [parse_item(item) for item in items]
+    codes = sorted({fields['hosteler_id'] for fields, errors in parsed if not errors})
+
+    with transaction.atomic():
+        hostelers = {}
+        for offset in range(0, len(codes), CHUNK_SIZE):
+            batch = codes[offset:offset + CHUNK_SIZE]
+            hostelers.update(Hosteler.objects.filter(hosteler_id__in=batch).values_list('hosteler_id', 'pk'))
+        if commit:
+            lock_hostelers(hostelers.values())
+
+        dated = [fields for fields, errors in parsed if not errors]
+        existing = defaultdict(list)
+        if dated:
+            existing = existing_by_hosteler(
+                set(hostelers.values()),
+                min(fields['out_date'] for fields in dated),
+                max(fields['return_date'] for fields in dated),
+            )
+
+        results = []
+        accepted = []
+        for index, (fields, errors) in enumerate(parsed):
+            conflicts = []
+            if not errors:
+                hosteler_pk = hostelers.get(fields['hosteler_id'])
+                if hosteler_pk is None:
+                    errors.append(f"Hosteler {fields['hosteler_id']} not found")
+                else:
+                    conflicts = [
+                        conflict for out_date, return_date, conflict in existing[hosteler_pk]
+                        if out_date <= fields['return_date'] and return_date >= fields['out_date']
+                    ]
+                    if conflicts:
+                        errors.append('Overlaps an active outpass')
+                    else:
+                        # Later rows in the batch must not overlap this one either
+                        existing[hosteler_pk].append((fields['out_date'], fields['return_date'], {'index': index}))
+                        accepted.append(Outpass(
+                            hosteler_id=hosteler_pk,
+                            out_date=fields['out_date'],
+                            return_date=fields['return_date'],
+                            reason=fields['reason'],
+                            details=fields['details'],
+                        ))
+            results.append({'index': index, 'valid': not errors, 'errors': errors, 'conflicts': conflicts})
+
+        created = 0
+        if commit and accepted:
+            created = len(Outpass.objects.bulk_create(accepted, batch_size=CHUNK_SIZE))
+            # bulk_create skips the save signals that normally invalidate caches
+            bump_data_version('outpasses')
+
+    valid = sum(1 for result in results if result['valid'])
+    return {'valid': valid, 'invalid': len(results) - valid, 'created': created, 'results': results}
@@ -0,0 +1,32 @@
+"""
+Management command to store the nightly presence snapshot.
+Usage: python manage.py snapshot_presence [--date 2024-12-24]
+
+Schedule it shortly before roll call (e.g. from cron) so later reports for
+that night are served from the snapshot.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from outpass.presence import take_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Records who is away on an outpass, with per-block and per-room headcounts'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to snapshot (default today), YYYY-MM-DD')
+    
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError('--date must be YYYY-MM-DD')
+        
+        snapshot = take_snapshot(day)
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot for {snapshot.date}: {snapshot.away} away, {snapshot.overdue} overdue'
+        ))
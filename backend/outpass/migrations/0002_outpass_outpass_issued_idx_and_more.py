@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0001_initial'),
+        ('outpass', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outpass',
+            index=models.Index(fields=['-issued_on', '-id'], name='outpass_issued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outpass',
+            index=models.Index(fields=['hosteler', '-issued_on', '-id'], name='outpass_hosteler_issued_idx'),
+        ),
+    ]
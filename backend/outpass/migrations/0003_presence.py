@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:51
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_past_outpasses_returned(apps, schema_editor):
+    """Returns weren't tracked before; assume hostelers came back on their return date."""
+    Outpass = apps.get_model('outpass', 'Outpass')
+    today = timezone.localdate()
+    past = Outpass.objects.filter(status='approved', return_date__lt=today, returned_on__isnull=True)
+    batch = []
+    for outpass in past.only('id', 'return_date').iterator(chunk_size=1000):
+        outpass.returned_on = timezone.make_aware(datetime.combine(outpass.return_date + timedelta(days=1), time.min))
+        batch.append(outpass)
+        if len(batch) == 1000:
+            Outpass.objects.bulk_update(batch, ['returned_on'])
+            batch = []
+    Outpass.objects.bulk_update(batch, ['returned_on'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0001_initial'),
+        ('outpass', '0002_outpass_outpass_issued_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresenceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('away', models.IntegerField()),
+                ('overdue', models.IntegerField()),
+                ('data', models.JSONField()),
+                ('taken_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Presence Snapshot',
+                'verbose_name_plural': 'Presence Snapshots',
+                'db_table': 'presence_snapshots',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='outpass',
+            name='returned_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='outpass',
+            index=models.Index(fields=['status', 'out_date', 'return_date'], name='outpass_status_dates_idx'),
+        ),
+        migrations.RunPython(mark_past_outpasses_returned, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0001_initial'),
+        ('outpass', '0003_presence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outpass',
+            index=models.Index(fields=['hosteler', 'out_date', 'return_date'], name='outpass_hosteler_dates_idx'),
+        ),
+    ]
@@ -30,6 +30,7 @@ class Outpass(models.Model):
     approved_on = models.DateTimeField(null=True, blank=True)
     approved_by = models.CharField(max_length=200, blank=True)
     warden_reply = models.TextField(blank=True)
+    returned_on = models.DateTimeField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -40,6 +41,15 @@ class Outpass(models.Model):
         verbose_name = 'Outpass'
         verbose_name_plural = 'Outpasses'
         ordering = ['-issued_on']
+        indexes = [
+            # Keyset pagination: (issued_on, id) overall and per hosteler
+            models.Index(fields=['-issued_on', '-id'], name='outpass_issued_idx'),
+            models.Index(fields=['hosteler', '-issued_on', '-id'], name='outpass_hosteler_issued_idx'),
+            # Presence: approved outpasses whose interval covers a given day
+            models.Index(fields=['status', 'out_date', 'return_date'], name='outpass_status_dates_idx'),
+            # Overlap checks: a hosteler's outpasses intersecting a date range
+            models.Index(fields=['hosteler', 'out_date', 'return_date'], name='outpass_hosteler_dates_idx'),
+        ]
     
     def __str__(self):
         return f"OP{str(self.id).zfill(4)} - {self.hosteler.name}"
@@ -53,3 +63,43 @@ class Outpass(models.Model):
     def student_name(self):
         """Get student name for serializer."""
         return self.hosteler.name
+    
+    def publish_status_changed(self):
+        """Announce an approval/rejection; the student is notified once the transaction commits."""
+        self.announce_status(self.pk, self.hosteler.hosteler_id, self.status, self.out_date, self.warden_reply)
+    
+    @staticmethod
+    def announce_status(outpass_id, hosteler_id, status, out_date, warden_reply=''):
+        """Publish a status change for an outpass that may not be loaded (bulk updates)."""
+        from core import events
+        events.publish(
+            events.OUTPASS_STATUS_CHANGED,
+            outpass_id=outpass_id,
+            hosteler_id=hosteler_id,
+            status=status,
+            out_date=out_date.isoformat(),
+            warden_reply=warden_reply,
+        )
+
+
+class PresenceSnapshot(models.Model):
+    """
+    Who was away on an outpass on a given day, with per-block and per-room
+    headcounts, as computed by outpass.presence. Taken nightly by the
+    snapshot_presence command so roll-call reports for past days are a
+    single-row read.
+    """
+    date = models.DateField(unique=True)
+    away = models.IntegerField()
+    overdue = models.IntegerField()
+    data = models.JSONField()
+    taken_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'presence_snapshots'
+        verbose_name = 'Presence Snapshot'
+        verbose_name_plural = 'Presence Snapshots'
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"Presence {self.date}: {self.away} away, {self.overdue} overdue"
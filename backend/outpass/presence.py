@@ -0,0 +1,109 @@
+"""
+"Who is out right now": hostelers away on an approved outpass.
+
+A hosteler is *away* on ``day`` when an approved outpass has
+out_date <= day <= return_date and they have not been marked returned, and
+*overdue* when return_date has passed without a return. The lookup is an
+index range scan over ``(status, out_date, return_date)`` limited to
+outpasses that started within PRESENCE_LOOKBACK_DAYS, so its cost doesn't
+grow with years of history; outpasses longer than the window are not seen.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from hostel.models import Hosteler
+from .models import Outpass, PresenceSnapshot
+from .serializers import OutpassSerializer
+
+
+def away_outpasses(day):
+    """Approved outpasses of hostelers not back by ``day``, one row per outpass."""
+    earliest = day - timedelta(days=settings.PRESENCE_LOOKBACK_DAYS)
+    next_midnight = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return (
+        Outpass.objects
+        .filter(status='approved', out_date__gte=earliest, out_date__lte=day)
+        .filter(Q(returned_on__isnull=True) | Q(returned_on__gte=next_midnight))
+        .order_by('out_date', 'pk')
+        .values(
+            'pk', 'out_date', 'return_date',
+            'hosteler__hosteler_id', 'hosteler__name',
+            'hosteler__room__room_number', 'hosteler__room__block',
+        )
+    )
+
+
+def residents():
+    """Hostelers per room: {room_number: (block, count)}."""
+    rows = (
+        Hosteler.objects.filter(room__isnull=False)
+        .values('room__room_number', 'room__block')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    return {row['room__room_number']: (row['room__block'], row['count']) for row in rows}
+
+
+def compute(day=None):
+    """Presence report for ``day`` (default today) with per-block and per-room headcounts."""
+    day = day or timezone.localdate()
+
+    # A hosteler with several open outpasses counts once, under the latest return date
+    away = {}
+    for row in away_outpasses(day):
+        current = away.get(row['hosteler__hosteler_id'])
+        if current is None or row['return_date'] >= current['return_date']:
+            away[row['hosteler__hosteler_id']] = row
+
+    counts = residents()
+    rooms = {
+        room_number: {'block': block, 'residents': count, 'away': 0, 'overdue': 0}
+        for room_number, (block, count) in counts.items()
+    }
+    blocks = defaultdict(lambda: {'residents': 0, 'away': 0, 'overdue': 0})
+    for room in rooms.values():
+        blocks[room['block']]['residents'] += room['residents']
+
+    hostelers = []
+    for row in away.values():
+        state = 'overdue' if row['return_date'] < day else 'away'
+        room_number = row['hosteler__room__room_number']
+        if room_number in rooms:
+            rooms[room_number][state] += 1
+            blocks[rooms[room_number]['block']][state] += 1
+        hostelers.append({
+            'hostelerId': row['hosteler__hosteler_id'],
+            'name': row['hosteler__name'],
+            'roomNumber': room_number,
+            'block': row['hosteler__room__block'],
+            'outpassId': OutpassSerializer.format_id(row['pk']),
+            'outDate': row['out_date'].isoformat(),
+            'returnDate': row['return_date'].isoformat(),
+            'overdue': state == 'overdue',
+        })
+
+    for headcount in list(rooms.values()) + list(blocks.values()):
+        headcount['present'] = headcount['residents'] - headcount['away'] - headcount['overdue']
+
+    return {
+        'date': day.isoformat(),
+        'away': sum(1 for hosteler in hostelers if not hosteler['overdue']),
+        'overdue': sum(1 for hosteler in hostelers if hosteler['overdue']),
+        'blocks': dict(blocks),
+        'rooms': rooms,
+        'hostelers': hostelers,
+    }
+
+
+def take_snapshot(day=None):
+    """Compute and store the report for ``day``, replacing any earlier snapshot of that day."""
+    report = compute(day)
+    snapshot, _ = PresenceSnapshot.objects.update_or_create(
+        date=report['date'],
+        defaults={'away': report['away'], 'overdue': report['overdue'], 'data': report},
+    )
+    return snapshot
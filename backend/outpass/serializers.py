@@ -1,6 +1,7 @@
 """
 Serializers for Outpass model with camelCase transformation.
 """
+from django.db import transaction
 from rest_framework import serializers
 from core.serializers import CamelCaseModelSerializer
 from .models import Outpass
@@ -14,27 +15,41 @@ class OutpassSerializer(CamelCaseModelSerializer):
     # Computed fields for frontend compatibility
     id = serializers.SerializerMethodField()
     backend_id = serializers.IntegerField(source='pk', read_only=True)
-    student_id = serializers.CharField(source='student_id', read_only=True)
-    student_name = serializers.CharField(source='student_name', read_only=True)
+    student_id = serializers.CharField(read_only=True)
+    student_name = serializers.CharField(read_only=True)
     submitted_date = serializers.DateTimeField(source='issued_on', read_only=True)
     approved_date = serializers.DateTimeField(source='approved_on', read_only=True, allow_null=True)
     
     # Write field for hosteler (accepts hosteler_id string)
     hosteler_id = serializers.CharField(write_only=True, required=False)
     
+    fast_sources = {
+        'id': ('pk', lambda pk: OutpassSerializer.format_id(pk)),
+        'student_id': 'hosteler__hosteler_id',
+        'student_name': 'hosteler__name',
+    }
+    
     class Meta:
         model = Outpass
         fields = [
             'id', 'backend_id', 'student_id', 'student_name', 'hosteler', 'hosteler_id',
             'out_date', 'return_date', 'reason', 'details', 'status',
-            'submitted_date', 'approved_date', 'approved_by', 'warden_reply', 'issued_on', 'approved_on'
+            'submitted_date', 'approved_date', 'approved_by', 'warden_reply', 'issued_on', 'approved_on',
+            'returned_on'
         ]
         read_only_fields = ['id', 'backend_id', 'student_id', 'student_name', 
-                           'submitted_date', 'approved_date', 'issued_on', 'approved_on']
+                           'submitted_date', 'approved_date', 'issued_on', 'approved_on', 'returned_on']
+        # Either hosteler (pk) or hosteler_id (H2024001) identifies the student
+        extra_kwargs = {'hosteler': {'required': False}}
     
     def get_id(self, obj):
         """Return formatted ID (OP0001)."""
-        return f"OP{str(obj.id).zfill(4)}"
+        return self.format_id(obj.id)
+    
+    @staticmethod
+    def format_id(pk):
+        """Format a primary key as a display ID (OP0001)."""
+        return f"OP{str(pk).zfill(4)}"
     
     def create(self, validated_data):
         """Create outpass from hosteler_id if provided."""
@@ -47,5 +62,48 @@ class OutpassSerializer(CamelCaseModelSerializer):
                 validated_data['hosteler'] = hosteler
             except Hosteler.DoesNotExist:
                 raise serializers.ValidationError({'hosteler_id': f'Hosteler {hosteler_id} not found'})
+        if 'hosteler' not in validated_data:
+            raise serializers.ValidationError({'hosteler_id': 'This field is required.'})
+        
+        with transaction.atomic():
+            self.check_overlap(validated_data)
+            return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        """Re-check for overlaps when the dates or hosteler change."""
+        validated_data.pop('hosteler_id', None)
+        with transaction.atomic():
+            if {'hosteler', 'out_date', 'return_date', 'status'} & set(validated_data):
+                self.check_overlap(validated_data, instance)
+            return super().update(instance, validated_data)
+    
+    def validate(self, attrs):
+        """Return date must not be before the out date."""
+        out_date = attrs.get('out_date', getattr(self.instance, 'out_date', None))
+        return_date = attrs.get('return_date', getattr(self.instance, 'return_date', None))
+        if out_date and return_date and return_date < out_date:
+            raise serializers.ValidationError({'return_date': 'Return date cannot be before the out date.'})
+        return attrs
+    
+    def check_overlap(self, validated_data, instance=None):
+        """Reject an active outpass that overlaps another active outpass of the same hosteler."""
+        from . import conflicts
+        
+        def current(field):
+            if field in validated_data:
+                return validated_data[field]
+            if instance is not None:
+                return getattr(instance, field)
+            return Outpass._meta.get_field(field).get_default()
         
-        return super().create(validated_data)
+        hosteler = current('hosteler')
+        if hosteler is None or current('status') not in conflicts.ACTIVE_STATUSES:
+            return
+        # Lock the hosteler so two concurrent requests can't both pass the check
+        conflicts.lock_hostelers([hosteler.pk])
+        overlapping = conflicts.overlapping(hosteler, current('out_date'), current('return_date'), exclude=instance)
+        ids = [self.format_id(pk) for pk in overlapping.values_list('pk', flat=True)[:5]]
+        if ids:
+            raise serializers.ValidationError({
+                'out_date': f"Overlaps active outpass {', '.join(ids)} for {hosteler.hosteler_id}"
+            })
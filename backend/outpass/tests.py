@@ -0,0 +1,156 @@
+"""
+Tests for the outpass batch check, bulk status changes and presence headcounts.
+"""
+from datetime import date, datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from hostel.models import Hosteler
+from outpass import presence
+from outpass.models import Outpass
+from outpass.views import OutpassViewSet
+from rooms.models import Room
+
+URL = '/api/outpasses/validate_batch/'
+
+
+def item(hosteler_id):
+    return {'hostelerId': hosteler_id, 'outDate': '2024-12-20', 'returnDate': '2024-12-27', 'reason': 'Holiday'}
+
+
+class ValidateBatchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    def test_unhashable_hosteler_id_is_a_row_error(self):
+        response = self.client.post(URL, {'outpasses': [item(['H2024001']), item({'id': 1})]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['invalid'], 2)
+        for result in response.json()['results']:
+            self.assertEqual(result['errors'], ['hostelerId must be a string'])
+
+    def test_numeric_hosteler_id_is_looked_up_as_a_string(self):
+        response = self.client.post(URL, {'outpasses': [item(2024001), item(' ')]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        first, second = response.json()['results']
+        self.assertEqual(first['errors'], ['Hosteler 2024001 not found'])
+        self.assertEqual(second['errors'], ['hostelerId is required'])
+
+
+class BulkSetStatusTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        hosteler = Hosteler.objects.create(
+            hosteler_id='H2024001', name='Student', gender='male', age=20,
+            mobile='9876500001', email='student@example.com',
+        )
+        Outpass.objects.bulk_create([
+            Outpass(hosteler=hosteler, out_date=date(2024, 12, day), return_date=date(2024, 12, day), reason='Home')
+            for day in (1, 2, 3)
+        ])
+
+    @mock.patch.object(OutpassViewSet, 'bulk_limit', 2)
+    def test_filter_mode_is_capped_and_reports_truncation(self):
+        body = {'status': 'approved', 'reason': 'home'}
+
+        first = self.client.post('/api/outpasses/bulk_set_status/', body, format='json').json()
+        second = self.client.post('/api/outpasses/bulk_set_status/', body, format='json').json()
+
+        self.assertEqual((first['updated'], first['truncated']), (2, True))
+        self.assertEqual((second['updated'], second['truncated']), (1, False))
+        self.assertFalse(Outpass.objects.filter(status='pending').exists())
+
+    def test_id_mode_is_not_truncated(self):
+        ids = list(Outpass.objects.values_list('pk', flat=True))
+
+        response = self.client.post(
+            '/api/outpasses/bulk_set_status/', {'status': 'rejected', 'ids': ids}, format='json',
+        ).json()
+
+        self.assertEqual((response['updated'], response['truncated']), (3, False))
+
+
+class PresenceTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        rooms = [
+            Room.objects.create(
+                room_number=number, block=block, floor='ground', room_type='non-ac', bed_type='double',
+                total_beds=2, available_beds=0, room_rate=4500, is_available=False,
+            )
+            for number, block in (('A101', 'a-block'), ('B101', 'b-block'))
+        ]
+        self.away, self.present, self.overdue, self.returned = [
+            Hosteler.objects.create(
+                hosteler_id=f'H202400{number}', name=f'Student {number}', gender='male', age=20,
+                mobile=f'987650000{number}', email=f'student{number}@example.com',
+                room=rooms[number // 2], bed=f'B{number % 2 + 1}',
+            )
+            for number in range(4)
+        ]
+
+        def outpass(hosteler, out_day, return_day, status='approved', returned_on=None):
+            Outpass.objects.create(
+                hosteler=hosteler, out_date=date(2024, 12, out_day), return_date=date(2024, 12, return_day),
+                reason='Home', status=status, returned_on=returned_on,
+            )
+
+        # Two open outpasses for the same hosteler still count them once
+        outpass(self.away, 20, 25)
+        outpass(self.away, 22, 27)
+        outpass(self.present, 20, 27, status='pending')
+        outpass(self.present, 1, 5, returned_on=timezone.make_aware(datetime(2024, 12, 5, 18)))
+        outpass(self.overdue, 10, 20)
+        outpass(self.returned, 20, 27, returned_on=timezone.make_aware(datetime(2024, 12, 22, 18)))
+
+    def report(self, day='2024-12-24'):
+        response = self.client.get(f'/api/outpasses/presence/?date={day}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_headcounts(self):
+        report = self.report()
+
+        self.assertEqual(report['source'], 'live')
+        self.assertEqual((report['away'], report['overdue']), (1, 1))
+        self.assertEqual(report['blocks'], {
+            'a-block': {'residents': 2, 'away': 1, 'overdue': 0, 'present': 1},
+            'b-block': {'residents': 2, 'away': 0, 'overdue': 1, 'present': 1},
+        })
+        self.assertEqual(report['rooms']['A101'], {
+            'block': 'a-block', 'residents': 2, 'away': 1, 'overdue': 0, 'present': 1,
+        })
+        by_id = {hosteler['hostelerId']: hosteler for hosteler in report['hostelers']}
+        self.assertEqual(sorted(by_id), ['H2024000', 'H2024002'])
+        self.assertEqual(by_id['H2024000']['returnDate'], '2024-12-27')
+        self.assertTrue(by_id['H2024002']['overdue'])
+
+    def test_hosteler_is_present_on_the_day_they_return(self):
+        self.assertEqual(self.report('2024-12-21')['blocks']['b-block']['away'], 1)
+        self.assertEqual(self.report('2024-12-22')['blocks']['b-block']['away'], 0)
+
+    def test_snapshot_is_served_for_past_days(self):
+        presence.take_snapshot(date(2024, 12, 24))
+        Outpass.objects.filter(hosteler=self.overdue).update(returned_on=timezone.now())
+
+        report = self.report()
+
+        self.assertEqual(report['source'], 'snapshot')
+        self.assertEqual(report['overdue'], 1)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get('/api/outpasses/presence/?date=24-12-2024')
+
+        self.assertEqual(response.status_code, 400)
@@ -1,17 +1,24 @@
 """
 Views for Outpass management.
 """
+from django.db import transaction
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from core.permissions import IsWarden
 from django.utils import timezone
-from .models import Outpass
+from core.cache import bump_data_version
+from core.mixins import ExportModelMixin, FastListModelMixin
+from core.pagination import KeysetPagination
+from notifications import push
+from . import conflicts, presence
+from .models import Outpass, PresenceSnapshot
 from .serializers import OutpassSerializer
 
 
-class OutpassViewSet(viewsets.ModelViewSet):
+class OutpassViewSet(FastListModelMixin, ExportModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Outpass CRUD operations.
     
@@ -22,10 +29,17 @@ class OutpassViewSet(viewsets.ModelViewSet):
     - PATCH /api/outpasses/{id}/ - Partial update
     - DELETE /api/outpasses/{id}/ - Delete outpass
     - POST /api/outpasses/{id}/set_status/ - Approve/Reject outpass (Warden only)
+    - POST /api/outpasses/bulk_set_status/ - Approve/Reject many pending outpasses (Warden only)
+    - POST /api/outpasses/{id}/mark_returned/ - Record that the hosteler is back (Warden only)
+    - GET /api/outpasses/presence/ - Who is away or overdue, with headcounts (Warden only)
+    - POST /api/outpasses/validate_batch/ - Check (and optionally create) many proposed outpasses (Warden only)
+    - GET /api/outpasses/export/?fileType=csv|xlsx - Stream the list as a file
     """
     queryset = Outpass.objects.all().select_related('hosteler')
     serializer_class = OutpassSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
+    bulk_limit = 1000
     
     def get_queryset(self):
         """Filter outpasses based on user role."""
@@ -65,6 +79,185 @@ class OutpassViewSet(viewsets.ModelViewSet):
         outpass.approved_on = timezone.now()
         outpass.warden_reply = warden_reply
         outpass.save()
+        outpass.publish_status_changed()
         
         serializer = self.get_serializer(outpass)
+        push.publish_outpasses([serializer.data])
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def mark_returned(self, request, pk=None):
+        """
+        Record the hosteler's return from an approved outpass.
+        POST /api/outpasses/{id}/mark_returned/
+        """
+        outpass = self.get_object()
+        if outpass.status != 'approved':
+            return Response({'error': 'Only approved outpasses can be marked returned'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if outpass.returned_on:
+            return Response({'error': 'Outpass is already marked returned'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        outpass.returned_on = timezone.now()
+        outpass.save(update_fields=['returned_on', 'updated_at'])
+        
+        serializer = self.get_serializer(outpass)
+        push.publish_outpasses([serializer.data])
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsWarden])
+    def presence(self, request):
+        """
+        Hostelers away on an approved outpass, and overdue ones, with per-block and per-room headcounts.
+        GET /api/outpasses/presence/ (live, for today)
+        GET /api/outpasses/presence/?date=2024-12-24 (from that night's snapshot when one exists)
+        """
+        today = timezone.localdate()
+        day = today
+        if request.query_params.get('date'):
+            try:
+                day = parse_date(request.query_params['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if day != today:
+            snapshot = PresenceSnapshot.objects.filter(date=day).first()
+            if snapshot is not None:
+                return Response({**snapshot.data, 'source': 'snapshot', 'takenAt': snapshot.taken_at})
+        return Response({**presence.compute(day), 'source': 'live', 'takenAt': timezone.now()})
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def validate_batch(self, request):
+        """
+        Check proposed outpasses for bad dates, unknown hostelers and overlaps
+        with active outpasses or with each other.
+        POST /api/outpasses/validate_batch/
+        Body: {
+            "outpasses": [{"hostelerId": "H2024001", "outDate": "2024-12-20",
+                           "returnDate": "2024-12-27", "reason": "Holiday", "details": ""}, ...],
+            "commit": false (true creates the valid ones as pending)
+        }
+        """
+        items = request.data.get('outpasses')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'outpasses must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > conflicts.BATCH_LIMIT:
+            return Response({'error': f'At most {conflicts.BATCH_LIMIT} outpasses per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        commit = request.data.get('commit', False) in (True, 'true', '1')
+        return Response(conflicts.check_batch(items, commit=commit))
+    
+    def get_bulk_targets(self, data):
+        """
+        Resolve the outpasses a bulk request names, as (queryset, requested ids).
+        Requested ids is None in filter mode, where only pending outpasses are selected.
+        """
+        ids = data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list) or not ids:
+                raise ValueError('ids must be a non-empty list')
+            if len(ids) > self.bulk_limit:
+                raise ValueError(f'At most {self.bulk_limit} ids per request')
+            requested = {}
+            for value in ids:
+                try:
+                    # Accept display ids (OP0001) as well as backend ids
+                    requested[int(str(value).upper().removeprefix('OP'))] = value
+                except ValueError:
+                    raise ValueError(f'Invalid outpass id: {value}')
+            return Outpass.objects.filter(pk__in=requested), requested
+        
+        filters = {}
+        if data.get('reason'):
+            filters['reason__iexact'] = data['reason']
+        if data.get('block'):
+            filters['hosteler__room__block'] = data['block']
+        for param, lookup in (('outDateFrom', 'out_date__gte'), ('outDateTo', 'out_date__lte')):
+            if data.get(param):
+                try:
+                    value = parse_date(str(data[param]))
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise ValueError(f'{param} must be YYYY-MM-DD')
+                filters[lookup] = value
+        if not filters:
+            raise ValueError('Pass ids or at least one filter (reason, block, outDateFrom, outDateTo)')
+        return Outpass.objects.filter(status='pending', **filters), None
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def bulk_set_status(self, request):
+        """
+        Approve or reject many pending outpasses in one UPDATE.
+        POST /api/outpasses/bulk_set_status/
+        Body: {
+            "status": "approved"/"rejected", "wardenReply": "optional message",
+            "ids": ["OP0001", 2, ...]
+            or filters: "reason": "Home visit", "block": "a-block",
+                        "outDateFrom": "2024-12-20", "outDateTo": "2024-12-24"
+        }
+        Only pending outpasses change; every requested id gets a result.
+        Filters select at most ``bulk_limit`` outpasses (oldest first) and
+        set ``truncated`` when more matched; repeat the request for the rest.
+        """
+        new_status = request.data.get('status')
+        if new_status not in ['approved', 'rejected']:
+            return Response(
+                {'error': 'Invalid status. Must be "approved" or "rejected"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        warden_reply = request.data.get('wardenReply', request.data.get('warden_reply', ''))
+        try:
+            targets, requested = self.get_bulk_targets(request.data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        now = timezone.now()
+        approved_by = request.user.get_full_name() or request.user.username
+        with transaction.atomic():
+            # One past the limit, to tell whether filter mode left matches behind
+            rows = list(
+                targets.select_for_update()
+                .order_by('pk')
+                .values('pk', 'status', 'out_date', 'hosteler__hosteler_id')[:self.bulk_limit + 1]
+            )
+            truncated = len(rows) > self.bulk_limit
+            rows = rows[:self.bulk_limit]
+            pending = [row['pk'] for row in rows if row['status'] == 'pending']
+            updated = Outpass.objects.filter(pk__in=pending, status='pending').update(
+                status=new_status,
+                approved_by=approved_by,
+                approved_on=now,
+                warden_reply=warden_reply,
+                updated_at=now,
+            )
+            
+            for row in rows:
+                if row['status'] == 'pending':
+                    Outpass.announce_status(
+                        row['pk'], row['hosteler__hosteler_id'], new_status, row['out_date'], warden_reply
+                    )
+            if updated:
+                # QuerySet.update() skips the save signals that normally invalidate caches
+                bump_data_version('outpasses')
+                push.publish_outpasses(OutpassSerializer.fast_list(
+                    Outpass.objects.filter(pk__in=pending).select_related('hosteler')
+                ))
+        
+        found = {row['pk']: row['status'] for row in rows}
+        if requested is None:
+            requested = {pk: OutpassSerializer.format_id(pk) for pk in found}
+        results = []
+        for pk, given in requested.items():
+            if pk not in found:
+                result, current = 'not_found', None
+            elif found[pk] == 'pending':
+                result, current = 'updated', new_status
+            else:
+                result, current = 'skipped', found[pk]
+            results.append({'id': given, 'backendId': pk, 'result': result, 'status': current})
+        
+        return Response({'status': new_status, 'updated': updated, 'truncated': truncated, 'results': results})
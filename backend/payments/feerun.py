@@ -0,0 +1,117 @@
+"""
+Monthly fee run: one pending invoice per allocated hosteler.
+
+The charge is the room's ``room_rate``, pro-rated by day for hostelers who
+check in after the first of the month. Hostelers already billed for the
+month are skipped (and the (hosteler, billing_month) constraint backs that
+up), so running it again for the same month only bills the ones that were
+missed. Invoice numbers are reserved as one contiguous block and the
+invoices go in with a single bulk insert.
+"""
+import calendar
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import bump_data_version
+from hostel.models import Hosteler
+from . import ledger
+from .models import Payment
+
+CHUNK_SIZE = 1000
+
+CENT = Decimal('0.01')
+
+
+def charge(rate, checkin_date, month):
+    """
+    What a hosteler owes for ``month`` (its first day): the full rate, the
+    share of days from a mid-month check-in, or None if not yet checked in.
+    """
+    days = calendar.monthrange(month.year, month.month)[1]
+    if checkin_date is None or checkin_date <= month:
+        return Decimal(rate).quantize(CENT)
+    if checkin_date > month.replace(day=days):
+        return None
+    stayed = days - checkin_date.day + 1
+    return (Decimal(rate) * stayed / days).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def due_date_for(month):
+    days = calendar.monthrange(month.year, month.month)[1]
+    return month.replace(day=min(max(settings.FEE_DUE_DAY, 1), days))
+
+
+def run(month, payment_type='online', dry_run=False):
+    """
+    Bill every allocated hosteler for ``month`` (any date in it).
+    Returns a summary of what was (or, with ``dry_run``, would be) created.
+    """
+    month = date(month.year, month.month, 1)
+    due_date = due_date_for(month)
+
+    with transaction.atomic():
+        hostelers = (
+            Hosteler.objects.filter(room__isnull=False)
+            .order_by('pk')
+            .values_list('pk', 'checkin_date', 'room__room_rate')
+        )
+        if not dry_run:
+            # Serializes concurrent runs; hostelers first, as elsewhere
+            hostelers = hostelers.select_for_update(of=('self',))
+        hostelers = list(hostelers)
+
+        billed = set()
+        pks = [pk for pk, _, _ in hostelers]
+        for offset in range(0, len(pks), CHUNK_SIZE):
+            billed.update(Payment.objects.filter(
+                billing_month=month, hosteler_id__in=pks[offset:offset + CHUNK_SIZE],
+            ).values_list('hosteler_id', flat=True))
+
+        charges = []
+        not_checked_in = prorated = 0
+        for pk, checkin_date, rate in hostelers:
+            if pk in billed:
+                continue
+            amount = charge(rate, checkin_date, month)
+            if amount is None:
+                not_checked_in += 1
+                continue
+            if amount != Decimal(rate).quantize(CENT):
+                prorated += 1
+            charges.append((pk, amount))
+
+        invoices = []
+        if charges and not dry_run:
+            numbers = Payment.next_invoice_nos(len(charges))
+            invoices = Payment.objects.bulk_create([
+                Payment(
+                    invoice_no=invoice_no,
+                    hosteler_id=pk,
+                    amount=amount,
+                    payment_type=payment_type,
+                    status='pending',
+                    due_date=due_date,
+                    billing_month=month,
+                )
+                for invoice_no, (pk, amount) in zip(numbers, charges)
+            ], batch_size=CHUNK_SIZE)
+            # bulk_create skips the signals that keep balances and caches current
+            ledger.record_many(ledger.entry_of(invoice) for invoice in invoices)
+            bump_data_version('payments')
+
+    return {
+        'month': month.strftime('%Y-%m'),
+        'dueDate': due_date.isoformat(),
+        'dryRun': dry_run,
+        'created': len(invoices),
+        'toCreate': len(charges),
+        'alreadyBilled': len(billed),
+        'notCheckedIn': not_checked_in,
+        'prorated': prorated,
+        'total': str(sum((amount for _, amount in charges), Decimal('0.00'))),
+        'firstInvoice': invoices[0].invoice_no if invoices else None,
+        'lastInvoice': invoices[-1].invoice_no if invoices else None,
+    }
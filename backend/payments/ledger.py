@@ -0,0 +1,317 @@
+"""
+Running payment balances per hosteler and per billing month.
+
+Every invoice counts towards ``billed`` for the month of its due date and
+towards ``paid`` once completed; ``outstanding`` is the difference. Saving
+or deleting a Payment moves its LedgerMonth and HostelerBalance rows by the
+change with F() updates, so totals never need a scan of the payments table.
+Writes that skip model signals must account for themselves: bulk inserts
+pass their invoices' entries to record_many(), which applies them with the
+same F() increments in a few grouped queries, and anything else calls
+rebuild() for the hostelers it touched.
+
+An invoice is overdue once its due date has passed and it isn't completed.
+For months before the current one that is the month's outstanding amount,
+read from the unpaid LedgerMonth rows; only the current month's invoices are
+read individually, so the dues report doesn't grow with invoice history.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.utils import timezone
+
+from hostel.models import Hosteler
+from .models import HostelerBalance, LedgerMonth, Payment
+
+ZERO = Decimal('0.00')
+
+CENT = Decimal('0.01')
+
+CHUNK_SIZE = 1000
+
+UNPAID_STATUSES = [value for value, _ in Payment.STATUS_CHOICES if value != 'completed']
+
+# The fields an invoice's ledger entry depends on (attnames)
+LEDGER_FIELDS = ('hosteler_id', 'due_date', 'amount', 'status')
+
+# Marks an instance whose previous entry couldn't be read at load time
+UNKNOWN = object()
+
+
+def money(value):
+    return str(Decimal(value or 0).quantize(CENT))
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def entry(hosteler_pk, due_date, amount, status):
+    """(hosteler pk, billing month, amount, completed): what one invoice adds to the ledger."""
+    due_date = Payment._meta.get_field('due_date').to_python(due_date)
+    amount = Payment._meta.get_field('amount').to_python(amount)
+    return (hosteler_pk, month_of(due_date), amount, status == 'completed')
+
+
+def entry_of(payment):
+    return entry(*(getattr(payment, field) for field in LEDGER_FIELDS))
+
+
+def _add(model, lookup, billed, paid, create):
+    changes = {
+        'billed': F('billed') + billed,
+        'paid': F('paid') + paid,
+        'outstanding': F('outstanding') + (billed - paid),
+        'updated_at': timezone.now(),
+    }
+    if model.objects.filter(**lookup).update(**changes) or not create:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, billed=billed, paid=paid, outstanding=billed - paid)
+    except IntegrityError:
+        # Another request created the row first; add to it instead
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record(ledger_entry, sign):
+    """Add (sign=1) or take back (sign=-1) one invoice's entry."""
+    hosteler_pk, month, amount, completed = ledger_entry
+    billed = amount * sign
+    paid = billed if completed else ZERO
+    # Taking back never creates rows: they were removed along with the hosteler
+    _add(LedgerMonth, {'hosteler_id': hosteler_pk, 'month': month}, billed, paid, create=sign > 0)
+    _add(HostelerBalance, {'hosteler_id': hosteler_pk}, billed, paid, create=sign > 0)
+    if sign < 0:
+        # Don't leave months with nothing left in them for the dues report to scan
+        LedgerMonth.objects.filter(hosteler_id=hosteler_pk, month=month, billed=0, paid=0).delete()
+
+
+def _add_many(model, totals, **common):
+    """
+    Add ``{hosteler pk: (billed, paid)}`` to the ``model`` rows matching
+    ``common``: one UPDATE per distinct amount, one INSERT for missing rows.
+    """
+    by_amount = defaultdict(list)
+    for hosteler_pk, amounts in totals.items():
+        by_amount[amounts].append(hosteler_pk)
+    missing = []
+    for (billed, paid), pks in by_amount.items():
+        for offset in range(0, len(pks), CHUNK_SIZE):
+            chunk = pks[offset:offset + CHUNK_SIZE]
+            # Locked by pk, so a row created after this read is never updated twice
+            present = dict(
+                model.objects.select_for_update().filter(hosteler_id__in=chunk, **common)
+                .values_list('hosteler_id', 'pk')
+            )
+            model.objects.filter(pk__in=present.values()).update(
+                billed=F('billed') + billed,
+                paid=F('paid') + paid,
+                outstanding=F('outstanding') + (billed - paid),
+                updated_at=timezone.now(),
+            )
+            missing += [(pk, billed, paid) for pk in chunk if pk not in present]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create([
+                model(hosteler_id=pk, **common, billed=billed, paid=paid, outstanding=billed - paid)
+                for pk, billed, paid in missing
+            ], batch_size=CHUNK_SIZE)
+    except IntegrityError:
+        # A concurrent save created some of the rows first; add one at a time
+        for pk, billed, paid in missing:
+            _add(model, {'hosteler_id': pk, **common}, billed, paid, create=True)
+
+
+def record_many(ledger_entries):
+    """Add the entries of many new invoices, e.g. after a bulk_create."""
+    months = defaultdict(lambda: defaultdict(lambda: [ZERO, ZERO]))
+    balances = defaultdict(lambda: [ZERO, ZERO])
+    for hosteler_pk, month, amount, completed in ledger_entries:
+        paid = amount if completed else ZERO
+        for totals in (months[month][hosteler_pk], balances[hosteler_pk]):
+            totals[0] += amount
+            totals[1] += paid
+    for month, totals in months.items():
+        _add_many(LedgerMonth, {pk: tuple(amounts) for pk, amounts in totals.items()}, month=month)
+    _add_many(HostelerBalance, {pk: tuple(amounts) for pk, amounts in balances.items()})
+
+
+def payment_loaded(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._ledger_entry = None
+    elif instance.get_deferred_fields() & set(LEDGER_FIELDS):
+        instance._ledger_entry = UNKNOWN
+    else:
+        instance._ledger_entry = entry_of(instance)
+
+
+def payment_saving(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or getattr(instance, '_ledger_entry', UNKNOWN) is not UNKNOWN:
+        return
+    stored = Payment.objects.filter(pk=instance.pk).values_list(*LEDGER_FIELDS).first()
+    instance._ledger_entry = entry(*stored) if stored else None
+
+
+def payment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_ledger_entry', None)
+    current = entry_of(instance)
+    if previous != current:
+        with transaction.atomic():
+            if previous is not None:
+                record(previous, -1)
+            record(current, 1)
+    instance._ledger_entry = current
+
+
+def payment_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting a hosteler removes their ledger rows along with their payments
+    if isinstance(origin, Hosteler) or getattr(origin, 'model', None) is Hosteler:
+        return
+    previous = getattr(instance, '_ledger_entry', None)
+    if previous is UNKNOWN:
+        previous = entry_of(instance)
+    if previous is not None:
+        with transaction.atomic():
+            record(previous, -1)
+
+
+def connect():
+    post_init.connect(payment_loaded, sender=Payment, dispatch_uid='payment-ledger-init')
+    pre_save.connect(payment_saving, sender=Payment, dispatch_uid='payment-ledger-pre-save')
+    post_save.connect(payment_saved, sender=Payment, dispatch_uid='payment-ledger-save')
+    post_delete.connect(payment_deleted, sender=Payment, dispatch_uid='payment-ledger-delete')
+
+
+def rebuild(hosteler_pks=None):
+    """
+    Recompute ledger rows from the payments table for ``hosteler_pks``
+    (default: every hosteler). Returns the number of hostelers rebuilt.
+    """
+    if hosteler_pks is None:
+        hosteler_pks = Hosteler.objects.values_list('pk', flat=True)
+    pks = sorted(set(hosteler_pks))
+
+    for offset in range(0, len(pks), CHUNK_SIZE):
+        chunk = pks[offset:offset + CHUNK_SIZE]
+        with transaction.atomic():
+            # Lock order as elsewhere: hostelers first
+            list(Hosteler.objects.select_for_update().filter(pk__in=chunk).order_by('pk').values_list('pk', flat=True))
+            rows = (
+                Payment.objects.filter(hosteler_id__in=chunk)
+                .annotate(month=TruncMonth('due_date'))
+                .values('hosteler_id', 'month')
+                .annotate(billed=Sum('amount'), paid=Sum('amount', filter=Q(status='completed')))
+                .order_by()
+            )
+            months = []
+            totals = defaultdict(lambda: [ZERO, ZERO])
+            for row in rows:
+                billed, paid = row['billed'] or ZERO, row['paid'] or ZERO
+                months.append(LedgerMonth(
+                    hosteler_id=row['hosteler_id'], month=row['month'],
+                    billed=billed, paid=paid, outstanding=billed - paid,
+                ))
+                totals[row['hosteler_id']][0] += billed
+                totals[row['hosteler_id']][1] += paid
+
+            LedgerMonth.objects.filter(hosteler_id__in=chunk).delete()
+            HostelerBalance.objects.filter(hosteler_id__in=chunk).delete()
+            LedgerMonth.objects.bulk_create(months, batch_size=CHUNK_SIZE)
+            HostelerBalance.objects.bulk_create([
+                HostelerBalance(hosteler_id=pk, billed=billed, paid=paid, outstanding=billed - paid)
+                for pk, (billed, paid) in totals.items()
+            ], batch_size=CHUNK_SIZE)
+    return len(pks)
+
+
+def overdue_by_hosteler(day, block=None):
+    """{hosteler pk: (overdue amount, oldest unpaid month)} as of ``day``."""
+    month_start = month_of(day)
+    past = LedgerMonth.objects.filter(outstanding__gt=0, month__lt=month_start)
+    current = Payment.objects.filter(due_date__gte=month_start, due_date__lt=day, status__in=UNPAID_STATUSES)
+    if block:
+        past = past.filter(hosteler__room__block=block)
+        current = current.filter(hosteler__room__block=block)
+
+    overdue = {}
+    for pk, amount, month in past.values_list('hosteler_id', 'outstanding', 'month').iterator(chunk_size=CHUNK_SIZE):
+        total, oldest = overdue.get(pk, (ZERO, month))
+        overdue[pk] = (total + amount, min(oldest, month))
+    for pk, amount in current.values('hosteler_id').annotate(amount=Sum('amount')).values_list('hosteler_id', 'amount'):
+        total, oldest = overdue.get(pk, (ZERO, month_start))
+        overdue[pk] = (total + amount, oldest)
+    return overdue
+
+
+def dues(day=None, block=None, min_overdue=None, limit=100):
+    """Hostelers with overdue invoices as of ``day`` (default today), largest amount first."""
+    day = day or timezone.localdate()
+    overdue = overdue_by_hosteler(day, block)
+    ranked = sorted(
+        ((amount, pk) for pk, (amount, _) in overdue.items() if amount > 0 and (min_overdue is None or amount >= min_overdue)),
+        key=lambda item: (-item[0], item[1]),
+    )
+
+    top = [pk for _, pk in ranked[:limit]]
+    details = {
+        row['pk']: row for row in Hosteler.objects.filter(pk__in=top).values(
+            'pk', 'hosteler_id', 'name', 'room__room_number', 'room__block', 'room__room_rate',
+            'balance__billed', 'balance__paid', 'balance__outstanding',
+        )
+    }
+    balances = HostelerBalance.objects.all()
+    if block:
+        balances = balances.filter(hosteler__room__block=block)
+
+    results = []
+    for pk in top:
+        row = details[pk]
+        amount, oldest = overdue[pk]
+        results.append({
+            'hostelerId': row['hosteler_id'],
+            'name': row['name'],
+            'roomNumber': row['room__room_number'],
+            'block': row['room__block'],
+            'roomRate': money(row['room__room_rate']) if row['room__room_rate'] is not None else None,
+            'overdue': money(amount),
+            'outstanding': money(row['balance__outstanding']),
+            'billed': money(row['balance__billed']),
+            'paid': money(row['balance__paid']),
+            'oldestDueMonth': oldest.strftime('%Y-%m'),
+        })
+
+    return {
+        'date': day.isoformat(),
+        'count': len(ranked),
+        'totalOverdue': money(sum((amount for amount, _ in ranked), ZERO)),
+        'totalOutstanding': money(balances.aggregate(total=Sum('outstanding'))['total']),
+        'results': results,
+    }
+
+
+def statement(hosteler):
+    """A hosteler's balance with the per-month breakdown, newest month first."""
+    balance = HostelerBalance.objects.filter(hosteler=hosteler).first()
+    months = LedgerMonth.objects.filter(hosteler=hosteler).order_by('-month')
+    return {
+        'hostelerId': hosteler.hosteler_id,
+        'billed': money(balance.billed if balance else ZERO),
+        'paid': money(balance.paid if balance else ZERO),
+        'outstanding': money(balance.outstanding if balance else ZERO),
+        'months': [
+            {
+                'month': month.month.strftime('%Y-%m'),
+                'billed': money(month.billed),
+                'paid': money(month.paid),
+                'outstanding': money(month.outstanding),
+            }
+            for month in months
+        ],
+    }
@@ -0,0 +1,42 @@
+"""
+Management command for the monthly fee run.
+Usage: python manage.py fee_run [--month 2024-12] [--payment-type online] [--dry-run]
+
+Creates one pending rent invoice per allocated hosteler for the month.
+Hostelers already billed for it are skipped, so it is safe to re-run.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from payments.feerun import run
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Creates monthly rent invoices for every allocated hosteler'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to bill (default this month), YYYY-MM')
+        parser.add_argument('--payment-type', default='online', choices=dict(Payment.PAYMENT_TYPE_CHOICES))
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be billed without creating anything')
+    
+    def handle(self, *args, **options):
+        month = timezone.localdate()
+        if options['month']:
+            try:
+                month = parse_date(f"{options['month']}-01")
+            except ValueError:
+                month = None
+            if month is None:
+                raise CommandError('--month must be YYYY-MM')
+        
+        summary = run(month, options['payment_type'], dry_run=options['dry_run'])
+        verb = 'Would create' if summary['dryRun'] else 'Created'
+        count = summary['toCreate'] if summary['dryRun'] else summary['created']
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} invoice(s) for {summary['month']} totalling ₹{summary['total']} "
+            f"(due {summary['dueDate']}; {summary['prorated']} pro-rated, "
+            f"{summary['alreadyBilled']} already billed, {summary['notCheckedIn']} not yet checked in)"
+        ))
+        if summary['firstInvoice']:
+            self.stdout.write(f"Invoices {summary['firstInvoice']} to {summary['lastInvoice']}")
@@ -0,0 +1,30 @@
+"""
+Management command to recompute payment ledger balances from the payments table.
+Usage: python manage.py rebuild_ledger [--hosteler H2024001 ...]
+
+The ledger is kept up to date as payments are saved; run this after loading
+payments in bulk (fixtures, SQL imports) or to repair drift.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from hostel.models import Hosteler
+from payments.ledger import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recomputes per-hosteler and per-month payment balances'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--hosteler', action='append', dest='hostelers', metavar='HOSTELER_ID',
+                            help='Only rebuild these hostelers (repeatable; default all)')
+    
+    def handle(self, *args, **options):
+        pks = None
+        if options['hostelers']:
+            found = dict(Hosteler.objects.filter(hosteler_id__in=options['hostelers']).values_list('hosteler_id', 'pk'))
+            missing = sorted(set(options['hostelers']) - set(found))
+            if missing:
+                raise CommandError(f"Hostelers not found: {', '.join(missing)}")
+            pks = found.values()
+        
+        count = rebuild(pks)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ledger for {count} hosteler(s)'))
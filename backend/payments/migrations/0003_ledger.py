@@ -0,0 +1,102 @@
+# Generated by Django 5.0.1 on 2026-10-17 20:56
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_ledger(apps, schema_editor):
+    """Fill the ledger from existing payments; from here on it is updated as payments change."""
+    Payment = apps.get_model('payments', 'Payment')
+    LedgerMonth = apps.get_model('payments', 'LedgerMonth')
+    HostelerBalance = apps.get_model('payments', 'HostelerBalance')
+    rows = (
+        Payment.objects.annotate(month=TruncMonth('due_date'))
+        .values('hosteler_id', 'month')
+        .annotate(billed=Sum('amount'), paid=Sum('amount', filter=Q(status='completed')))
+        .order_by()
+    )
+    months = []
+    totals = defaultdict(lambda: [Decimal('0.00'), Decimal('0.00')])
+    for row in rows.iterator(chunk_size=1000):
+        billed, paid = row['billed'] or Decimal('0.00'), row['paid'] or Decimal('0.00')
+        months.append(LedgerMonth(hosteler_id=row['hosteler_id'], month=row['month'],
+                                  billed=billed, paid=paid, outstanding=billed - paid))
+        totals[row['hosteler_id']][0] += billed
+        totals[row['hosteler_id']][1] += paid
+    LedgerMonth.objects.bulk_create(months, batch_size=1000)
+    HostelerBalance.objects.bulk_create([
+        HostelerBalance(hosteler_id=pk, billed=billed, paid=paid, outstanding=billed - paid)
+        for pk, (billed, paid) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0001_initial'),
+        ('payments', '0002_payment_payment_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HostelerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Hosteler Balance',
+                'verbose_name_plural': 'Hosteler Balances',
+                'db_table': 'payment_balances',
+                'ordering': ['-outstanding'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ledger Month',
+                'verbose_name_plural': 'Ledger Months',
+                'db_table': 'payment_ledger_months',
+                'ordering': ['hosteler', '-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['due_date', 'status'], name='payment_due_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='hostelerbalance',
+            name='hosteler',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='hostel.hosteler'),
+        ),
+        migrations.AddField(
+            model_name='ledgermonth',
+            name='hosteler',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_months', to='hostel.hosteler'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgermonth',
+            index=models.Index(fields=['month', 'hosteler'], name='ledger_month_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgermonth',
+            constraint=models.UniqueConstraint(fields=('hosteler', 'month'), name='ledger_month_hosteler_uniq'),
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
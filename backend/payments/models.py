@@ -32,6 +32,8 @@ class Payment(models.Model):
     # Dates
     paid_on = models.DateTimeField(null=True, blank=True)
     due_date = models.DateField()
+    # First day of the month a fee-run invoice bills for (null for one-off payments)
+    billing_month = models.DateField(null=True, blank=True)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -42,10 +44,42 @@ class Payment(models.Model):
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
         ordering = ['-created_at']
+        constraints = [
+            # A fee run bills each hosteler at most once per month. Invoices
+            # without a billing_month are NULL and never collide, so this needs
+            # no condition (MySQL would silently drop a conditional one).
+            models.UniqueConstraint(fields=['hosteler', 'billing_month'], name='payment_hosteler_month_uniq'),
+        ]
+        indexes = [
+            # Keyset pagination: (created_at, id) overall and per hosteler
+            models.Index(fields=['-created_at', '-id'], name='payment_created_idx'),
+            models.Index(fields=['hosteler', '-created_at', '-id'], name='payment_hosteler_created_idx'),
+            # Dues report: this month's invoices already past their due date
+            models.Index(fields=['due_date', 'status'], name='payment_due_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.invoice_no} - {self.hosteler.name} - ₹{self.amount}"
     
+    @classmethod
+    def next_invoice_nos(cls, count=1):
+        """Reserve ``count`` new invoice numbers (P2024001 format) from the shared sequence."""
+        from core.sequences import allocate
+        numbers = allocate('invoice_no', count, start=2024001, seed=cls.max_invoice_number)
+        return [f'P{number}' for number in numbers]
+    
+    @classmethod
+    def max_invoice_number(cls):
+        """Highest numeric invoice number in the table (full scan; seeds the sequence)."""
+        from core.sequences import max_code_number
+        return max_code_number(cls.objects.values_list('invoice_no', flat=True).iterator(), 'P')
+    
+    @classmethod
+    def sync_id_sequence(cls):
+        """Move the sequence past invoice numbers that were inserted explicitly."""
+        from core.sequences import advance_to
+        advance_to('invoice_no', cls.max_invoice_number())
+    
     @property
     def hosteler_code(self):
         """Get hosteler code for serializer."""
@@ -55,3 +89,63 @@ class Payment(models.Model):
     def hosteler_name(self):
         """Get hosteler name for serializer."""
         return self.hosteler.name
+    
+    def publish_completed(self):
+        """Announce a completed payment; the payer is notified once the transaction commits."""
+        from core import events
+        events.publish(
+            events.PAYMENT_COMPLETED,
+            payment_id=self.pk,
+            invoice_no=self.invoice_no,
+            hosteler_id=self.hosteler.hosteler_id,
+            amount=str(self.amount),
+        )
+
+
+class LedgerMonth(models.Model):
+    """
+    What a hosteler was invoiced and has paid for one billing month (the
+    month of the invoices' due date). Maintained by payments.ledger as
+    payments are saved and deleted.
+    """
+    hosteler = models.ForeignKey('hostel.Hosteler', on_delete=models.CASCADE, related_name='ledger_months')
+    month = models.DateField()
+    billed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'payment_ledger_months'
+        verbose_name = 'Ledger Month'
+        verbose_name_plural = 'Ledger Months'
+        ordering = ['hosteler', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['hosteler', 'month'], name='ledger_month_hosteler_uniq'),
+        ]
+        indexes = [
+            # Dues report: months before the current one. Not a partial index
+            # on outstanding > 0 because MySQL would silently drop it.
+            models.Index(fields=['month', 'hosteler'], name='ledger_month_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.hosteler_id} {self.month:%Y-%m}: ₹{self.outstanding} outstanding"
+
+
+class HostelerBalance(models.Model):
+    """Running totals over all of a hosteler's invoices, maintained by payments.ledger."""
+    hosteler = models.OneToOneField('hostel.Hosteler', on_delete=models.CASCADE, related_name='balance')
+    billed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'payment_balances'
+        verbose_name = 'Hosteler Balance'
+        verbose_name_plural = 'Hosteler Balances'
+        ordering = ['-outstanding']
+    
+    def __str__(self):
+        return f"{self.hosteler_id}: ₹{self.outstanding} outstanding"
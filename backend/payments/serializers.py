@@ -14,45 +14,64 @@ class PaymentSerializer(CamelCaseModelSerializer):
     """
     # Computed fields for frontend compatibility
     id = serializers.CharField(source='invoice_no', read_only=True)
-    hosteler_code = serializers.CharField(source='hosteler_code', read_only=True)
-    hosteler_name = serializers.CharField(source='hosteler_name', read_only=True)
+    hosteler_code = serializers.CharField(read_only=True)
+    hosteler_name = serializers.CharField(read_only=True)
     
     # Write field for hosteler (accepts hosteler_id string)
     hosteler_id = serializers.CharField(write_only=True, required=False)
     
+    fast_sources = {
+        'hosteler_code': 'hosteler__hosteler_id',
+        'hosteler_name': 'hosteler__name',
+    }
+    
     class Meta:
         model = Payment
         fields = [
             'id', 'invoice_no', 'hosteler', 'hosteler_id', 'hosteler_code', 'hosteler_name',
-            'amount', 'payment_type', 'status', 'paid_on', 'due_date'
+            'amount', 'payment_type', 'status', 'paid_on', 'due_date', 'billing_month'
         ]
-        read_only_fields = ['id', 'invoice_no', 'hosteler_code', 'hosteler_name']
+        read_only_fields = ['id', 'invoice_no', 'hosteler_code', 'hosteler_name', 'billing_month']
+        # Either hosteler (pk) or hosteler_id (H2024001) identifies the payer
+        extra_kwargs = {'hosteler': {'required': False}}
     
-    def create(self, validated_data):
-        """Create payment with auto-generated invoice number."""
+    def resolve_hosteler(self, validated_data):
+        """Swap a hosteler_id (H2024001) for the hosteler it names."""
         hosteler_id = validated_data.pop('hosteler_id', None)
-        
-        # Get hosteler from hosteler_id if provided
         if hosteler_id:
             from hostel.models import Hosteler
             try:
-                hosteler = Hosteler.objects.get(hosteler_id=hosteler_id)
-                validated_data['hosteler'] = hosteler
+                validated_data['hosteler'] = Hosteler.objects.get(hosteler_id=hosteler_id)
             except Hosteler.DoesNotExist:
                 raise serializers.ValidationError({'hosteler_id': f'Hosteler {hosteler_id} not found'})
+    
+    def create(self, validated_data):
+        """Create payment with auto-generated invoice number."""
+        self.resolve_hosteler(validated_data)
+        if 'hosteler' not in validated_data:
+            raise serializers.ValidationError({'hosteler_id': 'This field is required.'})
         
         # Auto-generate invoice number if not provided
         if 'invoice_no' not in validated_data or not validated_data['invoice_no']:
-            last_payment = Payment.objects.order_by('-id').first()
-            if last_payment:
-                last_num = int(last_payment.invoice_no.replace('P', ''))
-                new_num = last_num + 1
-            else:
-                new_num = 2024001
-            validated_data['invoice_no'] = f'P{new_num}'
+            validated_data['invoice_no'] = Payment.next_invoice_nos()[0]
         
         # Set paid_on to now if status is completed and paid_on is not set
         if validated_data.get('status') == 'completed' and not validated_data.get('paid_on'):
             validated_data['paid_on'] = timezone.now()
         
-        return super().create(validated_data)
+        payment = super().create(validated_data)
+        if payment.status == 'completed':
+            payment.publish_completed()
+        return payment
+    
+    def update(self, instance, validated_data):
+        """Stamp paid_on and notify the payer when a payment becomes completed."""
+        self.resolve_hosteler(validated_data)
+        was_completed = instance.status == 'completed'
+        if validated_data.get('status') == 'completed' and not was_completed and not validated_data.get('paid_on'):
+            validated_data['paid_on'] = timezone.now()
+        
+        payment = super().update(instance, validated_data)
+        if payment.status == 'completed' and not was_completed:
+            payment.publish_completed()
+        return payment
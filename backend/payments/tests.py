@@ -0,0 +1,131 @@
+"""
+Tests for the monthly fee run and the running ledger balances.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from hostel.models import Hosteler
+from payments import feerun, ledger
+from payments.models import HostelerBalance, LedgerMonth, Payment
+from rooms.models import Room
+
+
+def make_hosteler(number, room=None):
+    return Hosteler.objects.create(
+        hosteler_id=f'H202400{number}', name=f'Student {number}', gender='male', age=20,
+        mobile=f'987650000{number}', email=f'student{number}@example.com', room=room,
+        checkin_date=date(2024, 1, 1),
+    )
+
+
+def make_payment(hosteler, amount, due_date, status='pending', number=1):
+    return Payment.objects.create(
+        invoice_no=f'TEST{number:04d}', hosteler=hosteler, amount=Decimal(amount), payment_type='online',
+        status=status, due_date=due_date,
+    )
+
+
+class FeeRunTests(TestCase):
+
+    def setUp(self):
+        room = Room.objects.create(
+            room_number='A101', block='a-block', floor='ground', room_type='non-ac', bed_type='double',
+            total_beds=2, available_beds=0, room_rate=4500, is_available=False,
+        )
+        self.first = make_hosteler(1, room)
+        self.second = make_hosteler(2, room)
+
+    def test_new_invoices_are_added_to_the_ledger(self):
+        make_payment(self.first, '4500', date(2024, 11, 10), status='completed')
+        # An invoice already in the billed month, for the existing-row path
+        make_payment(self.second, '300', date(2024, 12, 5), number=2)
+        november = LedgerMonth.objects.get(hosteler=self.first, month=date(2024, 11, 1))
+
+        summary = feerun.run(date(2024, 12, 1))
+
+        self.assertEqual(summary['created'], 2)
+        december = dict(LedgerMonth.objects.filter(month=date(2024, 12, 1)).values_list('hosteler_id', 'billed'))
+        self.assertEqual(december, {self.first.pk: Decimal('4500.00'), self.second.pk: Decimal('4800.00')})
+        self.assertEqual(
+            HostelerBalance.objects.get(hosteler=self.first).outstanding, Decimal('4500.00'),
+        )
+        self.assertEqual(HostelerBalance.objects.get(hosteler=self.first).paid, Decimal('4500.00'))
+        # Earlier months are left alone, not recomputed
+        self.assertEqual(LedgerMonth.objects.get(pk=november.pk).updated_at, november.updated_at)
+
+    def test_dry_run_flag_from_the_api(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+        dry = client.post('/api/payments/fee_run/', {'month': '2024-12', 'dryRun': 'true'}, format='json')
+        real = client.post('/api/payments/fee_run/', {'month': '2024-12', 'dryRun': 'false'}, format='json')
+
+        self.assertEqual((dry.status_code, dry.json()['created']), (200, 0))
+        self.assertEqual((real.status_code, real.json()['created']), (201, 2))
+
+
+class LedgerTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        self.hosteler = make_hosteler(1)
+        self.november = make_payment(self.hosteler, '4500', date(2024, 11, 10))
+        self.december = make_payment(self.hosteler, '4500', date(2024, 12, 10), number=2)
+
+    def totals(self):
+        balance = HostelerBalance.objects.get(hosteler=self.hosteler)
+        months = {
+            row.month.month: (row.billed, row.paid, row.outstanding)
+            for row in LedgerMonth.objects.filter(hosteler=self.hosteler)
+        }
+        return (balance.billed, balance.paid, balance.outstanding), months
+
+    def set_status(self, payment, value):
+        response = self.client.patch(f'/api/payments/{payment.pk}/', {'status': value}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def assertMatchesRebuild(self):
+        incremental = self.totals()
+        ledger.rebuild([self.hosteler.pk])
+        self.assertEqual(self.totals(), incremental)
+
+    def test_completing_a_payment_moves_it_to_paid(self):
+        self.set_status(self.november, 'completed')
+
+        balance, months = self.totals()
+        self.assertEqual(balance, (Decimal('9000.00'), Decimal('4500.00'), Decimal('4500.00')))
+        self.assertEqual(months[11], (Decimal('4500.00'), Decimal('4500.00'), Decimal('0.00')))
+        self.assertEqual(months[12], (Decimal('4500.00'), Decimal('0.00'), Decimal('4500.00')))
+        self.assertMatchesRebuild()
+
+    def test_reopening_a_payment_restores_the_balance(self):
+        self.set_status(self.november, 'completed')
+        self.set_status(self.november, 'failed')
+
+        balance, months = self.totals()
+        self.assertEqual(balance, (Decimal('9000.00'), Decimal('0.00'), Decimal('9000.00')))
+        self.assertEqual(months[11], (Decimal('4500.00'), Decimal('0.00'), Decimal('4500.00')))
+        self.assertMatchesRebuild()
+
+    def test_moving_and_deleting_payments(self):
+        self.december.due_date = date(2024, 11, 20)
+        self.december.status = 'completed'
+        self.december.save()
+
+        balance, months = self.totals()
+        self.assertEqual(balance, (Decimal('9000.00'), Decimal('4500.00'), Decimal('4500.00')))
+        self.assertEqual(months[11], (Decimal('9000.00'), Decimal('4500.00'), Decimal('4500.00')))
+        # The emptied month is dropped rather than left at zero
+        self.assertNotIn(12, months)
+
+        self.november.delete()
+
+        balance, months = self.totals()
+        self.assertEqual(balance, (Decimal('4500.00'), Decimal('4500.00'), Decimal('0.00')))
+        self.assertEqual(months[11], (Decimal('4500.00'), Decimal('4500.00'), Decimal('0.00')))
+        self.assertMatchesRebuild()
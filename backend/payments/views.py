@@ -1,13 +1,23 @@
 """
 Views for Payment management.
 """
-from rest_framework import viewsets
+from decimal import Decimal, InvalidOperation
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from core.mixins import ExportModelMixin, FastListModelMixin
+from core.pagination import KeysetPagination
+from core.permissions import IsWarden
+from hostel.models import Hosteler
+from . import feerun, ledger
 from .models import Payment
 from .serializers import PaymentSerializer
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(FastListModelMixin, ExportModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Payment CRUD operations.
     
@@ -17,9 +27,16 @@ class PaymentViewSet(viewsets.ModelViewSet):
     - GET /api/payments/{id}/ - Retrieve payment
     - PUT /api/payments/{id}/ - Update payment
     - DELETE /api/payments/{id}/ - Delete payment
+    - GET /api/payments/dues/ - Hostelers with overdue invoices, largest first (Warden only)
+    - GET /api/payments/balance/ - Balance and per-month breakdown for one hosteler
+    - POST /api/payments/fee_run/ - Invoice every allocated hosteler for a month (Warden only)
+    - GET /api/payments/export/?fileType=csv|xlsx - Stream the list as a file
     """
+    dues_limit = 1000
+    
     queryset = Payment.objects.all().select_related('hosteler')
     serializer_class = PaymentSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -29,7 +46,6 @@ class PaymentViewSet(viewsets.ModelViewSet):
         
         # Students can only see their own payments
         if user.is_student and user.hosteler_id:
-            from hostel.models import Hosteler
             try:
                 hosteler = Hosteler.objects.get(hosteler_id=user.hosteler_id)
                 queryset = queryset.filter(hosteler=hosteler)
@@ -37,3 +53,76 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 queryset = queryset.none()
         
         return queryset
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsWarden])
+    def dues(self, request):
+        """
+        Outstanding dues report, sorted by amount overdue.
+        GET /api/payments/dues/?block=A&minOverdue=1000&limit=100&date=2024-12-24
+        """
+        params = request.query_params
+        day = None
+        if params.get('date'):
+            try:
+                day = parse_date(params['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        min_overdue = None
+        if params.get('minOverdue'):
+            try:
+                min_overdue = Decimal(params['minOverdue'])
+            except InvalidOperation:
+                min_overdue = None
+            if min_overdue is None or not min_overdue.is_finite():
+                return Response({'error': 'minOverdue must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = int(params.get('limit', 100))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.dues_limit))
+        
+        return Response(ledger.dues(day, params.get('block') or None, min_overdue, limit))
+    
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """
+        Balance with the per-month breakdown.
+        GET /api/payments/balance/?hostelerId=H2024001 (students always get their own)
+        """
+        user = request.user
+        hosteler_id = user.hosteler_id if user.is_student else request.query_params.get('hostelerId')
+        if not hosteler_id:
+            return Response({'error': 'hostelerId is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            hosteler = Hosteler.objects.get(hosteler_id=hosteler_id)
+        except Hosteler.DoesNotExist:
+            return Response({'error': f'Hosteler {hosteler_id} not found'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ledger.statement(hosteler))
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def fee_run(self, request):
+        """
+        Create this month's (or the given month's) rent invoices; safe to repeat.
+        POST /api/payments/fee_run/
+        Body: {"month": "2024-12", "paymentType": "online", "dryRun": false}
+        """
+        month = timezone.localdate()
+        if request.data.get('month'):
+            try:
+                month = parse_date(f"{request.data['month']}-01")
+            except ValueError:
+                month = None
+            if month is None:
+                return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        payment_type = request.data.get('paymentType', 'online')
+        if payment_type not in dict(Payment.PAYMENT_TYPE_CHOICES):
+            return Response({'error': f'Invalid paymentType: {payment_type}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        dry_run = request.data.get('dryRun', False) in (True, 'true', '1')
+        summary = feerun.run(month, payment_type, dry_run=dry_run)
+        return Response(summary, status=status.HTTP_200_OK if summary['dryRun'] else status.HTTP_201_CREATED)
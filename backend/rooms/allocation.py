@@ -0,0 +1,114 @@
+"""
+Bed allocation service.
+
+All changes to ``Hosteler.room``/``bed`` go through these functions. Each one
+locks the affected room rows with ``select_for_update`` and recomputes
+``available_beds`` from the hostelers actually assigned to the room, so
+concurrent wardens can never double-book a bed and the counters always match
+the allocation rows.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from hostel.models import Hosteler
+from .models import Room
+
+
+class AllocationError(Exception):
+    """Raised when a bed cannot be allocated, released or transferred."""
+
+
+def bed_labels(room):
+    """Bed labels for a room: B1, B2, ... up to total_beds."""
+    return [f'B{number}' for number in range(1, room.total_beds + 1)]
+
+
+def free_beds(room, exclude=None):
+    """Labels of the beds in ``room`` that nobody occupies."""
+    occupants = Hosteler.objects.filter(room=room)
+    if exclude is not None:
+        occupants = occupants.exclude(pk=exclude.pk)
+    taken = list(occupants.values_list('bed', flat=True))
+    # Occupants without a bed label still use up a bed
+    if len(taken) >= room.total_beds:
+        return []
+    taken = set(taken)
+    return [label for label in bed_labels(room) if label not in taken]
+
+
+def recount_beds(room):
+    """Recompute available_beds/is_available for a locked room from its occupants."""
+    occupied = Hosteler.objects.filter(room=room).count()
+    room.available_beds = max(room.total_beds - occupied, 0)
+    room.is_available = room.available_beds > 0
+    room.save(update_fields=['available_beds', 'is_available', 'updated_at'])
+    return room
+
+
+def _lock_rooms(*room_ids):
+    """Lock rooms in primary-key order so concurrent transfers cannot deadlock."""
+    ids = sorted({room_id for room_id in room_ids if room_id})
+    rooms = Room.objects.select_for_update().in_bulk(ids)
+    return [rooms[room_id] for room_id in ids if room_id in rooms]
+
+
+def _lock_hosteler(hosteler):
+    return Hosteler.objects.select_for_update().get(pk=hosteler.pk)
+
+
+def _assign(hosteler, room, bed=None, checkin_date=None):
+    """Put a locked hosteler into a locked room. Caller handles the old room."""
+    available = free_beds(room, exclude=hosteler)
+    if not available:
+        raise AllocationError(f'Room {room.room_number} has no free beds')
+    if bed and bed not in available:
+        raise AllocationError(f'Bed {bed} in room {room.room_number} is not free')
+
+    hosteler.room = room
+    hosteler.bed = bed or available[0]
+    hosteler.checkin_date = checkin_date or hosteler.checkin_date or timezone.localdate()
+    hosteler.save(update_fields=['room', 'bed', 'checkin_date', 'updated_at'])
+    recount_beds(room)
+    return hosteler
+
+
+@transaction.atomic
+def allocate(hosteler, room, bed=None, checkin_date=None):
+    """Assign an unallocated hosteler to a bed in ``room`` (first free bed if not given)."""
+    hosteler = _lock_hosteler(hosteler)
+    if hosteler.room_id:
+        raise AllocationError(
+            f'Hosteler {hosteler.hosteler_id} is already in room {hosteler.room.room_number}; use transfer'
+        )
+    [room] = _lock_rooms(room.pk)
+    return _assign(hosteler, room, bed, checkin_date)
+
+
+@transaction.atomic
+def release(hosteler):
+    """Free the hosteler's bed."""
+    hosteler = _lock_hosteler(hosteler)
+    if not hosteler.room_id:
+        raise AllocationError(f'Hosteler {hosteler.hosteler_id} has no room allocated')
+    [room] = _lock_rooms(hosteler.room_id)
+
+    hosteler.room = None
+    hosteler.bed = ''
+    hosteler.save(update_fields=['room', 'bed', 'updated_at'])
+    recount_beds(room)
+    return hosteler
+
+
+@transaction.atomic
+def transfer(hosteler, room, bed=None):
+    """Move an allocated hosteler to a bed in ``room`` (may be the same room, e.g. to swap beds)."""
+    hosteler = _lock_hosteler(hosteler)
+    if not hosteler.room_id:
+        raise AllocationError(f'Hosteler {hosteler.hosteler_id} has no room allocated; use allocate')
+    locked = {locked_room.pk: locked_room for locked_room in _lock_rooms(hosteler.room_id, room.pk)}
+    previous_room = locked[hosteler.room_id]
+
+    _assign(hosteler, locked[room.pk], bed)
+    if previous_room.pk != room.pk:
+        recount_beds(previous_room)
+    return hosteler
@@ -0,0 +1,229 @@
+"""
+In-memory index of free beds for the vacancy search.
+
+Rooms are bucketed by (block, floor, room_type, bed_type) and sorted by rate
+inside each bucket, so a query such as "AC triple in B block under 5000" only
+touches the few matching buckets and never hits the database.
+
+The index mirrors the Room rows. Bed counts only change through
+``rooms.allocation`` (which always saves the Room) or ``rooms.solver`` (which
+reports its bulk writes here), so Room save/delete signals are enough to keep
+it current in this process. The index is built on the first query after
+startup, not at startup itself.
+
+Writes made by other processes are caught through a version. With a cache
+every worker shares (core.cache.is_shared), every change advances a data
+version there, and a query that sees a version it did not produce rebuilds
+the index; queries then don't touch the database at all. With a per-process
+cache that version would only ever move here, so the version is read from
+the Room table instead (row count and latest ``updated_at``, one aggregate
+query per search), and local writes simply drop the index.
+"""
+import threading
+from bisect import bisect_right
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from core.cache import advance_data_version, get_data_versions, is_shared
+from .models import Room
+
+VERSION_COLLECTION = 'room-availability'
+
+FACETS = (
+    ('block', 'block'),
+    ('floor', 'floor'),
+    ('roomType', 'room_type'),
+    ('bedType', 'bed_type'),
+)
+
+
+class Vacancy:
+    """Snapshot of the Room fields the index needs."""
+    __slots__ = ('pk', 'room_number', 'block', 'floor', 'room_type', 'bed_type',
+                 'room_rate', 'total_beds', 'free_beds')
+
+    def __init__(self, room):
+        self.pk = room.pk
+        self.room_number = room.room_number
+        self.block = room.block
+        self.floor = room.floor
+        self.room_type = room.room_type
+        self.bed_type = room.bed_type
+        self.room_rate = room.room_rate
+        self.total_beds = room.total_beds
+        self.free_beds = room.available_beds if room.is_available else 0
+
+    @property
+    def bucket(self):
+        return (self.block, self.floor, self.room_type, self.bed_type)
+
+    @property
+    def sort_key(self):
+        return (self.room_rate, self.room_number)
+
+    def to_dict(self):
+        return {
+            'id': self.pk,
+            'roomNumber': self.room_number,
+            'block': self.block,
+            'floor': self.floor,
+            'roomType': self.room_type,
+            'bedType': self.bed_type,
+            'roomRate': f'{self.room_rate:.2f}',
+            'totalBeds': self.total_beds,
+            'availableBeds': self.free_beds,
+        }
+
+
+class Bucket:
+    """Rooms of one (block, floor, room_type, bed_type) combination, cheapest first."""
+    __slots__ = ('keys', 'rooms')
+
+    def __init__(self):
+        self.keys = []
+        self.rooms = []
+
+    def add(self, vacancy):
+        position = bisect_right(self.keys, vacancy.sort_key)
+        self.keys.insert(position, vacancy.sort_key)
+        self.rooms.insert(position, vacancy)
+
+    def remove(self, vacancy):
+        position = self.rooms.index(vacancy)
+        del self.keys[position]
+        del self.rooms[position]
+
+    def up_to(self, max_rate):
+        """Rooms with room_rate <= max_rate."""
+        if max_rate is None:
+            return self.rooms
+        end = bisect_right(self.keys, (max_rate, '\uffff'))
+        return self.rooms[:end]
+
+
+def current_version():
+    """The version the index is checked against (see the module docstring)."""
+    if is_shared():
+        return get_data_versions([VERSION_COLLECTION])[VERSION_COLLECTION]
+    stamp = Room.objects.aggregate(rooms=Count('pk'), updated=Max('updated_at'))
+    return (stamp['rooms'], stamp['updated'])
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.rooms = {}
+        self.buckets = {}
+
+    def _add(self, vacancy):
+        self.rooms[vacancy.pk] = vacancy
+        bucket = self.buckets.get(vacancy.bucket)
+        if bucket is None:
+            bucket = self.buckets[vacancy.bucket] = Bucket()
+        bucket.add(vacancy)
+
+    def _discard(self, pk):
+        vacancy = self.rooms.pop(pk, None)
+        if vacancy is not None:
+            self.buckets[vacancy.bucket].remove(vacancy)
+
+    def rebuild(self):
+        # Version first: a write landing mid-rebuild leaves us behind, not ahead
+        version = current_version()
+        rooms = Room.objects.only(
+            'id', 'room_number', 'block', 'floor', 'room_type', 'bed_type',
+            'room_rate', 'total_beds', 'available_beds', 'is_available',
+        )
+        with self.lock:
+            self.rooms = {}
+            self.buckets = {}
+            for room in rooms:
+                self._add(Vacancy(room))
+            self.version = version
+
+    def ensure_current(self):
+        """Rebuild if another process (or a bulk write) moved the version."""
+        version = current_version()
+        if version != self.version:
+            self.rebuild()
+
+    def apply(self, saved=(), deleted=()):
+        """
+        Fold committed changes into the index and advance the shared version.
+        If anyone else advanced it meanwhile, drop the index so the next query rebuilds.
+        """
+        if not is_shared():
+            with self.lock:
+                self.version = None
+            return
+        version = advance_data_version(VERSION_COLLECTION)
+        with self.lock:
+            if self.version is None:
+                return
+            if version != self.version + 1:
+                self.version = None
+                return
+            for pk in deleted:
+                self._discard(pk)
+            for vacancy in saved:
+                self._discard(vacancy.pk)
+                self._add(vacancy)
+            self.version = version
+
+    def search(self, block=None, floor=None, room_type=None, bed_type=None, min_free=1, max_rate=None):
+        """Rooms with at least ``min_free`` free beds matching the filters, cheapest first."""
+        self.ensure_current()
+        wanted = (block, floor, room_type, bed_type)
+        matches = []
+        with self.lock:
+            for key, bucket in self.buckets.items():
+                if any(value and value != actual for value, actual in zip(wanted, key)):
+                    continue
+                matches.extend(
+                    vacancy for vacancy in bucket.up_to(max_rate)
+                    if vacancy.free_beds >= min_free
+                )
+        matches.sort(key=lambda vacancy: vacancy.sort_key)
+        return matches
+
+
+index = AvailabilityIndex()
+
+
+def vacancies(limit=None, **filters):
+    """Vacancy search result with totals and per-facet room counts."""
+    matches = index.search(**filters)
+    facets = {name: Counter() for name, _ in FACETS}
+    for vacancy in matches:
+        for name, attr in FACETS:
+            facets[name][getattr(vacancy, attr)] += 1
+    return {
+        'count': len(matches),
+        'freeBeds': sum(vacancy.free_beds for vacancy in matches),
+        'facets': {name: dict(counts) for name, counts in facets.items()},
+        'results': [vacancy.to_dict() for vacancy in matches[:limit]],
+    }
+
+
+def rooms_changed(rooms):
+    """Report rooms written without save() (bulk_update); applied once the transaction commits."""
+    saved = [Vacancy(room) for room in rooms]
+    transaction.on_commit(lambda: index.apply(saved=saved))
+
+
+def room_saved(sender, instance, **kwargs):
+    rooms_changed([instance])
+
+
+def room_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: index.apply(deleted=[pk]))
+
+
+def connect():
+    post_save.connect(room_saved, sender=Room, dispatch_uid='room-availability-save')
+    post_delete.connect(room_deleted, sender=Room, dispatch_uid='room-availability-delete')
@@ -0,0 +1,69 @@
+"""
+Management command to place unallocated hostelers in free beds in bulk.
+Usage: python manage.py allocate_rooms [--room-type ac] [--bed-type triple] [--max-rate 5000]
+                                        [--preferences prefs.json] [--dry-run]
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rooms.solver import allocate_batch, check_rates, parse_rate
+
+
+class Command(BaseCommand):
+    help = 'Allocates beds to unallocated hostelers in one pass (admission season)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('hosteler_ids', nargs='*', help='Limit the batch to these hosteler IDs')
+        parser.add_argument('--block', choices=['a-block', 'b-block'], help='Block for hostelers whose gender has none; others must already belong to it')
+        parser.add_argument('--room-type', choices=['ac', 'non-ac'])
+        parser.add_argument('--bed-type', choices=['single', 'double', 'triple'])
+        parser.add_argument('--max-rate', help='Highest room_rate anyone may be placed in')
+        parser.add_argument('--preferences', help='JSON file of per-hosteler overrides keyed by hosteler ID')
+        parser.add_argument('--no-groups', action='store_true', help="Don't keep course/year groups together")
+        parser.add_argument('--dry-run', action='store_true', help='Plan only, write nothing')
+    
+    def handle(self, *args, **options):
+        preferences = {}
+        if options['preferences']:
+            try:
+                with open(options['preferences']) as handle:
+                    preferences = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Could not read preferences: {exc}')
+            if not isinstance(preferences, dict) or not all(isinstance(prefs, dict) for prefs in preferences.values()):
+                raise CommandError('Preferences must be a JSON object of objects keyed by hosteler ID')
+        
+        constraints = {
+            'block': options['block'],
+            'room_type': options['room_type'],
+            'bed_type': options['bed_type'],
+            'max_rate': options['max_rate'],
+        }
+        if options['max_rate'] is not None:
+            try:
+                parse_rate(options['max_rate'])
+            except ValueError:
+                raise CommandError(f"--max-rate must be a number, not {options['max_rate']!r}")
+        try:
+            check_rates(None, preferences)
+        except ValueError as exc:
+            raise CommandError(f'Invalid max rate in preferences: {exc}')
+        
+        result = allocate_batch(
+            hosteler_ids=options['hosteler_ids'] or None,
+            constraints=constraints,
+            preferences=preferences,
+            keep_groups=not options['no_groups'],
+            dry_run=options['dry_run'],
+        )
+        
+        for unplaced in result['unplaced']:
+            self.stdout.write(self.style.WARNING(f"{unplaced['hostelerId']}: {unplaced['reason']}"))
+        
+        timings = result['timings']
+        verb = 'Planned' if result['dryRun'] else 'Allocated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['planned']} hostelers, {len(result['unplaced'])} unplaced "
+            f"(load {timings['loadMs']} ms, plan {timings['planMs']} ms, "
+            f"write {timings['writeMs']} ms, total {timings['totalMs']} ms)"
+        ))
@@ -8,6 +8,9 @@ class Room(models.Model):
     """
     Model for hostel rooms.
     Matches frontend mapRoomFromApi structure.
+    
+    Bed counts are maintained by rooms.allocation, which assigns hostelers
+    to beds under a row lock; do not change available_beds directly.
     """
     BLOCK_CHOICES = [
         ('a-block', 'A Block (Boys)'),
@@ -60,20 +63,4 @@ class Room(models.Model):
     def update_availability(self):
         """Update room availability based on available beds."""
         self.is_available = self.available_beds > 0
-        self.save(update_fields=['is_available'])
-    
-    def allocate_bed(self):
-        """Allocate a bed (decrease available beds)."""
-        if self.available_beds > 0:
-            self.available_beds -= 1
-            self.update_availability()
-            return True
-        return False
-    
-    def deallocate_bed(self):
-        """Deallocate a bed (increase available beds)."""
-        if self.available_beds < self.total_beds:
-            self.available_beds += 1
-            self.update_availability()
-            return True
-        return False
+        self.save(update_fields=['is_available', 'updated_at'])
@@ -14,6 +14,11 @@ class RoomSerializer(CamelCaseModelSerializer):
     # Include list of student IDs in this room
     students = serializers.SerializerMethodField()
     
+    # Filled in per page by fast_rows() with a single occupant query
+    fast_sources = {
+        'students': ('pk', lambda pk: []),
+    }
+    
     class Meta:
         model = Room
         fields = [
@@ -25,8 +30,27 @@ class RoomSerializer(CamelCaseModelSerializer):
     
     def get_students(self, obj):
         """Return list of hosteler IDs currently in this room."""
+        # Use the prefetch cache when the queryset provides one (see RoomViewSet)
+        if 'hostelers' in getattr(obj, '_prefetched_objects_cache', {}):
+            return [hosteler.hosteler_id for hosteler in obj.hostelers.all()]
         return list(obj.hostelers.values_list('hosteler_id', flat=True))
     
+    @classmethod
+    def fast_rows(cls, rows, context=None, model=None):
+        """Attach occupant hosteler IDs to every room with one query."""
+        from hostel.models import Hosteler
+        rooms = super().fast_rows(rows, context, model)
+        by_id = {room['id']: room for room in rooms}
+        if by_id:
+            occupants = Hosteler.objects.filter(room__isnull=False)
+            # Big pages (e.g. hostel-data) read every allocation rather than a huge IN list
+            if len(by_id) <= 500:
+                occupants = occupants.filter(room_id__in=by_id)
+            for room_id, hosteler_id in occupants.values_list('room_id', 'hosteler_id'):
+                if room_id in by_id:
+                    by_id[room_id]['students'].append(hosteler_id)
+        return rooms
+    
     def validate(self, data):
         """Validate room data."""
         if 'total_beds' in data:
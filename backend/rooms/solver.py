@@ -0,0 +1,255 @@
+"""
+Bulk room allocation for admission season.
+
+Places a batch of unallocated hostelers in one pass over an in-memory index of
+free beds, then writes every assignment in a single transaction.
+
+Rules:
+- Block follows gender (male -> a-block, female -> b-block); other genders need
+  an explicit ``block`` preference. A ``block`` preference never overrides
+  gender: a hosteler whose gender maps to another block is left unplaced.
+- ``room_type``, ``bed_type`` and ``max_rate`` preferences are hard filters.
+  They can be given for the whole batch and overridden per hosteler.
+- Hostelers from the same course and year are placed together. A group first
+  fills rooms that already hold its members, then empty rooms (cheapest first),
+  and only then leftover beds in mixed rooms.
+"""
+import time
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_data_version
+from hostel.models import Hosteler
+from . import availability
+from .allocation import bed_labels
+from .models import Room
+
+GENDER_BLOCKS = {
+    'male': 'a-block',
+    'female': 'b-block',
+}
+
+PREFERENCE_KEYS = ('block', 'room_type', 'bed_type', 'max_rate')
+
+
+class RoomState:
+    """Free-bed bookkeeping for one room during planning."""
+    __slots__ = ('room', 'free', 'occupants', 'groups')
+
+    def __init__(self, room, taken_beds, groups):
+        self.room = room
+        self.occupants = len(taken_beds)
+        taken = set(taken_beds)
+        self.free = [] if self.occupants >= room.total_beds else [
+            label for label in bed_labels(room) if label not in taken
+        ]
+        self.groups = groups
+
+    def take(self, group):
+        self.occupants += 1
+        self.groups.add(group)
+        return self.free.pop(0)
+
+
+class FreeBedIndex:
+    """Rooms with free beds, bucketed by (block, room_type, bed_type) and sorted by rate."""
+
+    def __init__(self, rooms, occupants):
+        taken = defaultdict(list)
+        groups = defaultdict(set)
+        for room_id, bed, course, year in occupants:
+            taken[room_id].append(bed)
+            groups[room_id].add((course, year))
+
+        self.buckets = defaultdict(list)
+        self.states = {}
+        for room in rooms:
+            state = RoomState(room, taken[room.pk], groups[room.pk])
+            if state.free:
+                self.states[room.pk] = state
+                self.buckets[(room.block, room.room_type, room.bed_type)].append(state)
+        for bucket in self.buckets.values():
+            bucket.sort(key=lambda state: (state.room.room_rate, state.room.floor, state.room.room_number))
+
+    def candidates(self, block, room_type=None, bed_type=None, max_rate=None):
+        """Rooms with free beds matching the filters, cheapest first."""
+        found = []
+        for (bucket_block, bucket_type, bucket_beds), bucket in self.buckets.items():
+            if bucket_block != block:
+                continue
+            if room_type and bucket_type != room_type:
+                continue
+            if bed_type and bucket_beds != bed_type:
+                continue
+            found.extend(
+                state for state in bucket
+                if state.free and (max_rate is None or state.room.room_rate <= max_rate)
+            )
+        found.sort(key=lambda state: (state.room.room_rate, state.room.floor, state.room.room_number))
+        return found
+
+
+def parse_rate(value):
+    """``value`` as a finite Decimal; ValueError if it isn't a number."""
+    try:
+        rate = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'{value!r} is not a number')
+    if not rate.is_finite():
+        raise ValueError(f'{value!r} is not a number')
+    return rate
+
+
+def check_rates(constraints, preferences):
+    """Raise ValueError if the batch-wide or any per-hosteler max rate isn't a number."""
+    for prefs in [constraints or {}, *(preferences or {}).values()]:
+        for key in ('maxRate', 'max_rate'):
+            if prefs.get(key) not in (None, ''):
+                parse_rate(prefs[key])
+
+
+def normalize_preferences(preferences):
+    """Accept camelCase or snake_case preference dicts; returns snake_case with typed values."""
+    if not preferences:
+        return {}
+    aliases = {'roomType': 'room_type', 'bedType': 'bed_type', 'maxRate': 'max_rate'}
+    normalized = {}
+    for key, value in preferences.items():
+        key = aliases.get(key, key)
+        if key in PREFERENCE_KEYS and value not in (None, ''):
+            normalized[key] = parse_rate(value) if key == 'max_rate' else value
+    return normalized
+
+
+def plan(hostelers, index, constraints=None, preferences=None, keep_groups=True):
+    """
+    Compute assignments without touching the database.
+    Returns (assignments, unplaced) where assignments is [(hosteler, room, bed)]
+    and unplaced is [(hosteler, reason)].
+    """
+    constraints = normalize_preferences(constraints)
+    preferences = {
+        hosteler_id: normalize_preferences(prefs)
+        for hosteler_id, prefs in (preferences or {}).items()
+    }
+
+    # Bucket hostelers by everything that decides where they may go
+    groups = defaultdict(list)
+    unplaced = []
+    for hosteler in hostelers:
+        prefs = {**constraints, **preferences.get(hosteler.hosteler_id, {})}
+        block = GENDER_BLOCKS.get(hosteler.gender)
+        if block and prefs.get('block') not in (None, '', block):
+            unplaced.append((hosteler, f"Block {prefs['block']} doesn't match gender {hosteler.gender!r} ({block})"))
+            continue
+        block = block or prefs.get('block')
+        if not block:
+            unplaced.append((hosteler, f'No block for gender {hosteler.gender!r}; pass a block preference'))
+            continue
+        group = (hosteler.course, hosteler.year) if keep_groups else None
+        filters = (block, prefs.get('room_type'), prefs.get('bed_type'), prefs.get('max_rate'))
+        groups[(filters, group)].append(hosteler)
+
+    assignments = []
+    for (filters, group), members in sorted(groups.items(), key=lambda item: -len(item[1])):
+        members.sort(key=lambda hosteler: hosteler.hosteler_id)
+        candidates = index.candidates(*filters)
+        # Rooms already holding this group, then empty rooms, then any free bed
+        ordered = (
+            [state for state in candidates if group is not None and group in state.groups]
+            + [state for state in candidates if state.occupants == 0]
+            + candidates
+        )
+        position = 0
+        for hosteler in members:
+            while position < len(ordered) and not ordered[position].free:
+                position += 1
+            if position == len(ordered):
+                unplaced.append((hosteler, 'No free bed matches the preferences'))
+                continue
+            state = ordered[position]
+            assignments.append((hosteler, state.room, state.take(group)))
+
+    return assignments, unplaced
+
+
+def allocate_batch(hosteler_ids=None, constraints=None, preferences=None, keep_groups=True,
+                   dry_run=False, checkin_date=None):
+    """
+    Place unallocated hostelers in free beds and commit the result in one transaction.
+
+    ``hosteler_ids`` limits the batch (default: every unallocated hosteler).
+    Returns a summary dict with assignments, unplaced hostelers and timings.
+    """
+    started = time.perf_counter()
+    checkin_date = checkin_date or timezone.localdate()
+
+    with transaction.atomic():
+        # Same lock order as rooms.allocation: hostelers first, then rooms
+        hostelers = Hosteler.objects.select_for_update().filter(room__isnull=True).order_by('pk')
+        if hosteler_ids is not None:
+            hostelers = hostelers.filter(hosteler_id__in=hosteler_ids)
+        hostelers = list(hostelers.only('id', 'hosteler_id', 'gender', 'course', 'year', 'checkin_date'))
+
+        rooms = list(
+            Room.objects.select_for_update().order_by('pk').only(
+                'id', 'room_number', 'block', 'floor', 'room_type', 'bed_type', 'total_beds', 'room_rate',
+            )
+        )
+        occupants = Hosteler.objects.filter(room__isnull=False).values_list('room_id', 'bed', 'course', 'year')
+        index = FreeBedIndex(rooms, occupants)
+        loaded = time.perf_counter()
+
+        assignments, unplaced = plan(hostelers, index, constraints, preferences, keep_groups)
+        planned = time.perf_counter()
+
+        if assignments and not dry_run:
+            now = timezone.now()
+            for hosteler, room, bed in assignments:
+                hosteler.room = room
+                hosteler.bed = bed
+                hosteler.checkin_date = hosteler.checkin_date or checkin_date
+                hosteler.updated_at = now
+            Hosteler.objects.bulk_update(
+                [hosteler for hosteler, _, _ in assignments],
+                ['room', 'bed', 'checkin_date', 'updated_at'],
+                batch_size=500,
+            )
+
+            touched = {room.pk: index.states[room.pk] for _, room, _ in assignments}
+            for state in touched.values():
+                state.room.available_beds = max(state.room.total_beds - state.occupants, 0)
+                state.room.is_available = state.room.available_beds > 0
+                state.room.updated_at = now
+            Room.objects.bulk_update(
+                [state.room for state in touched.values()],
+                ['available_beds', 'is_available', 'updated_at'],
+                batch_size=500,
+            )
+            # bulk_update bypasses the save signals that normally invalidate caches
+            bump_data_version('hostelers', 'rooms')
+            availability.rooms_changed([state.room for state in touched.values()])
+
+    finished = time.perf_counter()
+    return {
+        'allocated': 0 if dry_run else len(assignments),
+        'planned': len(assignments),
+        'dryRun': dry_run,
+        'assignments': [
+            {'hostelerId': hosteler.hosteler_id, 'roomNumber': room.room_number, 'bed': bed}
+            for hosteler, room, bed in assignments
+        ],
+        'unplaced': [
+            {'hostelerId': hosteler.hosteler_id, 'reason': reason}
+            for hosteler, reason in unplaced
+        ],
+        'timings': {
+            'loadMs': round((loaded - started) * 1000, 1),
+            'planMs': round((planned - loaded) * 1000, 1),
+            'writeMs': round((finished - planned) * 1000, 1),
+            'totalMs': round((finished - started) * 1000, 1),
+        },
+    }
@@ -0,0 +1,280 @@
+"""
+Query-count regression tests for room listings, the vacancy search, bulk
+allocation input checks, and bed counts after allocate/release/transfer.
+
+Listing rooms must take the same number of queries however many rooms and
+occupants there are: occupants come from one prefetch, not a query per room.
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from hostel.models import Hosteler
+from rooms import availability
+from rooms.models import Room
+
+SIZES = (1, 100, 1000)
+
+# GET /api/rooms/: the page count, one page of rooms and one prefetch of
+# their occupants
+ROOM_LIST_QUERIES = 3
+
+# GET /api/hostel-data/ with a cold cache: one query per collection, plus
+# the prefetch of room occupants
+HOSTEL_DATA_QUERIES = 6
+
+
+def build_rooms(count):
+    """``count`` double rooms, each with one occupant."""
+    Room.objects.bulk_create([
+        Room(
+            room_number=f'T{number:04d}', block='a-block', floor='ground', room_type='non-ac',
+            bed_type='double', total_beds=2, available_beds=1, room_rate=4500, is_available=True,
+        )
+        for number in range(count)
+    ])
+    rooms = Room.objects.order_by('room_number')
+    Hosteler.objects.bulk_create([
+        Hosteler(
+            hosteler_id=f'H{3000000 + number}', name=f'Student {number}', gender='male', age=20,
+            mobile=f'9{number:09d}', email=f'student{number}@example.com', room=room,
+            checkin_date=date(2024, 1, 1),
+        )
+        for number, room in enumerate(rooms)
+    ])
+
+
+class RoomQueryCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    def test_room_list_query_count_is_constant(self):
+        for size in SIZES:
+            with self.subTest(rooms=size):
+                Hosteler.objects.all().delete()
+                Room.objects.all().delete()
+                build_rooms(size)
+                with self.assertNumQueries(ROOM_LIST_QUERIES):
+                    response = self.client.get('/api/rooms/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['count'], size)
+                self.assertTrue(all(len(room['students']) == 1 for room in response.json()['results']))
+
+    def test_hostel_data_query_count_is_constant(self):
+        for size in SIZES:
+            with self.subTest(rooms=size):
+                Hosteler.objects.all().delete()
+                Room.objects.all().delete()
+                build_rooms(size)
+                cache.clear()
+                with self.assertNumQueries(HOSTEL_DATA_QUERIES):
+                    response = self.client.get('/api/hostel-data/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['rooms']), size)
+                self.assertEqual(len(response.json()['hostelers']), size)
+
+
+class BulkAllocateTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+
+    def test_invalid_max_rate_is_rejected(self):
+        for max_rate in ('abc', 'NaN', 'Infinity', [5000], {'rate': 1}):
+            with self.subTest(maxRate=max_rate):
+                response = self.client.post('/api/rooms/bulk_allocate/', {'maxRate': max_rate}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'maxRate must be a number'})
+
+    def test_invalid_per_hosteler_max_rate_is_rejected(self):
+        response = self.client.post(
+            '/api/rooms/bulk_allocate/', {'preferences': {'H2024001': {'maxRate': 'cheap'}}}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_numeric_max_rate_is_accepted(self):
+        response = self.client.post('/api/rooms/bulk_allocate/', {'maxRate': '5000', 'dryRun': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_block_preference_does_not_override_gender(self):
+        make_room('B101', block='b-block')
+        for number, gender in enumerate(('male', 'female', 'other')):
+            Hosteler.objects.create(
+                hosteler_id=f'H202400{number}', name=f'Student {number}', gender=gender, age=20,
+                mobile=f'987650000{number}', email=f'student{number}@example.com',
+            )
+
+        response = self.client.post(
+            '/api/rooms/bulk_allocate/', {'block': 'b-block', 'dryRun': True}, format='json',
+        ).json()
+
+        self.assertEqual(
+            sorted(item['hostelerId'] for item in response['assignments']), ['H2024001', 'H2024002'],
+        )
+        self.assertEqual([item['hostelerId'] for item in response['unplaced']], ['H2024000'])
+
+    def test_command_rejects_invalid_max_rate(self):
+        with self.assertRaisesMessage(CommandError, '--max-rate must be a number'):
+            call_command('allocate_rooms', '--max-rate', 'NaN', '--dry-run')
+
+
+def make_room(number, block='a-block', room_type='non-ac', bed_type='double', rate=4500, free=2):
+    return Room.objects.create(
+        room_number=number, block=block, floor='ground', room_type=room_type, bed_type=bed_type,
+        total_beds={'single': 1, 'double': 2, 'triple': 3}[bed_type], available_beds=free,
+        room_rate=rate, is_available=free > 0,
+    )
+
+
+class VacancySearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        availability.index.version = None
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        make_room('A101', rate=4500, free=2)
+        make_room('A102', room_type='ac', bed_type='triple', rate=6000, free=1)
+        make_room('A103', room_type='ac', bed_type='triple', rate=5000, free=3)
+        make_room('B101', block='b-block', room_type='ac', bed_type='triple', rate=4000, free=2)
+        make_room('B102', block='b-block', bed_type='single', rate=3000, free=0)
+
+    def search(self, query=''):
+        response = self.client.get(f'/api/rooms/vacancies/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def numbers(self, query=''):
+        return [room['roomNumber'] for room in self.search(query)['results']]
+
+    def test_rooms_with_free_beds_cheapest_first(self):
+        result = self.search()
+
+        self.assertEqual([room['roomNumber'] for room in result['results']], ['B101', 'A101', 'A103', 'A102'])
+        self.assertEqual(result['count'], 4)
+        self.assertEqual(result['freeBeds'], 8)
+        self.assertEqual(result['facets']['block'], {'a-block': 3, 'b-block': 1})
+        self.assertEqual(result['facets']['roomType'], {'ac': 3, 'non-ac': 1})
+
+    def test_filters(self):
+        self.assertEqual(self.numbers('?block=a-block&roomType=ac&bedType=triple'), ['A103', 'A102'])
+        self.assertEqual(self.numbers('?maxRate=5000'), ['B101', 'A101', 'A103'])
+        self.assertEqual(self.numbers('?minBeds=3'), ['A103'])
+        self.assertEqual(self.numbers('?limit=1'), ['B101'])
+        self.assertEqual(self.search('?limit=1')['count'], 4)
+
+    def test_invalid_filters_are_rejected(self):
+        for query in ('?block=c-block', '?roomType=deluxe', '?maxRate=cheap', '?maxRate=NaN', '?minBeds=two'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/rooms/vacancies/{query}').status_code, 400)
+
+    @override_settings(CACHE_SHARED=True)
+    def test_saves_are_folded_in_without_queries(self):
+        self.search()
+        room = Room.objects.get(room_number='B102')
+        room.available_beds = 1
+        room.is_available = True
+        with self.captureOnCommitCallbacks(execute=True):
+            room.save()
+
+        with self.assertNumQueries(0):
+            result = availability.vacancies(max_rate=3000)
+
+        self.assertEqual([room['roomNumber'] for room in result['results']], ['B102'])
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_sees_other_processes_writes(self):
+        self.assertIn('B101', self.numbers())
+
+        # Another worker fills B101; no signal reaches this process
+        Room.objects.filter(room_number='B101').update(
+            available_beds=0, is_available=False, updated_at=timezone.now(),
+        )
+
+        self.assertNotIn('B101', self.numbers())
+
+
+class BedCountTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('warden', password='warden123', role='warden'))
+        self.double = make_room('A101')
+        self.single = make_room('A102', bed_type='single', free=1)
+        self.hostelers = [
+            Hosteler.objects.create(
+                hosteler_id=f'H202400{number}', name=f'Student {number}', gender='male', age=20,
+                mobile=f'987650000{number}', email=f'student{number}@example.com',
+            )
+            for number in range(3)
+        ]
+
+    def post(self, room, action, hosteler, **data):
+        return self.client.post(
+            f'/api/rooms/{room.pk}/{action}/', {'hostelerId': hosteler.hosteler_id, **data}, format='json',
+        )
+
+    def beds(self, room):
+        room.refresh_from_db()
+        return room.available_beds, room.is_available
+
+    def test_allocate_fills_beds(self):
+        first, second, third = self.hostelers
+
+        self.assertEqual(self.post(self.double, 'allocate', first).status_code, 200)
+        self.assertEqual(self.beds(self.double), (1, True))
+
+        self.assertEqual(self.post(self.double, 'allocate', second, bed='B2').status_code, 200)
+        self.assertEqual(self.beds(self.double), (0, False))
+
+        response = self.post(self.double, 'allocate', third)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.beds(self.double), (0, False))
+        third.refresh_from_db()
+        self.assertIsNone(third.room)
+
+    def test_release_frees_the_bed(self):
+        first, second, _ = self.hostelers
+        self.post(self.double, 'allocate', first)
+        self.post(self.double, 'allocate', second)
+
+        self.assertEqual(self.post(self.double, 'release', first).status_code, 200)
+
+        self.assertEqual(self.beds(self.double), (1, True))
+        first.refresh_from_db()
+        self.assertEqual((first.room, first.bed), (None, ''))
+
+    def test_transfer_moves_the_bed_count(self):
+        first, second, _ = self.hostelers
+        self.post(self.double, 'allocate', first)
+        self.post(self.double, 'allocate', second)
+
+        self.assertEqual(self.post(self.single, 'transfer', first).status_code, 200)
+
+        self.assertEqual(self.beds(self.double), (1, True))
+        self.assertEqual(self.beds(self.single), (0, False))
+
+        # The single room is full now, so moving back in is refused and nothing changes
+        self.assertEqual(self.post(self.single, 'transfer', second).status_code, 400)
+        self.assertEqual(self.beds(self.double), (1, True))
+        self.assertEqual(self.beds(self.single), (0, False))
+
+    def test_transfer_within_a_room_keeps_the_count(self):
+        first = self.hostelers[0]
+        self.post(self.double, 'allocate', first, bed='B1')
+
+        self.assertEqual(self.post(self.double, 'transfer', first, bed='B2').status_code, 200)
+
+        self.assertEqual(self.beds(self.double), (1, True))
+        first.refresh_from_db()
+        self.assertEqual(first.bed, 'B2')
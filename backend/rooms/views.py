@@ -1,14 +1,25 @@
 """
 Views for Room management.
 """
-from rest_framework import viewsets
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from core.permissions import IsWardenOrReadOnly
+from core.permissions import IsWarden, IsWardenOrReadOnly
+from core.mixins import FastListModelMixin
+from hostel.models import Hosteler
+from hostel.serializers import HostelerSerializer
+from . import allocation, availability, solver
 from .models import Room
 from .serializers import RoomSerializer
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(FastListModelMixin, viewsets.ModelViewSet):
     """
     ViewSet for Room CRUD operations.
     
@@ -16,11 +27,18 @@ class RoomViewSet(viewsets.ModelViewSet):
     - GET /api/rooms/ - List all rooms
     - POST /api/rooms/ - Create new room (Warden only)
     - GET /api/rooms/{id}/ - Retrieve room
+    - GET /api/rooms/vacancies/ - Search free beds with per-facet counts
     - PUT /api/rooms/{id}/ - Update room (Warden only)
     - PATCH /api/rooms/{id}/ - Partial update (Warden only)
     - DELETE /api/rooms/{id}/ - Delete room (Warden only)
+    - POST /api/rooms/{id}/allocate/ - Put an unallocated hosteler in this room (Warden only)
+    - POST /api/rooms/{id}/release/ - Free a hosteler's bed in this room (Warden only)
+    - POST /api/rooms/{id}/transfer/ - Move a hosteler into this room (Warden only)
+    - POST /api/rooms/bulk_allocate/ - Place a batch of unallocated hostelers (Warden only)
     """
-    queryset = Room.objects.all().prefetch_related('hostelers')
+    queryset = Room.objects.all().prefetch_related(
+        Prefetch('hostelers', queryset=Hosteler.objects.only('id', 'hosteler_id', 'room_id'))
+    )
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated, IsWardenOrReadOnly]
     
@@ -32,3 +50,150 @@ class RoomViewSet(viewsets.ModelViewSet):
                 'error': 'Cannot delete room with allocated beds. Please deallocate all students first.'
             })
         instance.delete()
+    
+    def perform_update(self, serializer):
+        """Keep bed counts in step with occupants when total_beds changes."""
+        with transaction.atomic():
+            room = serializer.save()
+            allocation.recount_beds(Room.objects.select_for_update().get(pk=room.pk))
+    
+    def get_allocation_hosteler(self, request):
+        """Look up the hosteler named by hostelerId (H2024001) in the request body."""
+        hosteler_id = request.data.get('hostelerId') or request.data.get('hosteler_id')
+        if not hosteler_id:
+            return None, Response({'error': 'hostelerId is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Hosteler.objects.get(hosteler_id=hosteler_id), None
+        except Hosteler.DoesNotExist:
+            return None, Response({'error': f'Hosteler {hosteler_id} not found'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    def allocation_response(self, operation, *args):
+        """Run an allocation operation and return the updated room and hosteler."""
+        try:
+            hosteler = operation(*args)
+        except allocation.AllocationError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        room = Room.objects.get(pk=self.kwargs['pk'])
+        return Response({
+            'room': RoomSerializer(room, context=self.get_serializer_context()).data,
+            'hosteler': HostelerSerializer(hosteler, context=self.get_serializer_context()).data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def vacancies(self, request):
+        """
+        Search rooms with free beds, served from the in-memory availability index.
+        GET /api/rooms/vacancies/?block=b-block&roomType=ac&bedType=triple&maxRate=5000
+        Optional: floor, minBeds (default 1), limit (default 50)
+        """
+        params = request.query_params
+        filters = {}
+        for param, field in (('block', 'block'), ('floor', 'floor'),
+                             ('roomType', 'room_type'), ('bedType', 'bed_type')):
+            value = params.get(param)
+            if value:
+                if value not in dict(Room._meta.get_field(field).choices):
+                    return Response({'error': f'Invalid {param}: {value}'}, status=status.HTTP_400_BAD_REQUEST)
+                filters[field] = value
+        
+        try:
+            if params.get('maxRate'):
+                filters['max_rate'] = Decimal(params['maxRate'])
+                if not filters['max_rate'].is_finite():
+                    raise ValueError(params['maxRate'])
+            filters['min_free'] = max(int(params.get('minBeds', 1)), 1)
+            limit = min(max(int(params.get('limit', 50)), 0), 1000)
+        except (InvalidOperation, ValueError):
+            return Response({'error': 'maxRate, minBeds and limit must be numbers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(availability.vacancies(limit=limit, **filters))
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def allocate(self, request, pk=None):
+        """
+        Allocate a bed in this room.
+        POST /api/rooms/{id}/allocate/
+        Body: {"hostelerId": "H2024001", "bed": "B2" (optional), "checkinDate": "2024-06-01" (optional)}
+        """
+        room = self.get_object()
+        hosteler, error = self.get_allocation_hosteler(request)
+        if error:
+            return error
+        bed = request.data.get('bed') or None
+        checkin_date = request.data.get('checkinDate') or request.data.get('checkin_date')
+        if checkin_date:
+            try:
+                checkin_date = parse_date(checkin_date)
+            except ValueError:
+                checkin_date = None
+            if checkin_date is None:
+                return Response({'error': 'checkinDate must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.allocation_response(allocation.allocate, hosteler, room, bed, checkin_date)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def release(self, request, pk=None):
+        """
+        Release a hosteler's bed in this room.
+        POST /api/rooms/{id}/release/
+        Body: {"hostelerId": "H2024001"}
+        """
+        room = self.get_object()
+        hosteler, error = self.get_allocation_hosteler(request)
+        if error:
+            return error
+        if hosteler.room_id != room.pk:
+            return Response(
+                {'error': f'Hosteler {hosteler.hosteler_id} is not in room {room.room_number}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.allocation_response(allocation.release, hosteler)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def transfer(self, request, pk=None):
+        """
+        Move a hosteler from their current room into this one.
+        POST /api/rooms/{id}/transfer/
+        Body: {"hostelerId": "H2024001", "bed": "B1" (optional)}
+        """
+        room = self.get_object()
+        hosteler, error = self.get_allocation_hosteler(request)
+        if error:
+            return error
+        bed = request.data.get('bed') or None
+        return self.allocation_response(allocation.transfer, hosteler, room, bed)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsWarden])
+    def bulk_allocate(self, request):
+        """
+        Place unallocated hostelers in free beds in one transaction.
+        POST /api/rooms/bulk_allocate/
+        Body: {
+            "hostelerIds": ["H2024101", ...] (optional, default all unallocated),
+            "roomType": "ac", "bedType": "triple", "maxRate": 5000 (optional batch-wide filters),
+            "preferences": {"H2024101": {"roomType": "non-ac"}} (optional per-hosteler overrides),
+            "keepGroups": true, "dryRun": false
+        }
+        """
+        hosteler_ids = request.data.get('hostelerIds')
+        if hosteler_ids is not None and not isinstance(hosteler_ids, list):
+            return Response({'error': 'hostelerIds must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        preferences = request.data.get('preferences') or {}
+        if not isinstance(preferences, dict) or not all(isinstance(prefs, dict) for prefs in preferences.values()):
+            return Response({'error': 'preferences must be an object keyed by hostelerId'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        constraints = {key: request.data.get(key) for key in ('block', 'roomType', 'bedType', 'maxRate')}
+        try:
+            solver.check_rates(constraints, preferences)
+        except ValueError:
+            return Response({'error': 'maxRate must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = solver.allocate_batch(
+            hosteler_ids=hosteler_ids,
+            constraints=constraints,
+            preferences=preferences,
+            keep_groups=request.data.get('keepGroups', True) not in (False, 'false', '0'),
+            dry_run=request.data.get('dryRun', False) in (True, 'true', '1'),
+        )
+        return Response(result)